@@ -19,10 +19,8 @@ log.info('SayAs Electron App starting...');
 
 // Global references
 let mainWindow = null;
-let pythonWebuiProcess = null;
 let pythonApiProcess = null;
 let apiPort = 8765;
-let webuiPort = 7860;
 
 // Get paths
 const isDev = process.env.NODE_ENV === 'development' || !app.isPackaged;
@@ -35,13 +33,13 @@ const pythonPath = isDev
   ? path.join(appPath, 'venv', 'Scripts', 'python.exe')
   : path.join(process.resourcesPath, 'python', 'venv', 'Scripts', 'python.exe');
 
-const webuiScript = path.join(appPath, 'src', 'webui.py');
+const apiScript = path.join(appPath, 'src', 'api.py');
 
 // Log for debugging
 console.log('DEBUG: __dirname =', __dirname);
 console.log('DEBUG: appPath =', appPath);
 console.log('DEBUG: pythonPath =', pythonPath);
-console.log('DEBUG: webuiScript =', webuiScript);
+console.log('DEBUG: apiScript =', apiScript);
 
 // User data paths
 const userDataPath = app.getPath('userData');
@@ -78,8 +76,8 @@ function createWindow() {
     titleBarStyle: 'default'
   });
 
-  // Load the WebUI URL
-  const webuiUrl = `http://localhost:${webuiPort}`;
+  // Load the WebUI URL (served by the API process)
+  const webuiUrl = `http://localhost:${apiPort}/ui`;
   log.info(`Loading WebUI: ${webuiUrl}`);
   
   mainWindow.loadURL(webuiUrl);
@@ -106,10 +104,10 @@ function createWindow() {
 
 function startPythonBackend() {
   return new Promise((resolve, reject) => {
-    log.info('Starting Python backends (API + WebUI)...');
+    log.info('Starting Python backend (API + WebUI, one shared model)...');
     log.info(`App path: ${appPath}`);
     log.info(`Python path: ${pythonPath}`);
-    log.info(`WebUI script: ${webuiScript}`);
+    log.info(`API script: ${apiScript}`);
     
     // Check if python exists
     const fs = require('fs');
@@ -120,8 +118,8 @@ function startPythonBackend() {
       return;
     }
     
-    if (!fs.existsSync(webuiScript)) {
-      const errorMsg = `WebUI script not found at: ${webuiScript}`;
+    if (!fs.existsSync(apiScript)) {
+      const errorMsg = `API script not found at: ${apiScript}`;
       log.error(errorMsg);
       reject(new Error(errorMsg));
       return;
@@ -136,38 +134,10 @@ function startPythonBackend() {
       PATH: `${process.env.PATH};C:\\Program Files\\NVIDIA GPU Computing Toolkit\\CUDA\\v11.8\\bin`
     };
 
-    // Start API server first
-    const apiScript = path.join(appPath, 'src', 'api.py');
-    if (fs.existsSync(apiScript)) {
-      log.info('Spawning API server...');
-      pythonApiProcess = spawn(pythonPath, [apiScript], {
-        env,
-        cwd: appPath,
-        stdio: ['pipe', 'pipe', 'pipe']
-      });
-
-      pythonApiProcess.stdout.on('data', (data) => {
-        const output = data.toString();
-        log.info(`API: ${output}`);
-      });
-
-      pythonApiProcess.stderr.on('data', (data) => {
-        const error = data.toString();
-        log.info(`API: ${error}`);  // Log warnings as info
-      });
-
-      pythonApiProcess.on('error', (error) => {
-        log.error(`API server error: ${error.message}`);
-      });
-
-      pythonApiProcess.on('exit', (code, signal) => {
-        log.info(`API server exited with code: ${code}, signal: ${signal}`);
-      });
-    }
-
-    // Spawn WebUI process
-    log.info('Spawning WebUI process...');
-    pythonWebuiProcess = spawn(pythonPath, [webuiScript], {
+    // Start the API server with the WebUI mounted inside it, so both
+    // frontends share one model instance, one voice cache and one queue
+    log.info('Spawning API server with WebUI mounted...');
+    pythonApiProcess = spawn(pythonPath, [apiScript, '--webui', '--port', String(apiPort)], {
       env,
       cwd: appPath,
       stdio: ['pipe', 'pipe', 'pipe']
@@ -175,21 +145,25 @@ function startPythonBackend() {
 
     let started = false;
 
-    pythonWebuiProcess.stdout.on('data', (data) => {
-      const output = data.toString();
-      log.info(`WebUI: ${output}`);
-      
-      // Check if WebUI is ready
-      if (output.includes('http://localhost:7860') && !started) {
+    // Uvicorn reports startup completion (after the model has loaded)
+    const checkStarted = (output) => {
+      if (output.includes('Application startup complete') && !started) {
         started = true;
-        log.info('Python WebUI started successfully!');
+        log.info('Python backend started successfully!');
         resolve(true);
       }
+    };
+
+    pythonApiProcess.stdout.on('data', (data) => {
+      const output = data.toString();
+      log.info(`API: ${output}`);
+      checkStarted(output);
     });
 
-    pythonWebuiProcess.stderr.on('data', (data) => {
+    pythonApiProcess.stderr.on('data', (data) => {
       const error = data.toString();
-      log.info(`WebUI: ${error}`);  // Log warnings as info
+      log.info(`API: ${error}`);  // Log warnings as info
+      checkStarted(error);
       
       // Send error to renderer
       if (mainWindow) {
@@ -197,24 +171,24 @@ function startPythonBackend() {
       }
     });
 
-    pythonWebuiProcess.on('error', (error) => {
-      log.error(`Failed to start WebUI: ${error.message}`);
+    pythonApiProcess.on('error', (error) => {
+      log.error(`Failed to start API server: ${error.message}`);
       log.error(`Error code: ${error.code}`);
       log.error(`Error syscall: ${error.syscall}`);
       reject(error);
     });
 
-    pythonWebuiProcess.on('exit', (code, signal) => {
-      log.info(`WebUI exited with code: ${code}, signal: ${signal}`);
+    pythonApiProcess.on('exit', (code, signal) => {
+      log.info(`API server exited with code: ${code}, signal: ${signal}`);
       if (mainWindow) {
         mainWindow.webContents.send('python-exit', code);
       }
       if (!started) {
-        reject(new Error(`WebUI exited with code ${code} before starting`));
+        reject(new Error(`API server exited with code ${code} before starting`));
       }
     });
 
-    // Timeout after 90 seconds (API + WebUI need time to load models)
+    // Timeout after 90 seconds (the model needs time to load)
     setTimeout(() => {
       if (!started) {
         const errorMsg = 'Python backend failed to start within 90 seconds';
@@ -231,11 +205,6 @@ function stopPythonBackend() {
     pythonApiProcess.kill('SIGTERM');
     pythonApiProcess = null;
   }
-  if (pythonWebuiProcess) {
-    log.info('Stopping WebUI...');
-    pythonWebuiProcess.kill('SIGTERM');
-    pythonWebuiProcess = null;
-  }
 }
 
 // App lifecycle
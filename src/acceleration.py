@@ -0,0 +1,131 @@
+"""
+Inference Acceleration Profiles for SayAs
+
+Selectable speed-ups for the model built by `inference.load_model`, aimed
+at CPU-only nodes running the stock fp32 eager model.
+
+A profile is one name or several joined with "+":
+    fp32        Stock eager model (baseline)
+    inference   Run generation under torch.inference_mode
+    int8        Dynamic int8 quantization of the T3 linear layers
+    bf16        bfloat16 autocast (only where the hardware supports it)
+    compile     torch.compile the T3 transformer (slow first calls)
+
+e.g. "int8", "bf16+compile". Every profile except fp32 implies "inference".
+Pick one with SAYAS_PROFILE or the -profile / --profile CLI flags, and
+check it with `python benchmark.py profiles`.
+"""
+
+import sys
+import contextlib
+from typing import Callable, FrozenSet
+
+import torch
+
+
+DEFAULT_PROFILE = "fp32"
+
+PROFILE_FEATURES = frozenset(["inference", "int8", "bf16", "compile"])
+
+# Minimum similarity to the fp32 output for a profile to pass validation
+SIMILARITY_THRESHOLD = 0.85
+
+
+def parse_profile(profile: str) -> FrozenSet[str]:
+    """
+    Parse a profile string into its set of features.
+
+    Raises:
+        ValueError: If the profile names an unknown feature
+    """
+    profile = (profile or DEFAULT_PROFILE).strip().lower()
+    if profile == "fp32":
+        return frozenset()
+
+    features = set(p.strip() for p in profile.split("+") if p.strip())
+    unknown = features - PROFILE_FEATURES
+    if unknown:
+        raise ValueError(
+            f"Unknown acceleration profile feature(s): {', '.join(sorted(unknown))}. "
+            f"Use fp32 or a '+'-joined mix of: {', '.join(sorted(PROFILE_FEATURES))}"
+        )
+    features.add("inference")
+    return frozenset(features)
+
+
+def bf16_supported(device: str) -> bool:
+    """Check whether bfloat16 autocast is worth using on this device."""
+    if device.startswith("cuda"):
+        return torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+    is_supported = getattr(torch.cpu, "_is_avx512_bf16_supported", None)
+    return bool(is_supported and is_supported())
+
+
+def apply_profile(model, profile: str) -> Callable[[], contextlib.AbstractContextManager]:
+    """
+    Apply an acceleration profile to a loaded model, in place.
+
+    Args:
+        model: Loaded ChatterboxTTS model
+        profile: Profile string (see module docstring)
+
+    Returns:
+        Factory for the context manager every generate call should run in
+    """
+    features = parse_profile(profile)
+    device = str(model.device)
+
+    if "int8" in features:
+        if device != "cpu":
+            print(f"⚠️  int8 dynamic quantization is CPU-only, skipped on {device}", file=sys.stderr)
+        else:
+            # T3 (the autoregressive LLM) dominates CPU time and is mostly
+            # nn.Linear; S3Gen is left alone to protect audio quality.
+            model.t3 = torch.ao.quantization.quantize_dynamic(model.t3, {torch.nn.Linear}, dtype=torch.qint8)
+
+    use_bf16 = "bf16" in features and bf16_supported(device)
+    if "bf16" in features and not use_bf16:
+        print(f"⚠️  bf16 not supported on this {device}, running fp32", file=sys.stderr)
+
+    if "compile" in features:
+        model.t3.tfmr = torch.compile(model.t3.tfmr, dynamic=True)
+
+    autocast_device = "cuda" if device.startswith("cuda") else "cpu"
+
+    def generation_context():
+        stack = contextlib.ExitStack()
+        if "inference" in features:
+            stack.enter_context(torch.inference_mode())
+        if use_bf16:
+            stack.enter_context(torch.autocast(autocast_device, dtype=torch.bfloat16))
+        return stack
+
+    if features:
+        print(f"⚡ Acceleration profile: {'+'.join(sorted(features))}", file=sys.stderr)
+    return generation_context
+
+
+def audio_similarity(reference: torch.Tensor, candidate: torch.Tensor, sample_rate: int) -> float:
+    """
+    Compare two renders of the same text, 0.0 (unrelated) to 1.0 (identical).
+
+    Sampling makes waveforms differ run to run, so this compares the
+    long-term average log-mel spectrum (timbre) by cosine similarity and
+    penalizes the score by the duration mismatch.
+    """
+    import torchaudio.transforms as T
+
+    mel = T.MelSpectrogram(sample_rate=sample_rate, n_fft=1024, hop_length=256, n_mels=80)
+    ref = reference.detach().float().cpu().reshape(1, -1)
+    cand = candidate.detach().float().cpu().reshape(1, -1)
+
+    ref_spec = torch.log(mel(ref) + 1e-6).mean(dim=-1).flatten()
+    cand_spec = torch.log(mel(cand) + 1e-6).mean(dim=-1).flatten()
+    ref_spec = ref_spec - ref_spec.mean()
+    cand_spec = cand_spec - cand_spec.mean()
+    timbre = torch.nn.functional.cosine_similarity(ref_spec, cand_spec, dim=0).item()
+
+    ref_len, cand_len = ref.shape[-1], cand.shape[-1]
+    duration = min(ref_len, cand_len) / max(ref_len, cand_len, 1)
+
+    return min(1.0, max(0.0, timbre)) * duration
@@ -0,0 +1,262 @@
+"""
+Admission Control for SayAs
+
+Every generating request is priced before it starts: compute seconds from
+its text length and chunk count, memory from the audio it will hold and
+the output format it will be encoded to. Work is admitted while the
+outstanding total fits the budgets; past that the API answers 429 with a
+Retry-After of when enough admitted work will have drained, instead of
+queueing everything and slowing down for everyone.
+
+The compute estimate calibrates itself: a request that ran with no other
+work beside it (so its wall time is its compute time) updates a moving
+average of compute seconds per character, so Retry-After tracks the real
+speed of the device and acceleration profile.
+
+Bounding outstanding compute also bounds latency: admitted work waits
+for at most max_seconds / workers before it runs.
+
+Each scheduler lane has its own budget. The fair scheduler runs
+interactive work ahead of bulk work, so interactive requests are only
+measured against other interactive work: a big batch cannot push them
+into 429s. Bulk work gets a share of the budgets (bulk_share) and is
+admitted one job at a time as it is queued, so a batch waits for room
+instead of being priced, and possibly refused, as a whole.
+"""
+
+import math
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from scheduler import INTERACTIVE, BULK
+
+
+# Spoken characters per second of audio (for memory estimates)
+CHARS_PER_AUDIO_SECOND = 15.0
+
+# Initial compute seconds per character, until measurements come in
+DEFAULT_SECONDS_PER_CHAR = 0.05
+
+# Fixed compute cost of one model call (conditioning, warm-up of the decoder)
+SECONDS_PER_CHUNK = 0.25
+
+# Bytes held per sample while a clip is generated, processed and encoded
+# (float32 audio, DSP copies, encoder output)
+BYTES_PER_SAMPLE = {
+    "wav": 4 * 3 + 2,
+    "flac": 4 * 3 + 2,
+    "mp3": 4 * 3 + 1,
+    "ogg": 4 * 3 + 1,
+    "opus": 4 * 3 + 1,
+}
+
+# Weight of a new measurement in the seconds-per-character average
+EWMA_ALPHA = 0.2
+
+# Share of the compute and memory budgets the bulk lane may hold
+DEFAULT_BULK_SHARE = 0.5
+
+
+@dataclass(frozen=True)
+class Cost:
+    """Estimated cost of one request."""
+    seconds: float  # Compute seconds on one worker
+    memory: int  # Peak bytes held
+    chars: int = 0
+    chunks: int = 0
+
+    def __add__(self, other: "Cost") -> "Cost":
+        return Cost(
+            self.seconds + other.seconds,
+            self.memory + other.memory,
+            self.chars + other.chars,
+            self.chunks + other.chunks
+        )
+
+
+class Rejected(Exception):
+    """The request does not fit the budgets right now."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """Admitted work. Release it (or use it as a context manager) when done."""
+
+    def __init__(self, controller: "AdmissionController", cost: Cost, lane: str = INTERACTIVE):
+        self.controller = controller
+        self.cost = cost
+        self.lane = lane
+        self.started_at = time.monotonic()
+        self.contended = False  # Shared the workers with other work at some point
+        self._released = False
+
+    def release(self, measure: bool = True):
+        """Return the budget; with `measure`, learn from how long it took."""
+        if not self._released:
+            self._released = True
+            self.controller._release(self, time.monotonic() - self.started_at if measure else None)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release(measure=exc_type is None)
+
+
+@dataclass
+class _Lane:
+    """Outstanding admitted work of one scheduler lane."""
+    seconds: float = 0.0
+    memory: int = 0
+    active: int = 0
+
+
+class AdmissionController:
+    """
+    Admits requests against a compute-seconds and a memory budget per lane.
+
+    `workers` is how many requests run at once (replicas); outstanding
+    compute drains at that many seconds per second. The interactive lane
+    has the whole compute budget to itself; the bulk lane `bulk_share` of
+    it. Memory is one pool, of which bulk work may hold `bulk_share`.
+    """
+
+    def __init__(
+        self,
+        max_seconds: float,
+        max_memory: int,
+        sample_rate: int = 24000,
+        workers: int = 1,
+        bulk_share: float = DEFAULT_BULK_SHARE
+    ):
+        self.max_seconds = max_seconds
+        self.max_memory = max_memory
+        self.sample_rate = sample_rate
+        self.workers = max(1, workers)
+        self.bulk_share = bulk_share
+        self.seconds_per_char = DEFAULT_SECONDS_PER_CHAR
+        self._lanes = {INTERACTIVE: _Lane(), BULK: _Lane()}
+        self._seconds = 0.0
+        self._memory = 0
+        self._active = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._tickets = set()
+        self._lock = threading.Lock()
+
+    def estimate(self, chars: int, chunks: int = 1, output_format: str = "wav") -> Cost:
+        """Estimate the cost of generating `chars` characters in `chunks` model calls."""
+        chunks = max(1, chunks)
+        samples = chars / CHARS_PER_AUDIO_SECOND * self.sample_rate
+        return Cost(
+            seconds=chars * self.seconds_per_char + chunks * SECONDS_PER_CHUNK,
+            memory=int(samples * BYTES_PER_SAMPLE.get(output_format, BYTES_PER_SAMPLE["wav"])),
+            chars=chars,
+            chunks=chunks
+        )
+
+    def silence(self, seconds: float, output_format: str = "wav") -> Cost:
+        """Cost of `seconds` of inserted silence: memory only, no model call."""
+        samples = seconds * self.sample_rate
+        return Cost(
+            seconds=0.0,
+            memory=int(samples * BYTES_PER_SAMPLE.get(output_format, BYTES_PER_SAMPLE["wav"]))
+        )
+
+    def budgets(self, lane: str):
+        """(compute seconds, memory) a lane may hold."""
+        if lane == BULK:
+            return self.max_seconds * self.bulk_share, self.max_memory * self.bulk_share
+        return self.max_seconds, self.max_memory
+
+    def admit(self, cost: Cost, lane: str = INTERACTIVE) -> Ticket:
+        """
+        Reserve budget for `cost` in `lane`.
+
+        A request is always admitted when nothing else in its lane is
+        running, so one that exceeds the budgets on its own is slow rather
+        than impossible.
+
+        Raises:
+            Rejected: With the seconds until enough budget should be free
+        """
+        with self._lock:
+            budget = self._lanes[lane]
+            if budget.active:
+                max_seconds, max_memory = self.budgets(lane)
+                over_seconds = budget.seconds + cost.seconds - max_seconds
+                over_memory = max(
+                    budget.memory + cost.memory - max_memory,
+                    self._memory + cost.memory - self.max_memory
+                )
+                if over_seconds > 0 or over_memory > 0:
+                    self._rejected += 1
+                    raise Rejected(
+                        "compute budget exhausted" if over_seconds > 0 else "memory budget exhausted",
+                        self._retry_after(over_seconds, over_memory)
+                    )
+            budget.seconds += cost.seconds
+            budget.memory += cost.memory
+            budget.active += 1
+            self._seconds += cost.seconds
+            self._memory += cost.memory
+            self._active += 1
+            self._admitted += 1
+            ticket = Ticket(self, cost, lane)
+            if self._active > self.workers:
+                for other in self._tickets:
+                    other.contended = True
+                ticket.contended = True
+            self._tickets.add(ticket)
+        return ticket
+
+    def _retry_after(self, over_seconds: float, over_memory: int) -> int:
+        """Seconds until the overshoot has drained (caller holds the lock)."""
+        drain_rate = self.workers  # Compute seconds finished per second
+        wait = max(0.0, over_seconds) / drain_rate
+        if over_memory > 0 and self._memory:
+            # Memory frees as the outstanding work completes
+            wait = max(wait, over_memory / self._memory * self._seconds / drain_rate)
+        return max(1, math.ceil(wait))
+
+    def _release(self, ticket: Ticket, elapsed: Optional[float]):
+        with self._lock:
+            budget = self._lanes[ticket.lane]
+            budget.seconds = max(0.0, budget.seconds - ticket.cost.seconds)
+            budget.memory = max(0, budget.memory - ticket.cost.memory)
+            budget.active -= 1
+            self._seconds = max(0.0, self._seconds - ticket.cost.seconds)
+            self._memory = max(0, self._memory - ticket.cost.memory)
+            self._active -= 1
+            self._tickets.discard(ticket)
+            if elapsed is not None and ticket.cost.chars and not ticket.contended:
+                chunk_seconds = ticket.cost.chunks * SECONDS_PER_CHUNK
+                per_char = max(0.0, elapsed - chunk_seconds) / ticket.cost.chars
+                self.seconds_per_char += EWMA_ALPHA * (per_char - self.seconds_per_char)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "active": self._active,
+                "outstanding_seconds": round(self._seconds, 2),
+                "max_seconds": self.max_seconds,
+                "outstanding_memory": self._memory,
+                "max_memory": self.max_memory,
+                "seconds_per_char": round(self.seconds_per_char, 4),
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "lanes": {
+                    lane: {
+                        "active": budget.active,
+                        "outstanding_seconds": round(budget.seconds, 2),
+                        "max_seconds": self.budgets(lane)[0]
+                    }
+                    for lane, budget in self._lanes.items()
+                }
+            }
@@ -18,14 +18,17 @@ OVERKILL FEATURES:
 import os
 import sys
 import io
+import argparse
+import asyncio
 import base64
 import json
 import tempfile
 import hashlib
 from pathlib import Path
-from typing import Literal, Optional, List
+from typing import Literal, Optional, List, Dict
 from contextlib import asynccontextmanager
 from datetime import datetime
+from urllib.parse import quote
 
 # Set CUDA PATH before importing torch
 os.environ['PATH'] = r'C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v11.8\bin;' + os.environ.get('PATH', '')
@@ -33,64 +36,155 @@ os.environ['PATH'] = r'C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v11.8\
 import torch
 import torchaudio
 import torchaudio.transforms as T
-import numpy as np
-import pyaudio
-from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import uvicorn
 
-from chatterbox.tts import ChatterboxTTS
-
-from text_splitter import split_text, stitch_audio_segments, DEFAULT_MAX_CHUNK_SIZE
+import inference
+from voice_registry import get_registry
+from voice_ingest import ingest_voice
+from voice_blend import save_blend
+from preset_store import PresetStore
+from dsp_chain import compile_chain
+from ssml import Speech, Prosody, RenderJob, SynthesisPlan, compile_plan, compile_ssml, assemble, plan_stats
+from playback import get_player, current_player, close_player
+from artifacts import ArtifactCache, MEDIA_TYPES, parse_range
+from output_store import OutputStore, write_atomic
+from scheduler import INTERACTIVE, BULK
+from checkpoints import Job, JobStore, voice_hash
+from admission import AdmissionController, Cost, Rejected, Ticket
+from cancellation import CancelToken, Cancelled, DeadlineExceeded, CLIENT_DISCONNECTED, DEADLINE_EXCEEDED
+from prerender import Prerenderer, Prompt, load_manifest, parse_prompts
+from streaming_encoder import create_encoder, encode_all, STREAMING_FORMATS, STREAMING_MEDIA_TYPES
+from text_splitter import split_text, create_silence, boundary_pauses, normalize_text, get_lexicon, DEFAULT_MAX_CHUNK_SIZE
+from silence_trim import TrimStats, stitch_chunks, trim_silence
+from loudness import LoudnessNormalizer
 
 # Project paths
 PROJECT_DIR = Path(__file__).parent.parent
 VOICES_DIR = PROJECT_DIR / "voices"
 OUTPUT_DIR = PROJECT_DIR / "output"
 PRESETS_DIR = PROJECT_DIR / "presets"
+JOBS_DIR = PROJECT_DIR / "jobs"
 
 # Create directories
 OUTPUT_DIR.mkdir(exist_ok=True)
 PRESETS_DIR.mkdir(exist_ok=True)
 
-# Global model instance
+# Worker replicas are spawned processes, which re-import this script as
+# __mp_main__ when the server runs as `python api.py` (see worker_pool.py).
+# They only run the model: the voice index and the output/job stores (which
+# clean up files on startup) are built in the serving process alone.
+IS_REPLICA_IMPORT = __name__ == "__mp_main__"
+
+# Shared voice index (same instance as the WebUI's when mounted)
+voice_registry = get_registry(VOICES_DIR, watch=False) if not IS_REPLICA_IMPORT else None
+
+# Presets in memory, each with its compiled DSP chain
+preset_store = PresetStore(PRESETS_DIR)
+
+# Global model instance (owned by the shared inference service)
 model = None
 device = None
 
 # Long text handling threshold
 LONG_TEXT_THRESHOLD = 900  # Start splitting before hitting the limit
 
+# CPU worker pool: 0 replicas = run the model in this process
+WORKER_REPLICAS = int(os.environ.get("SAYAS_WORKERS", "0"))
+WORKER_THREADS = int(os.environ.get("SAYAS_WORKER_THREADS", "0"))  # 0 = cores / replicas
+WORKER_PIN_CORES = os.environ.get("SAYAS_PIN_CORES") == "1"
+
+# Reuse cached audio for equivalent /sayas requests (same voice, normalized
+# text and settings) instead of generating again; 0 = always regenerate
+REUSE_AUDIO = os.environ.get("SAYAS_REUSE_AUDIO", "1") != "0"
+
+# Max batch jobs queued on the executor at once (0 = 2x the worker count)
+BATCH_MAX_IN_FLIGHT = int(os.environ.get("SAYAS_BATCH_IN_FLIGHT", "0"))
+
+# Short-lived encoded audio served from GET /audio/{id}
+audio_cache = ArtifactCache(
+    ttl_seconds=int(os.environ.get("SAYAS_AUDIO_TTL", "600")),
+    max_bytes=int(os.environ.get("SAYAS_AUDIO_CACHE_MB", "256")) * 1024 * 1024
+)
+
+# How often a long-running request checks that its client is still connected
+DISCONNECT_POLL_SECONDS = 0.25
+
+# Admission control: outstanding compute seconds / memory admitted at once
+# (see admission.py; SAYAS_ADMISSION=0 admits everything)
+ADMISSION_ENABLED = os.environ.get("SAYAS_ADMISSION", "1") != "0"
+admission = AdmissionController(
+    max_seconds=float(os.environ.get("SAYAS_MAX_QUEUED_SECONDS", "120")) if ADMISSION_ENABLED else float("inf"),
+    max_memory=int(os.environ.get("SAYAS_MAX_INFLIGHT_MB", "2048")) * 1024 * 1024 if ADMISSION_ENABLED else sys.maxsize,
+    workers=max(1, WORKER_REPLICAS),
+    bulk_share=float(os.environ.get("SAYAS_BULK_SHARE", "0.5"))
+)
+
+# Saved audio in OUTPUT_DIR (see output_store.py)
+OUTPUT_QUOTA_BYTES = int(os.environ.get("SAYAS_OUTPUT_QUOTA_MB", "2048")) * 1024 * 1024
+OUTPUT_RETENTION_SECONDS = float(os.environ.get("SAYAS_OUTPUT_RETENTION_DAYS", "7")) * 24 * 3600
+
+# Long-text chunks checkpointed to JOBS_DIR, so a render interrupted by a
+# restart or a crash resumes where it stopped (see checkpoints.py)
+CHECKPOINT_JOBS = os.environ.get("SAYAS_CHECKPOINTS", "1") != "0"
+RESUME_JOBS_ON_STARTUP = os.environ.get("SAYAS_RESUME_JOBS", "1") != "0"
+JOB_RETENTION_SECONDS = float(os.environ.get("SAYAS_JOB_RETENTION_HOURS", "24")) * 3600
 
-def get_device():
-    """Get GPU if available, otherwise CPU."""
-    if torch.cuda.is_available():
-        return "cuda"
-    return "cpu"
+# Trim near-silence off long-text chunks before stitching (see silence_trim.py)
+TRIM_SILENCE = os.environ.get("SAYAS_TRIM_SILENCE", "1") != "0"
+
+# Prompt manifest pre-rendered (and pinned in audio_cache) at startup
+MANIFEST_PATH = Path(os.environ.get("SAYAS_MANIFEST", PROJECT_DIR / "prompts.json"))
+PRERENDER_ON_STARTUP = os.environ.get("SAYAS_PRERENDER", "1") != "0"
+
+# Acceleration profile (see acceleration.py)
+ACCEL_PROFILE = os.environ.get("SAYAS_PROFILE", inference.profile)
 
 
 def load_model():
-    """Load Chatterbox TTS model into memory."""
+    """
+    Load Chatterbox TTS model into memory (shared with the WebUI when mounted).
+
+    With WORKER_REPLICAS > 0, requests are routed to a pool of CPU model
+    replicas instead, and `model` is the pool.
+    """
     global model, device
-    device = get_device()
-    print(f"🎤 Loading Chatterbox TTS model on {device}...", file=sys.stderr)
-    model = ChatterboxTTS.from_pretrained(device=device)
-    print(f"✅ Model loaded and ready!", file=sys.stderr)
+    if WORKER_REPLICAS > 0:
+        model = inference.start_worker_pool(WORKER_REPLICAS, WORKER_THREADS, WORKER_PIN_CORES, ACCEL_PROFILE)
+    else:
+        model = inference.load_model(profile_override=ACCEL_PROFILE)
+    device = inference.device
+    admission.sample_rate = model.sr
+    admission.workers = max(1, WORKER_REPLICAS)  # --workers is only known now
     return model
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Load model on startup."""
+    voice_registry.start(watch=True)
     load_model()
+    get_lexicon()  # Compile the pronunciation lexicon before the first request
+    if PRERENDER_ON_STARTUP and MANIFEST_PATH.exists():
+        try:
+            prerenderer.start(load_manifest(MANIFEST_PATH), str(MANIFEST_PATH))
+        except ValueError as e:
+            print(f"⚠️  Prompt manifest not loaded: {e}", file=sys.stderr)
+    resumer = asyncio.create_task(resume_jobs()) if job_store is not None and RESUME_JOBS_ON_STARTUP else None
     yield
     # Cleanup on shutdown
+    if resumer is not None:
+        resumer.cancel()
+    prerenderer.cancel()
+    close_player()
+    output_store.close()
     global model
-    del model
-    if torch.cuda.is_available():
-        torch.cuda.empty_cache()
+    model = None
+    inference.unload_model()
+    voice_registry.stop()
 
 
 app = FastAPI(
@@ -109,8 +203,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount output directory for static files
-app.mount("/output", StaticFiles(directory=str(OUTPUT_DIR)), name="output")
+def client_id(headers, client) -> str:
+    """
+    Who is asking, for fair scheduling: the API key if one is sent
+    (X-API-Key or a bearer token, hashed), otherwise the client IP.
+    """
+    key = headers.get("x-api-key")
+    authorization = headers.get("authorization", "")
+    if not key and authorization.lower().startswith("bearer "):
+        key = authorization[7:].strip()
+    if key:
+        return "key:" + hashlib.sha256(key.encode()).hexdigest()[:12]
+    return "ip:" + (client.host if client else "unknown")
+
+
+@app.middleware("http")
+async def identify_client(request: Request, call_next):
+    """Attribute the inference jobs of a request to its client."""
+    inference.set_client(client_id(request.headers, request.client))
+    return await call_next(request)
+
+
+def mount_webui(path: str = "/ui"):
+    """
+    Mount the Gradio WebUI into this process.
+
+    The WebUI then shares this process's model, voice cache and inference
+    queue instead of loading a second copy of the model.
+    """
+    import gradio as gr
+    import webui
+
+    gr.mount_gradio_app(app, webui.demo, path=path)
+    print(f"🌸 WebUI mounted at {path}", file=sys.stderr)
 
 
 # ============== PYDANTIC MODELS ==============
@@ -133,20 +258,38 @@ class AudioEffects(BaseModel):
     distortion: bool = False
     distortion_amount: float = 0.1
     normalize: bool = True
+    normalize_mode: Literal["loudness", "peak"] = "loudness"  # peak = scale the loudest sample to 0.95
+    target_lufs: float = -16.0  # Loudness target (normalize_mode "loudness")
+    true_peak_db: float = -1.0  # True-peak ceiling (normalize_mode "loudness")
 
 
 class SayAsRequest(BaseModel):
     """Main TTS request - now with OVERKILL options"""
-    voice: str
+    voice: Optional[str] = None  # Optional when the preset names a voice
     text: str
+    preset: Optional[str] = None  # Saved preset: voice, morphing and effects
     output_mode: Literal["play", "return", "both", "save"] = "play"
     use_custom_voice: bool = True
     morphing: Optional[VoiceMorphing] = None
     effects: Optional[AudioEffects] = None
-    output_format: Literal["wav", "mp3", "flac", "ogg"] = "wav"
+    output_format: Literal["wav", "mp3", "flac", "ogg", "opus"] = "wav"
     save_path: Optional[str] = None
     background_music: Optional[str] = None
     background_volume: float = 0.3
+    include_base64: bool = False  # Legacy: also embed the clip as base64
+    deadline_ms: Optional[int] = None  # Give up after this long (504)
+    partial_on_deadline: bool = False  # At the deadline, return the long-text chunks finished so far
+
+
+class StreamRequest(BaseModel):
+    """Streaming TTS request - audio is sent while later chunks generate"""
+    voice: str
+    text: str
+    output_format: Literal["wav", "opus", "ogg", "flac", "mp3"] = "opus"
+    chunk_size: int = DEFAULT_MAX_CHUNK_SIZE
+    silence_duration: float = 0.5
+    normalize: bool = True  # Loudness-normalize chunks as they stream (running measurement)
+    deadline_ms: Optional[int] = None  # The stream ends (as a valid, shorter file) at the deadline
 
 
 class BatchItem(BaseModel):
@@ -160,7 +303,10 @@ class BatchRequest(BaseModel):
     """Batch processing request"""
     items: List[BatchItem]
     output_mode: Literal["return", "save"] = "save"
-    output_format: str = "wav"
+    output_format: Literal["wav", "mp3", "flac", "ogg", "opus"] = "wav"
+    stream: bool = False  # Stream results as NDJSON as each item finishes
+    include_base64: bool = False  # Legacy: also embed each clip as base64
+    deadline_ms: Optional[int] = None  # Items not finished by then fail with "deadline exceeded"
 
 
 class VoicePreset(BaseModel):
@@ -171,6 +317,27 @@ class VoicePreset(BaseModel):
     effects: AudioEffects
 
 
+class BlendRequest(BaseModel):
+    """Named blend of existing voices (speaker conditioning is mixed, not audio)"""
+    name: str
+    voices: Dict[str, float]  # voice name -> weight
+
+
+class PrerenderPrompt(BaseModel):
+    """One prompt to pre-render (same meaning as the /sayas fields)"""
+    text: str
+    voice: Optional[str] = None
+    preset: Optional[str] = None
+    output_format: Literal["wav", "mp3", "flac", "ogg", "opus"] = "wav"
+
+
+class PrerenderRequest(BaseModel):
+    """Pre-render prompts from a list or a manifest file"""
+    prompts: Optional[List[PrerenderPrompt]] = None  # Default: the manifest
+    manifest: Optional[str] = None  # Manifest path inside the project folder (default: prompts.json)
+    replace: bool = False  # Unpin previously pre-rendered audio first
+
+
 class SSMLSegment(BaseModel):
     """SSML-like segment for advanced control"""
     text: str
@@ -182,105 +349,40 @@ class SSMLSegment(BaseModel):
 
 class SSMLRequest(BaseModel):
     """SSML-like request for advanced control"""
-    segments: List[SSMLSegment]
+    ssml: Optional[str] = None  # SSML markup (<speak>, <voice>, <prosody>, <break>, <say-as>)
+    voice: Optional[str] = None  # Voice for text outside any <voice> element
+    segments: List[SSMLSegment] = []  # Legacy segment list (used when ssml is not set)
     output_mode: str = "return"
+    include_base64: bool = False  # Legacy: also embed the clip as base64
+    deadline_ms: Optional[int] = None  # Give up after this long (504)
 
 
 # ============== HELPER FUNCTIONS ==============
 
 def get_available_voices():
-    """Get list of available custom voices."""
-    voices = []
-    if VOICES_DIR.exists():
-        for ext in ['.wav', '.mp3']:
-            for voice_file in VOICES_DIR.glob(f"*{ext}"):
-                voices.append({
-                    "name": voice_file.stem,
-                    "path": str(voice_file),
-                    "type": "custom",
-                    "format": ext[1:]
-                })
-    return voices
-
-
-def play_audio(wav: torch.Tensor, sample_rate: int):
-    """Play audio using pyaudio."""
-    audio_data = wav.cpu().numpy().flatten()
-    audio_data = (audio_data * 32767).astype(np.int16)
-    
-    p = pyaudio.PyAudio()
-    try:
-        stream = p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=sample_rate,
-            output=True
-        )
-        stream.write(audio_data.tobytes())
-        stream.stop_stream()
-        stream.close()
-    finally:
-        p.terminate()
+    """Get list of available custom voices (from the in-memory index)."""
+    return [
+        {
+            **entry.to_dict(inference.conditionals_cached(entry.path, entry.mtime_ns)),
+            "type": "custom"
+        }
+        for entry in voice_registry.entries()
+    ]
+
+
+def play_audio(wav: torch.Tensor, sample_rate: int, label: str = "") -> int:
+    """Queue audio on the server's output device and return the clip id (does not wait)."""
+    return get_player(sample_rate).enqueue(wav, sample_rate, label)
 
 
 def apply_morphing(wav: torch.Tensor, morphing: VoiceMorphing) -> torch.Tensor:
-    """Apply voice morphing - OVERKILL edition"""
-    if morphing.pitch != 1.0:
-        # Pitch shift using resampling
-        pitch_factor = morphing.pitch
-        wav = T.Resample(orig_freq=model.sr, new_freq=int(model.sr * pitch_factor))(wav)
-        if wav.shape[-1] != wav.shape[-1]:
-            wav = wav[..., :int(wav.shape[-1] / pitch_factor)]
-    
-    if morphing.volume != 1.0:
-        wav = wav * morphing.volume
-    
-    return wav
+    """Apply voice morphing - OVERKILL edition (compiled chain, see dsp_chain.py)"""
+    return compile_chain(model.sr, morphing.model_dump())(wav)
 
 
 def apply_effects(wav: torch.Tensor, effects: AudioEffects) -> torch.Tensor:
-    """Apply audio effects - OVERKILL edition"""
-    audio_np = wav.cpu().numpy().flatten()
-    
-    # Reverb
-    if effects.reverb:
-        # Simple reverb simulation
-        reverb_time = int(model.sr * effects.reverb_amount)
-        reverb = np.zeros(len(audio_np) + reverb_time)
-        reverb[:len(audio_np)] = audio_np
-        for i in range(1, 5):
-            delay = int(model.sr * 0.1 * i)
-            decay = 0.5 ** i
-            reverb[delay:delay+len(audio_np)] += audio_np * decay
-        audio_np = reverb[:len(audio_np)]
-    
-    # Echo
-    if effects.echo:
-        echo_samples = int(model.sr * effects.echo_delay)
-        echo = np.zeros(len(audio_np) + echo_samples)
-        echo[:len(audio_np)] = audio_np
-        echo[echo_samples:] += audio_np * 0.5
-        audio_np = echo[:len(audio_np)]
-    
-    # Chorus
-    if effects.chorus:
-        chorus_delay = int(model.sr * 0.02)
-        chorus = np.zeros(len(audio_np) + chorus_delay)
-        chorus[:len(audio_np)] = audio_np
-        chorus[chorus_delay:] += audio_np * effects.chorus_amount
-        audio_np = chorus[:len(audio_np)]
-    
-    # Distortion
-    if effects.distortion:
-        audio_np = np.tanh(audio_np * (1 + effects.distortion_amount * 5))
-    
-    # Normalize
-    if effects.normalize:
-        max_val = np.max(np.abs(audio_np))
-        if max_val > 0:
-            audio_np = audio_np / max_val * 0.95
-    
-    return torch.tensor(audio_np.reshape(1, -1), dtype=wav.dtype)
+    """Apply audio effects - OVERKILL edition (compiled chain, see dsp_chain.py)"""
+    return compile_chain(model.sr, None, effects.model_dump())(wav)
 
 
 def mix_background(wav: torch.Tensor, music_path: str, bg_volume: float) -> torch.Tensor:
@@ -306,78 +408,677 @@ def mix_background(wav: torch.Tensor, music_path: str, bg_volume: float) -> torc
 
 def save_preset(preset: VoicePreset):
     """Save voice preset"""
-    preset_path = PRESETS_DIR / f"{preset.name}.json"
-    with open(preset_path, 'w') as f:
-        json.dump(preset.model_dump(), f, indent=2)
-    return preset_path
+    return preset_store.save(preset.name, preset.model_dump())
 
 
 def load_preset(name: str) -> VoicePreset:
-    """Load voice preset"""
-    preset_path = PRESETS_DIR / f"{name}.json"
-    if not preset_path.exists():
+    """Load voice preset (from memory unless the file changed)"""
+    entry = preset_store.get(name)
+    if entry is None:
         raise HTTPException(status_code=404, detail=f"Preset '{name}' not found")
-    with open(preset_path, 'r') as f:
-        data = json.load(f)
-    return VoicePreset(**data)
+    return VoicePreset(**entry.data)
+
+
+def encode_audio(wav: torch.Tensor, output_format: str, sample_rate: Optional[int] = None) -> bytes:
+    """
+    Encode audio to the given container format, in memory (at the model rate by default).
+
+    "ogg" is Ogg/Opus, as in the streaming endpoints (not torchaudio's Vorbis).
+    """
+    sample_rate = sample_rate or model.sr
+    if output_format in ("opus", "ogg"):
+        return encode_all(wav, sample_rate, output_format)
+    audio_buffer = io.BytesIO()
+    torchaudio.save(audio_buffer, wav, sample_rate, format=output_format.upper())
+    return audio_buffer.getvalue()
+
+
+def transcode_audio(data: bytes, source_format: str, output_format: str) -> bytes:
+    """Re-encode a saved clip into another format."""
+    wav, sample_rate = torchaudio.load(io.BytesIO(data), format="ogg" if source_format == "opus" else source_format)
+    return encode_audio(wav, output_format, sample_rate)
+
+
+# Saved audio, served from GET /output/{id}.{format}
+output_store = OutputStore(
+    OUTPUT_DIR,
+    max_bytes=OUTPUT_QUOTA_BYTES,
+    retention_seconds=OUTPUT_RETENTION_SECONDS,
+    transcode=transcode_audio
+) if not IS_REPLICA_IMPORT else None
+
+
+# Checkpointed long-text jobs (None with SAYAS_CHECKPOINTS=0)
+job_store = (
+    JobStore(JOBS_DIR, retention_seconds=JOB_RETENTION_SECONDS)
+    if CHECKPOINT_JOBS and not IS_REPLICA_IMPORT else None
+)
+
+
+async def save_output(audio_bytes: bytes, output_format: str, save_path: Optional[str] = None) -> Dict:
+    """
+    Save encoded audio off the event loop and return the fields pointing at it.
+
+    Without `save_path` the audio goes into the output store (URL: /output/{id}.{format});
+    a custom `save_path` is written there as is (no URL).
+    """
+    if save_path:
+        await asyncio.to_thread(write_atomic, save_path, audio_bytes)
+        return {"saved_path": str(save_path), "url": None}
+    output_id = await output_store.save(audio_bytes, output_format)
+    return {
+        "output_id": output_id,
+        "saved_path": str(output_store.path(output_id, output_format)),
+        "url": f"/output/{output_id}.{output_format}"
+    }
+
+
+def wants_audio(http_request: Request) -> bool:
+    """Content negotiation: did the client ask for raw audio (Accept: audio/*)?"""
+    return "audio/" in http_request.headers.get("accept", "")
+
+
+def audio_response(audio_bytes: bytes, output_format: str, metadata: Dict) -> Response:
+    """Raw audio response with metadata in X- headers."""
+    headers = {
+        f"X-{key.replace('_', '-').title()}": quote(str(value), safe=" .,:-_/")
+        for key, value in metadata.items()
+    }
+    return Response(content=audio_bytes, media_type=MEDIA_TYPES.get(output_format, "application/octet-stream"), headers=headers)
+
+
+def cache_audio(
+    audio_bytes: bytes,
+    output_format: str,
+    include_base64: bool = False,
+    metadata: Optional[Dict] = None,
+    key: Optional[str] = None
+) -> Dict:
+    """
+    Cache encoded audio and return the JSON fields that point at it.
+
+    Args:
+        audio_bytes: Encoded audio
+        output_format: Format of the audio
+        include_base64: Also embed the audio as base64
+        metadata: Response metadata stored with the audio (for reuse)
+        key: Request key (see render_key) the audio can be found by
+
+    Returns:
+        {"audio_url", "expires_in_seconds"} (+ "audio_base64" if requested)
+    """
+    artifact_id = audio_cache.put(audio_bytes, MEDIA_TYPES.get(output_format, "application/octet-stream"), metadata, key)
+    return artifact_fields(artifact_id, audio_bytes, output_format, include_base64)
+
+
+def artifact_fields(artifact_id: str, audio_bytes: bytes, output_format: str, include_base64: bool = False) -> Dict:
+    """JSON fields pointing at a cached artifact."""
+    fields = {
+        "audio_url": f"/audio/{artifact_id}.{output_format}",
+        "expires_in_seconds": audio_cache.ttl_seconds
+    }
+    if include_base64:
+        fields["audio_base64"] = base64.b64encode(audio_bytes).decode()
+    return fields
+
+
+async def stream_speech(
+    text: str,
+    voice_path: Optional[Path],
+    output_format: str,
+    chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
+    silence_duration: float = 0.5,
+    token: Optional[CancelToken] = None,
+    normalize: bool = True
+):
+    """
+    Synthesize text chunk by chunk and yield encoded audio as it is ready.
+
+    The next chunk is already generating on the inference executor while
+    the current one is encoded and sent, and the encoder stays open across
+    chunks so compressed formats stream as one continuous file. With
+    `normalize`, each chunk is brought to the loudness target measured
+    over everything streamed so far (see loudness.py).
+
+    At the token's deadline the stream is closed after the chunks sent so
+    far (still a valid file). If the consumer stops reading (client gone),
+    the token is cancelled so queued chunks are dropped.
+    """
+    chunks = split_text(text, max_chunk_size=chunk_size)
+    encoder = create_encoder(output_format, model.sr)
+    pauses = boundary_pauses(text, chunks, silence_duration)
+    normalizer = LoudnessNormalizer(model.sr) if normalize else None
+
+    next_wav = asyncio.ensure_future(inference.run(inference.generate, chunks[0], voice_path))
+    finished = False
+    try:
+        for i in range(len(chunks)):
+            try:
+                wav = await next_wav
+            except DeadlineExceeded:
+                print(f"⏱️  Deadline reached, stream ends after {i}/{len(chunks)} chunks", file=sys.stderr)
+                break
+            if TRIM_SILENCE:
+                wav = trim_silence(wav, model.sr)
+            if normalizer is not None:
+                wav = await asyncio.to_thread(normalizer, wav)
+            if i + 1 < len(chunks):
+                next_wav = asyncio.ensure_future(inference.run(inference.generate, chunks[i + 1], voice_path))
+                wav = torch.cat([wav, create_silence(pauses[i], model.sr)], dim=-1)
+            data = await asyncio.to_thread(encoder.write, wav)
+            if data:
+                yield data
+        data = await asyncio.to_thread(encoder.close)
+        finished = True
+        if data:
+            yield data
+    finally:
+        if not next_wav.done():
+            next_wav.cancel()
+        if token is not None and not finished:
+            token.cancel(CLIENT_DISCONNECTED)
+
+
+def render_key(voice_path: Optional[Path], text: str, *settings) -> str:
+    """
+    Cache key for a rendering: voice sample version + normalized text + settings.
+
+    Built from normalized text, so "$5" and "5 dollars" share one entry.
+    """
+    entry = voice_registry.get(voice_path.stem) if voice_path else None
+    voice_id = [str(voice_path), entry.mtime_ns if entry else None] if voice_path else None
+    payload = json.dumps([voice_id, text, settings], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def find_voice(name: Optional[str]) -> Optional[Path]:
+    """Find a custom voice file by name (None = default voice)."""
+    if not name:
+        return None
+    return voice_registry.path(name)
+
+
+def resolve_settings(request: SayAsRequest):
+    """
+    Resolve a request's preset, voice and DSP settings.
+
+    Explicit request fields win over the preset's.
+
+    Returns:
+        (voice name, voice path or None, morphing dict, effects dict, compiled chain)
+
+    Raises:
+        HTTPException: 404 for an unknown preset, 400 if no voice is given
+    """
+    preset = None
+    if request.preset:
+        preset = preset_store.get(request.preset)
+        if preset is None:
+            raise HTTPException(status_code=404, detail=f"Preset '{request.preset}' not found")
+    voice = request.voice or (preset.voice if preset else None)
+    if not voice:
+        raise HTTPException(status_code=400, detail="Either voice or a preset with a voice is required")
+
+    morphing = request.morphing.model_dump() if request.morphing else (preset.data.get("morphing") if preset else None)
+    effects = request.effects.model_dump() if request.effects else (preset.data.get("effects") if preset else None)
+    if preset and not request.morphing and not request.effects:
+        chain = preset.chain(model.sr)
+    else:
+        chain = compile_chain(model.sr, morphing, effects)
+
+    voice_path = find_voice(voice) if request.use_custom_voice else None
+    return voice, voice_path, morphing, effects, chain
+
+
+def estimate_cost(texts: List[str], output_format: str, chunk_size: int = DEFAULT_MAX_CHUNK_SIZE) -> Cost:
+    """Estimated compute and memory cost of generating `texts` (see admission.py)."""
+    cost = Cost(0.0, 0)
+    for text in texts:
+        cost += admission.estimate(len(text), -(-len(text) // chunk_size), output_format)
+    return cost
+
+
+def admit(cost: Cost) -> Ticket:
+    """
+    Reserve interactive budget for a request.
+
+    Raises:
+        HTTPException: 429 with Retry-After when the server is saturated
+    """
+    try:
+        return admission.admit(cost, INTERACTIVE)
+    except Rejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Server busy ({e.reason}), retry in {e.retry_after}s",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+async def admit_bulk(cost: Cost, token: Optional[CancelToken] = None) -> Ticket:
+    """
+    Reserve bulk budget for one job, waiting (not 429) until there is room.
+
+    Raises:
+        Cancelled: If the token fires while waiting
+    """
+    while True:
+        try:
+            return admission.admit(cost, BULK)
+        except Rejected:
+            if token is not None:
+                token.check()
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+
+def request_token(deadline_ms: Optional[int] = None) -> CancelToken:
+    """
+    Cancel token for the current request; inference jobs it queues are
+    dropped when the token fires (client gone or deadline reached).
+    """
+    token = CancelToken(deadline_ms)
+    if token.deadline is not None:
+        asyncio.get_running_loop().call_later(token.remaining(), token.cancel, DEADLINE_EXCEEDED)
+    inference.set_token(token)
+    return token
+
+
+def watch_disconnect(http_request: Request, token: CancelToken) -> asyncio.Task:
+    """Cancel `token` if the client disconnects. Cancel the returned task when the request is done."""
+    async def watch():
+        while not token.cancelled:
+            if await http_request.is_disconnected():
+                token.cancel(CLIENT_DISCONNECTED)
+                return
+            await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+
+    return asyncio.create_task(watch())
+
+
+def cancelled_error(error: Cancelled) -> HTTPException:
+    """HTTP error for a cancelled request: 504 past the deadline, 499 for a client that left."""
+    if isinstance(error, DeadlineExceeded):
+        return HTTPException(status_code=504, detail="Deadline exceeded")
+    return HTTPException(status_code=499, detail=str(error))
+
+
+async def release_after(stream, ticket: Ticket):
+    """Pass a streamed body through, holding its admission ticket until it ends."""
+    with ticket:
+        async for data in stream:
+            yield data
+
+
+async def synthesize(text: str, voice_path: Optional[Path], partial: bool = False):
+    """
+    Generate (normalized) text on the inference queue.
+
+    Long text with a custom voice is split and stitched.
+
+    Args:
+        partial: At the deadline, return the long-text chunks finished so far
+
+    Returns:
+        (wav, whether the text was split, whether the audio is complete,
+        TrimStats of the stitching or None)
+
+    Raises:
+        Cancelled: When the request's cancel token fires
+    """
+    needs_split = len(text) > LONG_TEXT_THRESHOLD and voice_path is not None
+    if needs_split:
+        wav, complete, trim = await generate_speech_long_text(text, voice_path, partial=partial)
+    else:
+        wav, complete, trim = await inference.run(inference.generate, text, voice_path), True, None
+    return wav, needs_split, complete, trim
+
+
+def trim_fields(trim: Optional[TrimStats], wav: torch.Tensor, audio_bytes: Optional[bytes] = None) -> Dict:
+    """Silence trimming report of stitched long text (empty otherwise); bytes saved needs the encoded clip."""
+    if trim is None:
+        return {}
+    bytes_per_sample = len(audio_bytes) / max(1, wav.shape[-1]) if audio_bytes is not None else None
+    return trim.to_dict(model.sr, bytes_per_sample)
+
+
+def clip_metadata(voice: str, wav: torch.Tensor, output_format: str, needs_split: bool) -> Dict:
+    """Metadata returned (and cached) with a /sayas clip."""
+    return {
+        "voice": voice,
+        "sample_rate": model.sr,
+        "duration_seconds": len(wav[0]) / model.sr,
+        "format": output_format,
+        "long_text_processed": needs_split
+    }
+
+
+async def prerender_prompt(prompt: Prompt) -> bool:
+    """
+    Render one manifest prompt exactly as /sayas would and pin it in the cache.
+
+    Returns:
+        True if it was generated, False if it was already cached
+    """
+    if model is None:
+        raise RuntimeError("Model not loaded")
+    # Warm-up work never delays live requests
+    inference.set_client("prerender")
+    inference.set_lane(BULK)
+    request = SayAsRequest(
+        voice=prompt.voice,
+        text=prompt.text,
+        preset=prompt.preset,
+        output_mode="return",
+        output_format=prompt.output_format
+    )
+    voice, voice_path, morphing, effects, chain = resolve_settings(request)
+    if voice_path is None and voice != "Default Voice":
+        raise HTTPException(status_code=404, detail=f"Voice '{voice}' not found")
+    text = normalize_text(request.text)
+    key = render_key(voice_path, text, morphing, effects, request.output_format)
+
+    found = audio_cache.find(key)
+    if found is not None and audio_cache.pin(found[0]):
+        return False
+
+    wav, needs_split, _, _ = await synthesize(text, voice_path)
+    wav = await asyncio.to_thread(chain, wav)
+    audio_bytes = await asyncio.to_thread(encode_audio, wav, request.output_format)
+    metadata = clip_metadata(voice, wav, request.output_format, needs_split)
+    audio_cache.put(audio_bytes, MEDIA_TYPES.get(request.output_format, "application/octet-stream"), metadata, key, pinned=True)
+    return True
+
+
+# Background manifest renderer (progress at GET /prerender)
+prerenderer = Prerenderer(prerender_prompt)
+
+
+def plan_batch(items: List[BatchItem]) -> List[Dict]:
+    """
+    Plan a batch: drop duplicate items and group the rest by voice.
+
+    Identical (voice, normalized text, morphing) items are rendered once and fanned out
+    to every index that asked for them. Jobs are ordered voice by voice so
+    consecutive jobs reuse the same speaker conditionals.
+
+    Returns:
+        List of jobs: {"voice", "text", "morphing", "indices"}
+    """
+    jobs = {}
+    for i, item in enumerate(items):
+        text = normalize_text(item.text)
+        morph_key = item.morphing.model_dump_json() if item.morphing else None
+        key = (item.voice, text, morph_key)
+        if key in jobs:
+            jobs[key]["indices"].append(i)
+        else:
+            jobs[key] = {"voice": item.voice, "text": text, "morphing": item.morphing, "indices": [i]}
+
+    # Stable sort keeps submission order within each voice
+    return sorted(jobs.values(), key=lambda job: job["voice"])
+
+
+async def render_batch_job(
+    job: Dict,
+    voice_path: Optional[Path],
+    output_mode: str,
+    output_format: str,
+    include_base64: bool = False,
+    token: Optional[CancelToken] = None
+) -> Dict:
+    """
+    Render one planned batch job: wait for room in the bulk admission
+    budget, generate on the inference executor, then save (output store,
+    I/O pool) or cache the encoded audio.
+
+    Returns:
+        Result fields shared by every index of the job
+    """
+    with await admit_bulk(estimate_cost([job["text"]], output_format), token):
+        audio_bytes = await inference.run(render_batch_audio, job, voice_path, output_format)
+
+    if output_mode == "save":
+        saved = await save_output(audio_bytes, output_format)
+        return {
+            "success": True,
+            "output_id": saved["output_id"],
+            "path": saved["saved_path"],
+            "url": saved["url"]
+        }
+
+    return {
+        "success": True,
+        **cache_audio(audio_bytes, output_format, include_base64)
+    }
+
+
+def render_batch_audio(job: Dict, voice_path: Optional[Path], output_format: str) -> bytes:
+    """Generate, morph and encode one batch job (runs on the inference executor)."""
+    wav = inference.generate(job["text"], voice_path)
+
+    if job["morphing"]:
+        wav = apply_morphing(wav, job["morphing"])
+
+    return encode_audio(wav, output_format)
+
+
+async def run_batch(request: BatchRequest, jobs: List[Dict], token: Optional[CancelToken] = None):
+    """
+    Run a planned batch (see plan_batch) concurrently, yielding per-item
+    results as they finish.
+
+    At most BATCH_MAX_IN_FLIGHT jobs are queued on the inference executor at
+    once, so a huge batch neither floods the queue nor holds every result
+    in memory before the first one is returned.
+    """
+    voice_paths = {voice: find_voice(voice) for voice in {job["voice"] for job in jobs}}
+    max_in_flight = BATCH_MAX_IN_FLIGHT or max(2, 2 * max(1, WORKER_REPLICAS))
+
+    pending = {}
+    next_job = 0
+    try:
+        while next_job < len(jobs) or pending:
+            while next_job < len(jobs) and len(pending) < max_in_flight:
+                job = jobs[next_job]
+                task = asyncio.ensure_future(render_batch_job(
+                    job, voice_paths[job["voice"]],
+                    request.output_mode, request.output_format, request.include_base64, token
+                ))
+                pending[task] = job
+                next_job += 1
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job = pending.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    # Including Cancelled: once the deadline passes, the rest fail fast
+                    result = {"success": False, "error": str(e)}
+                for i in job["indices"]:
+                    yield {"index": i, **result}
+    finally:
+        # Consumer gone (client disconnected): drop the jobs still queued
+        for task in pending:
+            task.cancel()
 
 
 def get_available_presets():
     """Get list of available presets"""
-    presets = []
-    if PRESETS_DIR.exists():
-        for preset_file in PRESETS_DIR.glob("*.json"):
-            presets.append(preset_file.stem)
-    return presets
+    return preset_store.names()
 
 
-def generate_speech_long_text(
+async def generate_speech_long_text(
     text: str,
-    voice_path: str = None,
+    voice_path: Optional[Path] = None,
     chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
-    silence_duration: float = 0.5
+    silence_duration: float = 0.5,
+    partial: bool = False
 ):
     """
     Generate speech for long text by splitting into chunks and stitching.
+
+    Every chunk is its own job on the inference queue, so the fair
+    scheduler can slot other clients' work in between (and a worker pool
+    renders chunks in parallel). When the request's cancel token fires,
+    the chunks still queued are dropped and this returns right away.
     
     Args:
         text: Long text to convert
         voice_path: Optional path to voice sample
         chunk_size: Maximum characters per chunk
-        silence_duration: Seconds of silence between chunks
+        silence_duration: Base pause between chunks (scaled by the punctuation there)
+        partial: At the deadline, return the leading chunks finished so far
         
     Returns:
-        Combined audio tensor
+        (combined audio tensor, whether every chunk is in it, TrimStats)
+
+    Raises:
+        Cancelled: When cancelled (or at the deadline without `partial`)
     """
-    global model
-    
-    print(f"📝 Long text detected ({len(text)} chars), splitting into chunks...", file=sys.stderr)
-    
-    # Split text
     chunks = split_text(text, max_chunk_size=chunk_size)
-    print(f"✂️  Split into {len(chunks)} chunks", file=sys.stderr)
-    
-    # Generate audio for each chunk
-    segments = []
-    for i, chunk in enumerate(chunks, 1):
-        print(f"🎤 Processing chunk {i}/{len(chunks)} ({len(chunk)} chars)...", file=sys.stderr)
-        
-        if voice_path:
-            wav = model.generate(chunk, audio_prompt_path=str(voice_path))
-        else:
-            wav = model.generate(chunk)
-        
-        segments.append(wav)
-    
-    # Stitch together with silence
-    print(f"🔗 Stitching {len(segments)} segments with {silence_duration}s silence...", file=sys.stderr)
-    combined = stitch_audio_segments(segments, model.sr, silence_duration)
-    
-    total_chars = sum(len(c) for c in chunks)
+    print(f"📝 Long text ({len(text)} chars) split into {len(chunks)} chunks", file=sys.stderr)
+
+    job = None
+    if job_store is not None:
+        job = await asyncio.to_thread(
+            job_store.open, voice_path.stem if voice_path else None, voice_path,
+            text, chunks, job_params(chunk_size, silence_duration)
+        )
+
+    async def render(index: int, chunk: str) -> torch.Tensor:
+        if job is not None and job.has(index):
+            try:
+                return torch.from_numpy(await asyncio.to_thread(job.load, index))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Checkpoint unusable, rendering chunk {index} again: {e}", file=sys.stderr)
+                job.forget(index)
+        return await inference.run(render_chunk, job, index, chunk, voice_path)
+
+    try:
+        tasks = [asyncio.ensure_future(render(i, chunk)) for i, chunk in enumerate(chunks)]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            # Also when this request is cancelled itself (e.g. a resume at shutdown):
+            # queued jobs are dropped; a running chunk's result is ignored
+            for task in tasks:
+                task.cancel()
+
+        def failure(task):
+            return Cancelled("cancelled") if task.cancelled() else task.exception()
+
+        # Leading chunks that finished; the first failure explains the rest
+        segments = []
+        for task in tasks:
+            if task not in done or failure(task) is not None:
+                break
+            segments.append(task.result())
+        errors = [failure(task) for task in tasks if task in done and failure(task) is not None]
+
+        if len(segments) < len(chunks):
+            error = errors[0]
+            if not (partial and segments and isinstance(error, DeadlineExceeded)):
+                raise error
+            print(f"⏱️  Deadline reached, returning {len(segments)}/{len(chunks)} chunks", file=sys.stderr)
+
+        # Chunks trimmed to their speech, with pauses from the punctuation between them
+        pauses = boundary_pauses(text, chunks, silence_duration)
+        combined, offsets, trim = stitch_chunks(segments, model.sr, pauses, silence_duration, TRIM_SILENCE)
+        if job is not None and len(segments) == len(chunks):
+            await asyncio.to_thread(job.finish, offsets)
+    finally:
+        # After finish, so the store records the job as complete
+        if job is not None:
+            job_store.close(job)
+
     duration = len(combined[0]) / model.sr
-    print(f"✅ Generated {duration:.2f}s of audio from {total_chars} characters", file=sys.stderr)
+    print(
+        f"✅ Generated {duration:.2f}s of audio from {sum(len(c) for c in chunks[:len(segments)])} characters "
+        f"({trim.trim_rate:.0%} silence trimmed)", file=sys.stderr
+    )
     
-    return combined
+    return combined, len(segments) == len(chunks), trim
+
+
+def job_params(chunk_size: int, silence_duration: float) -> Dict:
+    """Settings a checkpointed chunk depends on (part of the job id)."""
+    return {
+        "chunk_size": chunk_size,
+        "silence_duration": silence_duration,
+        "sample_rate": model.sr,
+        "profile": inference.profile
+    }
+
+
+def render_chunk(job: Optional[Job], index: int, chunk: str, voice_path: Optional[Path]) -> torch.Tensor:
+    """
+    Render one long-text chunk and checkpoint it (runs on the inference executor).
+
+    Checks the job again when the chunk comes up, in case another request
+    rendering the same job finished it meanwhile.
+    """
+    if job is not None and job.has(index):
+        try:
+            return torch.from_numpy(job.load(index))
+        except (OSError, ValueError):
+            job.forget(index)
+    wav = inference.generate(chunk, voice_path)
+    if job is not None:
+        job.save(index, wav)
+    return wav
+
+
+async def resume_jobs():
+    """
+    Finish long-text jobs a restart interrupted, in the bulk lane, so a
+    resubmitted request only has to stitch them.
+
+    Jobs whose voice sample changed or was removed, or that were made with
+    other settings (acceleration profile), are left to expire.
+    """
+    inference.set_client("resume")
+    inference.set_lane(BULK)
+    for job in await asyncio.to_thread(job_store.incomplete):
+        voice_path = find_voice(job.voice)
+        params = job.params
+        try:
+            if (
+                voice_path is None
+                or await asyncio.to_thread(voice_hash, voice_path) != job.voice_hash
+                or params != job_params(params["chunk_size"], params["silence_duration"])
+            ):
+                print(f"⏭️  Not resuming job {job.id}: voice or settings changed", file=sys.stderr)
+                continue
+            text = await asyncio.to_thread(job.text)
+            await generate_speech_long_text(text, voice_path, params["chunk_size"], params["silence_duration"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"⚠️  Resuming job {job.id} failed: {e}", file=sys.stderr)
+
+
+def render_ssml_job(job: RenderJob, voice_path: Optional[Path]) -> torch.Tensor:
+    """Render one SSML plan job with its prosody (runs on the inference executor)."""
+    wav = inference.generate(job.text, voice_path, **job.prosody.generate_kwargs())
+    return compile_chain(model.sr, job.prosody.morphing())(wav)
+
+
+async def run_ssml_plan(plan: SynthesisPlan) -> torch.Tensor:
+    """
+    Render an SSML plan and assemble it.
+
+    Jobs are queued voice by voice (conditioning reuse) and all at once,
+    so with a worker pool independent segments render in parallel.
+    """
+    voice_paths = {voice: find_voice(voice) for voice in {job.voice for job in plan.jobs}}
+    for voice, path in voice_paths.items():
+        if voice and path is None:
+            raise HTTPException(status_code=404, detail=f"Voice '{voice}' not found")
+    rendered = await asyncio.gather(*[
+        inference.run(render_ssml_job, job, voice_paths[job.voice]) for job in plan.jobs
+    ])
+    return assemble(plan, list(rendered), model.sr)
 
 
 # ============== API ENDPOINTS ==============
@@ -403,12 +1104,22 @@ async def root():
         ],
         "endpoints": {
             "GET /voices": "List available voices",
+            "POST /voices/{name}": "Upload a voice sample (raw audio body)",
+            "POST /blends": "Create a named blend of voices",
             "POST /sayas": "Generate speech with OVERKILL options",
+            "POST /sayas/stream": "Stream speech while it generates (opus, mp3, flac, wav)",
             "POST /batch": "Batch process multiple texts",
             "POST /ssml": "SSML-like advanced control",
             "GET /presets": "List voice presets",
             "POST /presets": "Save voice preset",
             "GET /presets/{name}": "Load voice preset",
+            "GET /audio/{id}": "Fetch returned audio (Range supported)",
+            "GET /output/{id}.{format}": "Fetch saved audio (other formats transcoded on demand)",
+            "POST /prerender": "Pre-render and pin prompts (list or manifest)",
+            "GET /prerender": "Pre-render progress",
+            "GET /playback/queue": "Server playback queue",
+            "POST /playback/skip": "Skip the clip playing on the server",
+            "POST /playback/stop": "Stop server playback and clear the queue",
             "GET /health": "Health check",
             "WS /stream": "WebSocket streaming"
         }
@@ -422,22 +1133,92 @@ async def list_voices():
     return {
         "default": "Chatterbox Default",
         "custom": [v["name"] for v in custom_voices],
+        "details": custom_voices,
         "total": len(custom_voices) + 1
     }
 
 
+@app.post("/voices/{name}")
+async def upload_voice(name: str, http_request: Request):
+    """
+    Upload a voice sample as the raw request body (any format torchaudio reads).
+
+    The clip is normalized once here (mono 24 kHz WAV, silence trimmed,
+    best 10 seconds kept) and its speaker conditionals are computed right
+    away, so the first synthesis with the voice is as fast as any other.
+    """
+    voice_name = "".join(c for c in name.strip() if c.isalnum() or c in (' ', '-', '_'))
+    if not voice_name:
+        raise HTTPException(status_code=400, detail="Invalid voice name")
+    body = await http_request.body()
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty audio body")
+
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        tmp.write(body)
+        upload_path = tmp.name
+    try:
+        dest = await asyncio.to_thread(ingest_voice, upload_path, voice_name, VOICES_DIR)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read audio: {e}")
+    finally:
+        os.remove(upload_path)
+
+    voice_registry.refresh()
+    await inference.run(inference.precompute_conditionals, dest)
+    return {
+        "success": True,
+        "voice": voice_name,
+        **voice_registry.get(voice_name).to_dict(inference.conditionals_cached(dest, dest.stat().st_mtime_ns))
+    }
+
+
+@app.post("/blends")
+async def create_blend(request: BlendRequest):
+    """
+    Create (or replace) a named voice blend.
+
+    The blend is used by name like any voice. Its conditioning is mixed
+    from the component voices' cached conditioning, so generating with it
+    costs exactly one normal inference pass.
+    """
+    blend_name = "".join(c for c in request.name.strip() if c.isalnum() or c in (' ', '-', '_'))
+    if not blend_name:
+        raise HTTPException(status_code=400, detail="Invalid blend name")
+    try:
+        blend_path = save_blend(VOICES_DIR, blend_name, request.voices)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    voice_registry.refresh()
+    await inference.run(inference.precompute_conditionals, blend_path)
+    entry = voice_registry.get(blend_name)
+    return {
+        "success": True,
+        "voice": blend_name,
+        "weights": json.loads(blend_path.read_text(encoding="utf-8"))["voices"],
+        **entry.to_dict(inference.conditionals_cached(entry.path, entry.mtime_ns))
+    }
+
+
 @app.post("/sayas")
-async def sayas(request: SayAsRequest):
+async def sayas(request: SayAsRequest, http_request: Request):
     """
     Generate speech from text with OVERKILL options.
 
     - **voice**: Name of the voice to use
     - **text**: Text to convert to speech
+    - **preset**: Saved preset name (its voice/morphing/effects fill in unset fields)
     - **output_mode**: "play", "return", "both", or "save"
     - **morphing**: Pitch, speed, volume adjustments
     - **effects**: Reverb, echo, chorus, distortion
     - **output_format**: wav, mp3, flac, ogg
     - **background_music**: Path to background music file
+
+    Returned audio is raw bytes if the client sends `Accept: audio/*`
+    (metadata in X- headers), otherwise JSON with a short-lived `audio_url`.
     
     Long text (900+ chars) with custom voice is automatically split and stitched.
     """
@@ -446,156 +1227,197 @@ async def sayas(request: SayAsRequest):
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
 
-    # Find voice file if exists
-    voice_path = None
-    if request.use_custom_voice:
-        for ext in ['.wav', '.mp3']:
-            vp = VOICES_DIR / f"{request.voice}{ext}"
-            if vp.exists():
-                voice_path = vp
-                break
-
-    # Check if we need long text handling
-    needs_split = (
-        len(request.text) > LONG_TEXT_THRESHOLD and
-        voice_path is not None
-    )
-
-    # Generate speech
-    try:
-        if needs_split:
-            wav = generate_speech_long_text(
-                request.text,
-                str(voice_path) if voice_path else None
-            )
-        else:
-            if voice_path and request.use_custom_voice:
-                wav = model.generate(request.text, audio_prompt_path=str(voice_path))
-            else:
-                wav = model.generate(request.text)
-
-        # Apply morphing
-        if request.morphing:
-            wav = apply_morphing(wav, request.morphing)
-
-        # Apply effects
-        if request.effects:
-            wav = apply_effects(wav, request.effects)
-
-        # Mix background music
-        if request.background_music and Path(request.background_music).exists():
-            wav = mix_background(wav, request.background_music, request.background_volume)
-
-        # Play on server if requested
-        if request.output_mode in ["play", "both"]:
-            print(f"🔊 Playing audio...", file=sys.stderr)
-            play_audio(wav, model.sr)
-
-        # Save or return
-        if request.output_mode == "save" or request.save_path:
-            output_path = request.save_path or OUTPUT_DIR / f"sayas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{request.output_format}"
-            torchaudio.save(str(output_path), wav, model.sr)
+    voice, voice_path, morphing, effects, chain = resolve_settings(request)
+
+    # Spoken form of the text (numbers, dates, lexicon) - also the cache key
+    text = normalize_text(request.text)
+
+    # Equivalent request already rendered (or pre-rendered)? Serve it from the cache
+    reuse_key = None
+    if REUSE_AUDIO and request.output_mode == "return" and not request.save_path and not request.background_music:
+        reuse_key = render_key(voice_path, text, morphing, effects, request.output_format)
+        found = audio_cache.find(reuse_key)
+        if found is not None:
+            artifact_id, artifact = found
+            metadata = {**artifact.metadata, "cache_hit": True}
+            if wants_audio(http_request):
+                return audio_response(artifact.data, request.output_format, metadata)
             return {
                 "success": True,
-                "voice": request.voice,
                 "text": request.text,
-                "saved_path": str(output_path),
-                "url": f"/output/{Path(output_path).name}",
-                "long_text_processed": needs_split
+                **metadata,
+                **artifact_fields(artifact_id, artifact.data, request.output_format, request.include_base64)
             }
 
-        if request.output_mode in ["return", "both"]:
-            # Convert to bytes
-            audio_buffer = io.BytesIO()
-            torchaudio.save(audio_buffer, wav, model.sr, format=request.output_format.upper())
-            audio_buffer.seek(0)
-            audio_base64 = base64.b64encode(audio_buffer.read()).decode()
+    # Generate speech (admitted against the compute/memory budgets); queued
+    # work is dropped if the client leaves or the deadline passes
+    token = request_token(request.deadline_ms)
+    with admit(estimate_cost([text], request.output_format)):
+        watcher = watch_disconnect(http_request, token)
+        try:
+            wav, needs_split, complete, trim = await synthesize(text, voice_path, partial=request.partial_on_deadline)
+            if not request.partial_on_deadline:
+                token.check()
+            partial = {} if complete else {"partial": True}
+
+            # Apply morphing + effects (compiled chain; loudness measurement is
+            # heavy on long clips, so off the event loop)
+            wav = await asyncio.to_thread(chain, wav)
+
+            # Mix background music
+            if request.background_music and Path(request.background_music).exists():
+                wav = mix_background(wav, request.background_music, request.background_volume)
+
+            # Queue for playback on the server (does not wait for it to finish)
+            playback_id = None
+            if request.output_mode in ["play", "both"]:
+                print(f"🔊 Queued for playback...", file=sys.stderr)
+                playback_id = play_audio(wav, model.sr, label=voice)
+
+            # Save or return
+            if request.output_mode == "save" or request.save_path:
+                # A custom save_path's extension picks the format, as before
+                suffix = Path(request.save_path).suffix.lstrip(".").lower() if request.save_path else ""
+                save_format = suffix if suffix in MEDIA_TYPES else request.output_format
+                audio_bytes = await asyncio.to_thread(encode_audio, wav, save_format)
+                return {
+                    "success": True,
+                    "voice": voice,
+                    "text": request.text,
+                    **await save_output(audio_bytes, save_format, request.save_path),
+                    "long_text_processed": needs_split,
+                    **trim_fields(trim, wav, audio_bytes),
+                    **partial
+                }
+
+            if request.output_mode in ["return", "both"]:
+                # Convert to bytes (off the event loop)
+                audio_bytes = await asyncio.to_thread(encode_audio, wav, request.output_format)
+                metadata = {
+                    **clip_metadata(voice, wav, request.output_format, needs_split),
+                    **trim_fields(trim, wav, audio_bytes),
+                    **partial
+                }
+
+                # Partial audio is never reused for a later request
+                cached = cache_audio(
+                    audio_bytes, request.output_format, request.include_base64, metadata,
+                    reuse_key if complete else None
+                )
+                if wants_audio(http_request):
+                    return audio_response(audio_bytes, request.output_format, metadata)
+
+                return {
+                    "success": True,
+                    "text": request.text,
+                    **metadata,
+                    **cached
+                }
 
             return {
                 "success": True,
-                "voice": request.voice,
+                "voice": voice,
                 "text": request.text,
-                "sample_rate": model.sr,
-                "duration_seconds": len(wav[0]) / model.sr,
-                "format": request.output_format,
-                "audio_base64": audio_base64,
-                "audio_url": f"data:audio/{request.output_format};base64," + audio_base64,
-                "long_text_processed": needs_split
+                "queued": True,
+                "playback_id": playback_id,
+                "long_text_processed": needs_split,
+                **trim_fields(trim, wav),
+                **partial
             }
 
-        return {
-            "success": True,
-            "voice": request.voice,
-            "text": request.text,
-            "played": True,
-            "long_text_processed": needs_split
-        }
+        except Cancelled as e:
+            raise cancelled_error(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            watcher.cancel()
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/sayas/stream")
+async def sayas_stream(request: StreamRequest):
+    """
+    Stream speech as it is generated - OVERKILL edition
+
+    Text is split into chunks; each chunk is encoded and sent as soon as it
+    is synthesized, so playback can start after the first chunk. `opus`
+    (Ogg/Opus at speech bitrate) is the low-bandwidth choice.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="No text provided")
+
+    voice_path = find_voice(request.voice)
+    try:
+        create_encoder(request.output_format, model.sr).close()
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    text = normalize_text(request.text)
+    ticket = admit(estimate_cost([text], request.output_format, request.chunk_size))
+    token = request_token(request.deadline_ms)
+    return StreamingResponse(
+        release_after(
+            stream_speech(
+                text, voice_path, request.output_format, request.chunk_size, request.silence_duration,
+                token, request.normalize
+            ),
+            ticket
+        ),
+        media_type=STREAMING_MEDIA_TYPES[request.output_format]
+    )
 
 
 @app.post("/batch")
-async def batch_tts(request: BatchRequest):
-    """Batch process multiple TTS requests - OVERKILL edition"""
+async def batch_tts(request: BatchRequest, http_request: Request):
+    """
+    Batch process multiple TTS requests - OVERKILL edition
+
+    Duplicate items are rendered once, items are grouped by voice, and jobs
+    run concurrently on the inference executor (or worker pool).
+    With **stream** set, results come back as NDJSON lines as each item
+    finishes, followed by a summary line.
+    """
     global model
     
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
-    results = []
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
-    for i, item in enumerate(request.items):
-        try:
-            # Find voice
-            voice_path = None
-            for ext in ['.wav', '.mp3']:
-                vp = VOICES_DIR / f"{item.voice}{ext}"
-                if vp.exists():
-                    voice_path = vp
-                    break
-            
-            # Generate
-            if voice_path:
-                wav = model.generate(item.text, audio_prompt_path=str(voice_path))
-            else:
-                wav = model.generate(item.text)
-            
-            # Apply morphing
-            if item.morphing:
-                wav = apply_morphing(wav, item.morphing)
-            
-            # Save
-            if request.output_mode == "save":
-                output_path = OUTPUT_DIR / f"batch_{timestamp}_{i:03d}.{request.output_format}"
-                torchaudio.save(str(output_path), wav, model.sr)
-                results.append({
-                    "index": i,
-                    "success": True,
-                    "path": str(output_path),
-                    "url": f"/output/{output_path.name}"
-                })
-            else:
-                # Return base64
-                audio_buffer = io.BytesIO()
-                torchaudio.save(audio_buffer, wav, model.sr, format=request.output_format.upper())
-                audio_buffer.seek(0)
-                results.append({
-                    "index": i,
-                    "success": True,
-                    "audio_base64": base64.b64encode(audio_buffer.read()).decode()
-                })
-                
-        except Exception as e:
-            results.append({
-                "index": i,
-                "success": False,
-                "error": str(e)
-            })
+    # Batch items queue in the bulk lane, behind interactive requests
+    inference.set_lane(BULK)
+
+    # Duplicates are rendered once. Each planned job is admitted against
+    # the bulk budget as it is queued (see render_batch_job), so a big batch
+    # waits for room instead of holding the budget that /sayas relies on
+    jobs = plan_batch(request.items)
+    token = request_token(request.deadline_ms)
+    batch_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    if request.stream:
+        async def ndjson():
+            total = successful = 0
+            async for result in run_batch(request, jobs, token):
+                total += 1
+                successful += result["success"]
+                yield json.dumps(result) + "\n"
+            yield json.dumps({
+                "batch_id": batch_id,
+                "total": total,
+                "successful": successful,
+                "done": True
+            }) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    watcher = watch_disconnect(http_request, token)
+    try:
+        results = [result async for result in run_batch(request, jobs, token)]
+    finally:
+        watcher.cancel()
+    results.sort(key=lambda r: r["index"])
     
     return {
-        "batch_id": timestamp,
+        "batch_id": batch_id,
         "total": len(request.items),
         "successful": sum(1 for r in results if r["success"]),
         "results": results
@@ -603,61 +1425,202 @@ async def batch_tts(request: BatchRequest):
 
 
 @app.post("/ssml")
-async def ssml_tts(request: SSMLRequest):
-    """SSML-like advanced TTS control - OVERKILL edition"""
+async def ssml_tts(request: SSMLRequest, http_request: Request):
+    """
+    SSML TTS control - OVERKILL edition.
+
+    The markup (or legacy segment list) is compiled into a plan: breaks
+    become silence without a model call, adjacent same-voice text is
+    merged, jobs are grouped by voice and rendered in parallel, and the
+    result is assembled in one buffer.
+    """
     global model
     
     if model is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
-    segments_audio = []
-    
-    for segment in request.segments:
-        # Find voice for segment
-        voice_path = None
-        if segment.voice:
-            for ext in ['.wav', '.mp3']:
-                vp = VOICES_DIR / f"{segment.voice}{ext}"
-                if vp.exists():
-                    voice_path = vp
-                    break
-        
-        # Generate segment
-        if voice_path:
-            wav = model.generate(segment.text, audio_prompt_path=str(voice_path))
+    try:
+        if request.ssml:
+            plan = compile_ssml(request.ssml, request.voice)
         else:
-            wav = model.generate(segment.text)
-        
-        # Apply segment-specific morphing
-        if segment.pitch or segment.speed:
-            morph = VoiceMorphing(
-                pitch=segment.pitch or 1.0,
-                speed=segment.speed or 1.0,
-                volume=1.0
-            )
-            wav = apply_morphing(wav, morph)
-        
-        segments_audio.append(wav)
+            plan = compile_plan([
+                Speech(
+                    segment.text,
+                    segment.voice or request.voice,
+                    Prosody(pitch=segment.pitch or 1.0, speed=segment.speed or 1.0, emotion=segment.emotion)
+                )
+                for segment in request.segments
+            ])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Concatenate all segments
-    if segments_audio:
-        final_wav = torch.cat(segments_audio, dim=-1)
+    if plan.jobs:
+        token = request_token(request.deadline_ms)
+        watcher = watch_disconnect(http_request, token)
+        try:
+            cost = estimate_cost([job.text for job in plan.jobs], "wav") + admission.silence(plan_stats(plan)[2], "wav")
+            with admit(cost):
+                final_wav = await run_ssml_plan(plan)
+        except Cancelled as e:
+            raise cancelled_error(e)
+        finally:
+            watcher.cancel()
         
         # Convert to bytes
-        audio_buffer = io.BytesIO()
-        torchaudio.save(audio_buffer, final_wav, model.sr, format="WAV")
-        audio_buffer.seek(0)
-        
+        audio_bytes = await asyncio.to_thread(encode_audio, final_wav, "wav")
+        model_calls, pieces, break_seconds = plan_stats(plan)
+        metadata = {
+            "segments": pieces,
+            "model_calls": model_calls,
+            "break_seconds": break_seconds,
+            "sample_rate": model.sr,
+            "duration_seconds": len(final_wav[0]) / model.sr
+        }
+
+        if wants_audio(http_request):
+            return audio_response(audio_bytes, "wav", metadata)
+
         return {
             "success": True,
-            "segments": len(request.segments),
-            "duration_seconds": len(final_wav[0]) / model.sr,
-            "audio_base64": base64.b64encode(audio_buffer.read()).decode()
+            **metadata,
+            **cache_audio(audio_bytes, "wav", request.include_base64)
         }
     
     return {"success": False, "error": "No segments generated"}
 
 
+@app.get("/audio/{artifact}")
+async def get_audio(artifact: str, http_request: Request):
+    """
+    Fetch a cached audio artifact (URLs from JSON responses expire).
+
+    Supports HTTP Range requests for seeking and resumable downloads.
+    """
+    artifact_id = artifact.split(".", 1)[0]
+    cached = audio_cache.get(artifact_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Audio not found or expired")
+
+    size = cached.size
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": f"private, max-age={audio_cache.ttl_seconds}"}
+    try:
+        byte_range = parse_range(http_request.headers.get("range"), size)
+    except ValueError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return Response(content=cached.data, media_type=cached.media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(
+        content=cached.data[start:end + 1],
+        status_code=206,
+        media_type=cached.media_type,
+        headers=headers
+    )
+
+
+@app.get("/output/{name}")
+async def get_output(name: str):
+    """
+    Fetch saved audio. Asking for another extension than the one saved
+    (e.g. /output/{id}.ogg for a WAV) transcodes it once; later requests
+    get the stored copy.
+    """
+    output_id, _, output_format = name.partition(".")
+    if output_format not in MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail="Output not found")
+    try:
+        path = await output_store.fetch(output_id, output_format)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Transcoding failed: {e}")
+    if path is None:
+        # Files saved before the output store (sayas_*.wav, batch_*.wav)
+        legacy = OUTPUT_DIR / Path(name).name
+        if not legacy.is_file():
+            raise HTTPException(status_code=404, detail="Output not found")
+        path = legacy
+    return FileResponse(path, media_type=MEDIA_TYPES[output_format])
+
+
+@app.post("/prerender", status_code=202)
+async def start_prerender(request: PrerenderRequest):
+    """
+    Pre-render prompts in the background and pin them in the audio cache.
+
+    Renders **prompts** if given, otherwise the **manifest** file (default:
+    prompts.json). Afterwards, /sayas requests for those prompts (same
+    voice/preset, text and format, `output_mode: "return"`) are served
+    from memory. With **replace**, audio pinned by earlier runs is unpinned
+    first. Progress: GET /prerender.
+    """
+    if model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    if prerenderer.running:
+        raise HTTPException(status_code=409, detail="A pre-render run is already in progress")
+
+    try:
+        if request.prompts is not None:
+            prompts = parse_prompts([p.model_dump(exclude_none=True) for p in request.prompts])
+            source = "request"
+        else:
+            manifest = MANIFEST_PATH
+            if request.manifest:
+                # Only files of this project, never an arbitrary server path
+                manifest = (PROJECT_DIR / request.manifest).resolve()
+                if not manifest.is_relative_to(PROJECT_DIR.resolve()):
+                    raise HTTPException(status_code=400, detail="Manifest must be inside the project folder")
+            prompts = load_manifest(manifest)
+            source = str(manifest)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Manifest not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if request.replace:
+        audio_cache.unpin_all()
+    return prerenderer.start(prompts, source).to_dict()
+
+
+@app.get("/prerender")
+async def prerender_progress():
+    """Progress of the current (or last) pre-render run, plus pinned cache usage."""
+    return {**prerenderer.progress.to_dict(), "cache": audio_cache.stats()}
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """Checkpointed long-text jobs on disk and how many of their chunks are rendered."""
+    if job_store is None:
+        return {"enabled": False, "jobs": []}
+    jobs = await asyncio.to_thread(job_store.jobs)
+    return {"enabled": True, "jobs": [job.to_dict() for job in jobs]}
+
+
+@app.get("/playback/queue")
+async def playback_queue():
+    """What the server is playing and what is queued after it."""
+    player = current_player()
+    if player is None:
+        return {"backend": None, "playing": None, "queued": [], "queued_seconds": 0.0, "played": 0, "skipped": 0}
+    return player.status()
+
+
+@app.post("/playback/skip")
+async def playback_skip():
+    """Skip the clip playing on the server; the next queued clip starts."""
+    player = current_player()
+    return {"skipped": player.skip() if player else None}
+
+
+@app.post("/playback/stop")
+async def playback_stop():
+    """Stop server playback and drop everything queued."""
+    player = current_player()
+    return {"dropped": player.stop() if player else 0}
+
+
 @app.get("/presets")
 async def list_presets():
     """List available voice presets"""
@@ -689,15 +1652,30 @@ async def get_preset(name: str):
 
 @app.websocket("/stream")
 async def websocket_stream(websocket: WebSocket):
-    """WebSocket streaming for real-time TTS - OVERKILL edition"""
+    """
+    WebSocket streaming for real-time TTS - OVERKILL edition
+
+    Send {"text", "voice"} to get one WAV message per request. Add
+    "format" ("opus", "ogg", "flac", "mp3", "wav") to get the audio as a
+    continuous encoded stream of binary messages, sent chunk by chunk while
+    synthesis continues, followed by {"done": true}. Streamed chunks are
+    loudness-normalized as they go unless "normalize" is false.
+
+    "deadline_ms" bounds a message: a streamed reply ends early (partial
+    audio), a WAV reply becomes {"error": "deadline exceeded"}. Work still
+    queued for a client that disconnects is dropped.
+    """
     await websocket.accept()
+    inference.set_client(client_id(websocket.headers, websocket.client))
+    token = None
     
     try:
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
+            token = request_token(message.get("deadline_ms"))
             
-            text = message.get("text", "")
+            text = normalize_text(message.get("text", ""))
             voice = message.get("voice", "Default Voice")
             
             if not text:
@@ -705,18 +1683,30 @@ async def websocket_stream(websocket: WebSocket):
                 continue
             
             # Find voice
-            voice_path = None
-            for ext in ['.wav', '.mp3']:
-                vp = VOICES_DIR / f"{voice}{ext}"
-                if vp.exists():
-                    voice_path = vp
-                    break
+            voice_path = find_voice(voice)
+            
+            # Stream encoded chunks as they are generated
+            output_format = message.get("format")
+            if output_format:
+                if output_format not in STREAMING_FORMATS:
+                    await websocket.send_json({"error": f"Unsupported format: {output_format}"})
+                    continue
+                stream = stream_speech(text, voice_path, output_format, token=token, normalize=message.get("normalize", True))
+                try:
+                    async for data in stream:
+                        await websocket.send_bytes(data)
+                finally:
+                    await stream.aclose()
+                await websocket.send_json({"done": True, "format": output_format, "partial": token.cancelled})
+                continue
             
             # Generate
-            if voice_path:
-                wav = model.generate(text, audio_prompt_path=str(voice_path))
-            else:
-                wav = model.generate(text)
+            try:
+                wav = await inference.run(inference.generate, text, voice_path)
+                token.check()  # A job that was already running when the deadline passed
+            except Cancelled as e:
+                await websocket.send_json({"error": str(e)})
+                continue
             
             # Convert to bytes and send
             audio_buffer = io.BytesIO()
@@ -727,6 +1717,9 @@ async def websocket_stream(websocket: WebSocket):
             
     except WebSocketDisconnect:
         print("WebSocket client disconnected")
+    finally:
+        if token is not None:
+            token.cancel(CLIENT_DISCONNECTED)
 
 
 @app.get("/health")
@@ -736,19 +1729,70 @@ async def health_check():
         "status": "healthy",
         "model_loaded": model is not None,
         "device": device,
+        "profile": inference.profile,
         "gpu_available": torch.cuda.is_available(),
         "gpu_name": torch.cuda.get_device_name(0) if torch.cuda.is_available() else None,
-        "voices_count": len(get_available_voices()),
+        "voices_count": len(voice_registry),
         "presets_count": len(get_available_presets()),
+        "worker_pool": model.stats() if WORKER_REPLICAS > 0 and model is not None else None,
         "output_dir": str(OUTPUT_DIR),
+        "output_store": output_store.stats(),
+        "jobs": job_store.stats() if job_store is not None else None,
+        "admission": admission.stats(),
+        "scheduler": inference.scheduler_stats(),
+        "runaway_guard": inference.guard_stats(),
         "overkill_features": "ALL ENABLED 🎮"
     }
 
 
 if __name__ == "__main__":
-    print("💖🎮 Starting SayAs API Server - LUDICUS OVERKILL Edition on port 8765...")
-    print("📱 Web UI available at: http://localhost:8760")
-    print("🔌 API docs at: http://localhost:8765/docs")
+    parser = argparse.ArgumentParser(description="SayAs API Server")
+    parser.add_argument(
+        "--webui",
+        action="store_true",
+        default=os.environ.get("SAYAS_WEBUI") == "1",
+        help="Serve the WebUI from this process at /ui (one shared model)"
+    )
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKER_REPLICAS,
+        help="Number of CPU model replica processes (default: 0 = in-process model)"
+    )
+    parser.add_argument(
+        "--worker-threads",
+        type=int,
+        default=WORKER_THREADS,
+        help="torch threads per replica (default: cores / workers)"
+    )
+    parser.add_argument(
+        "--pin-cores",
+        action="store_true",
+        default=WORKER_PIN_CORES,
+        help="Pin each replica to its own CPU cores"
+    )
+    parser.add_argument(
+        "--profile",
+        default=ACCEL_PROFILE,
+        help="Acceleration profile: fp32, inference, int8, bf16, compile or a '+' mix"
+    )
+    args = parser.parse_args()
+
+    WORKER_REPLICAS = args.workers
+    WORKER_THREADS = args.worker_threads
+    WORKER_PIN_CORES = args.pin_cores
+    ACCEL_PROFILE = args.profile
+
+    if args.webui:
+        mount_webui("/ui")
+
+    print(f"💖🎮 Starting SayAs API Server - LUDICUS OVERKILL Edition on port {args.port}...")
+    if args.webui:
+        print(f"📱 Web UI available at: http://localhost:{args.port}/ui")
+    else:
+        print("📱 Web UI available at: http://localhost:7860")
+    print(f"🔌 API docs at: http://localhost:{args.port}/docs")
     print("🎮 OVERKILL FEATURES ENABLED:")
     print("   - Voice Morphing (pitch, speed, volume)")
     print("   - Audio Effects (reverb, echo, chorus, distortion)")
@@ -757,4 +1801,4 @@ if __name__ == "__main__":
     print("   - SSML-like Markup")
     print("   - Background Music Mixing")
     print("   - WebSocket Streaming")
-    uvicorn.run(app, host="0.0.0.0", port=8765)
+    uvicorn.run(app, host="0.0.0.0", port=args.port)
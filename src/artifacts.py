@@ -0,0 +1,213 @@
+"""
+Audio Artifact Cache for SayAs
+
+Holds encoded audio for a short time so JSON responses can hand out a
+small URL (GET /audio/{id}) instead of embedding the clip as base64.
+Artifacts are content-addressed, expire after a TTL and are evicted
+oldest-first once the cache exceeds its byte budget. An artifact can also
+be found by a request key (voice + normalized text + settings), so
+equivalent requests reuse the audio instead of generating it again.
+Pinned artifacts (pre-rendered prompts) never expire and are never
+evicted; they still count toward the byte budget.
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+# How long an artifact URL stays valid
+DEFAULT_TTL_SECONDS = 600
+
+# Total bytes of encoded audio kept in memory
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Media types for the supported output formats
+MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "mp3": "audio/mpeg",
+    "flac": "audio/flac",
+    "ogg": "audio/ogg",
+    "opus": "audio/ogg",
+}
+
+
+@dataclass
+class Artifact:
+    """One cached, encoded audio clip."""
+    data: bytes
+    media_type: str
+    expires_at: float
+    metadata: dict = field(default_factory=dict)
+    keys: set = field(default_factory=set)
+    pinned: bool = False
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+class ArtifactCache:
+    """Thread-safe TTL + byte-bounded LRU cache of encoded audio."""
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, Artifact]" = OrderedDict()
+        self._keys: Dict[str, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(
+        self,
+        data: bytes,
+        media_type: str,
+        metadata: Optional[dict] = None,
+        key: Optional[str] = None,
+        pinned: bool = False
+    ) -> str:
+        """
+        Store encoded audio and return its artifact id.
+
+        The id is derived from the content, so storing the same clip twice
+        reuses (and refreshes) the existing entry. With a `key`, the
+        artifact can later be found with find(key). A pinned artifact
+        stays until unpinned.
+        """
+        artifact_id = hashlib.sha256(data).hexdigest()[:24]
+        with self._lock:
+            self._expire()
+            old = self._items.pop(artifact_id, None)
+            if old is not None:
+                self._bytes -= old.size
+            artifact = Artifact(
+                data=data,
+                media_type=media_type,
+                expires_at=time.monotonic() + self.ttl_seconds,
+                metadata=metadata or (old.metadata if old else {}),
+                keys=old.keys if old else set(),
+                pinned=pinned or (old.pinned if old else False)
+            )
+            if key is not None:
+                artifact.keys.add(key)
+                self._keys[key] = artifact_id
+            self._items[artifact_id] = artifact
+            self._bytes += len(data)
+            self._evict(keep=artifact_id)
+        return artifact_id
+
+    def pin(self, artifact_id: str) -> bool:
+        """Pin a live artifact so it is never expired or evicted. Returns False if it is gone."""
+        with self._lock:
+            artifact = self._items.get(artifact_id)
+            if artifact is None:
+                return False
+            artifact.pinned = True
+            return True
+
+    def unpin_all(self):
+        """Turn every pinned artifact back into a normal one (with a fresh TTL)."""
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl_seconds
+            for artifact in self._items.values():
+                if artifact.pinned:
+                    artifact.pinned = False
+                    artifact.expires_at = expires_at
+            self._evict()
+
+    def find(self, key: str) -> Optional[Tuple[str, Artifact]]:
+        """Find a live artifact by request key: (artifact id, artifact) or None."""
+        with self._lock:
+            artifact_id = self._keys.get(key)
+        if artifact_id is None:
+            return None
+        artifact = self.get(artifact_id)
+        return (artifact_id, artifact) if artifact is not None else None
+
+    def _drop(self, artifact_id: str, artifact: Artifact):
+        """
+        Account for a removed artifact (caller holds the lock). Its keys are
+        forgotten unless they were taken over by a newer artifact.
+        """
+        self._bytes -= artifact.size
+        for key in artifact.keys:
+            if self._keys.get(key) == artifact_id:
+                del self._keys[key]
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        """Get an artifact, or None if it never existed or has expired."""
+        with self._lock:
+            artifact = self._items.get(artifact_id)
+            if artifact is None:
+                return None
+            if not artifact.pinned and artifact.expires_at < time.monotonic():
+                del self._items[artifact_id]
+                self._drop(artifact_id, artifact)
+                return None
+            self._items.move_to_end(artifact_id)
+            return artifact
+
+    def _expire(self):
+        now = time.monotonic()
+        for artifact_id in [k for k, v in self._items.items() if not v.pinned and v.expires_at < now]:
+            self._drop(artifact_id, self._items.pop(artifact_id))
+
+    def _evict(self, keep: Optional[str] = None):
+        """Drop least recently used unpinned artifacts until under budget (caller holds the lock)."""
+        for artifact_id in list(self._items):
+            if self._bytes <= self.max_bytes:
+                break
+            artifact = self._items[artifact_id]
+            if artifact.pinned or artifact_id == keep:
+                continue
+            del self._items[artifact_id]
+            self._drop(artifact_id, artifact)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pinned = [a for a in self._items.values() if a.pinned]
+            return {
+                "artifacts": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "pinned": len(pinned),
+                "pinned_bytes": sum(a.size for a in pinned)
+            }
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+
+    Args:
+        range_header: Header value, e.g. "bytes=0-1023" or "bytes=-500"
+        size: Total size of the resource
+
+    Returns:
+        Inclusive (start, end) byte positions, or None to serve the whole body
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec:
+        # Multipart ranges are not worth supporting for audio; send it all
+        return None
+
+    start_s, _, end_s = spec.partition("-")
+    if not start_s:
+        length = int(end_s)
+        if length <= 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - length), size - 1
+
+    start = int(start_s)
+    end = int(end_s) if end_s else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
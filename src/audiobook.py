@@ -0,0 +1,333 @@
+"""
+Audiobook Rendering for SayAs
+
+Turns a text or Markdown file into one audio file per chapter, a combined
+file and a chapter manifest (chapters.json plus a .cue sheet), from one
+process with the model loaded once.
+
+Chapters are found from headings: Markdown `#`/`##` headings, or in plain
+text lines like "Chapter 12", "CHAPTER XII: The Storm", "Prologue". The
+chunks of every chapter are queued on the inference executor up front, so
+with a worker pool (-workers N) N chunks - of the same or of the next
+chapters - are generated at once and throughput scales with N. Chapter
+files are written as soon as a chapter's last chunk is in; the combined
+file is appended in chapter order, so a whole book is never held in
+memory at once.
+"""
+
+import re
+import sys
+import json
+import time
+import wave
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import torch
+import torchaudio
+
+import inference
+from text_splitter import split_text, normalize_text, create_silence, boundary_pauses, DEFAULT_MAX_CHUNK_SIZE
+from silence_trim import stitch_chunks
+
+
+# Seconds of silence between chapters in the combined file
+DEFAULT_CHAPTER_SILENCE = 2.0
+
+MARKDOWN_SUFFIXES = {".md", ".markdown"}
+
+NUMBER_WORD = (
+    r"(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|thirteen|fourteen|fifteen"
+    r"|sixteen|seventeen|eighteen|nineteen|twenty|thirty|forty|fifty|sixty|seventy|eighty|ninety|hundred)"
+)
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+# "Chapter 12", "CHAPTER XII: The Storm", "Part Two - Home", "Prologue"
+TEXT_HEADING = re.compile(
+    r"^\s*(?:(?:chapter|part|book)\s+(?:\d+|[ivxlcdm]+|" + NUMBER_WORD + r"(?:[- ]" + NUMBER_WORD + r")?)"
+    r"(?:\s*[.:\-\u2013\u2014]\s*[^\n]{0,80})?"
+    r"|prologue|epilogue|preface|foreword|introduction|afterword|interlude)\s*[.:]?\s*$",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class Chapter:
+    """One chapter: its title (None for text before the first heading) and text."""
+    index: int
+    title: Optional[str]
+    text: str
+    spoken: str = ""  # Normalized text the chunks were split from
+    chunks: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.title or "Opening"
+
+    @property
+    def chars(self) -> int:
+        return sum(len(chunk) for chunk in self.chunks)
+
+
+def strip_markdown(text: str) -> str:
+    """Markdown -> plain prose (code blocks, images, link targets and markup removed)."""
+    text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)
+    text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"^[ \t]{0,3}#{1,6}[ \t]+(.+?)[ \t]*#*[ \t]*$", r"\1.", text, flags=re.MULTILINE)
+    text = re.sub(r"^[ \t]{0,3}(?:>+|[-*+]|\d+\.)[ \t]+", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^[ \t]*(?:[-*_][ \t]*){3,}$", "", text, flags=re.MULTILINE)
+    return re.sub(r"(\*\*|__|\*|_|`|~~)(.+?)\1", r"\2", text)
+
+
+def parse_chapters(source: str, markdown: bool = False) -> List[Chapter]:
+    """
+    Split a book into chapters at its headings.
+
+    In Markdown the top heading level that occurs more than once marks
+    chapters (so a single `# Book Title` over `## Chapter` headings is
+    skipped). Text before the first heading becomes an untitled opening
+    chapter if there is any. A book without headings is one chapter.
+    """
+    lines = source.splitlines()
+    headings: List[tuple] = []  # (line number, title)
+    if markdown:
+        found = []
+        in_code = False
+        for number, line in enumerate(lines):
+            if line.lstrip().startswith("```"):
+                in_code = not in_code
+            match = None if in_code else MARKDOWN_HEADING.match(line)
+            if match:
+                found.append((number, len(match.group(1)), match.group(2)))
+        levels = sorted({level for _, level, _ in found})
+        level = next((lv for lv in levels if sum(1 for _, l, _ in found if l == lv) > 1), levels[0] if levels else None)
+        headings = [(number, title) for number, lv, title in found if lv == level]
+        # Higher-level headings (the book title) are not read out
+        dropped = {number for number, lv, _ in found if level is not None and lv < level}
+        lines = ["" if i in dropped else line for i, line in enumerate(lines)]
+    else:
+        headings = [(number, line.strip()) for number, line in enumerate(lines) if TEXT_HEADING.match(line)]
+
+    bounds = [(0, None)] + headings
+    chapters = []
+    for i, (start, title) in enumerate(bounds):
+        end = bounds[i + 1][0] if i + 1 < len(bounds) else len(lines)
+        body = "\n".join(lines[start + (1 if title is not None else 0):end])
+        if markdown:
+            body = strip_markdown(body)
+            title = strip_markdown(title) if title else title
+        body = body.strip()
+        if title is None and not body:
+            continue
+        chapters.append(Chapter(index=len(chapters) + 1, title=title, text=body))
+    return chapters
+
+
+def load_book(path: Union[str, Path]) -> List[Chapter]:
+    """Read a .txt or .md file into chapters."""
+    path = Path(path)
+    return parse_chapters(path.read_text(encoding="utf-8"), markdown=path.suffix.lower() in MARKDOWN_SUFFIXES)
+
+
+def chapter_filename(chapter: Chapter, digits: int, suffix: str = ".wav") -> str:
+    """'03 - The Storm.wav' (characters not allowed in file names dropped)."""
+    title = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "", chapter.name).strip(" .")[:80] or "Chapter"
+    return f"{chapter.index:0{digits}d} - {title}{suffix}"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m{secs:02d}s" if hours else f"{minutes}m{secs:02d}s"
+
+
+def cue_time(seconds: float) -> str:
+    """CUE INDEX time: mm:ss:ff at 75 frames per second."""
+    frames = int(round(seconds * 75))
+    minutes, frames = divmod(frames, 75 * 60)
+    secs, frames = divmod(frames, 75)
+    return f"{minutes:02d}:{secs:02d}:{frames:02d}"
+
+
+def write_cue(path: Path, audio_name: str, title: str, entries: List[Dict]):
+    lines = [f'TITLE "{title}"', f'FILE "{audio_name}" WAVE']
+    for number, entry in enumerate(entries, 1):
+        lines += [
+            f"  TRACK {number:02d} AUDIO",
+            f'    TITLE "{entry["title"].replace(chr(34), chr(39))}"',
+            f"    INDEX 01 {cue_time(entry['start_seconds'])}"
+        ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+class Progress:
+    """Chunk progress with an ETA from the characters rendered so far."""
+
+    def __init__(self, total_chunks: int, total_chars: int):
+        self.total_chunks = total_chunks
+        self.total_chars = total_chars
+        self.chunks = 0
+        self.chars = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def advance(self, chars: int, label: str):
+        """Count a finished chunk (called from the worker threads)."""
+        with self._lock:
+            self.chunks += 1
+            self.chars += chars
+            elapsed = time.monotonic() - self.started_at
+            eta = elapsed / self.chars * (self.total_chars - self.chars) if self.chars else 0.0
+            print(
+                f"📖 [{self.chunks}/{self.total_chunks} chunks] {self.chars / self.total_chars:6.1%} "
+                f"elapsed {format_duration(elapsed)}, ETA {format_duration(eta)} - {label}",
+                file=sys.stderr
+            )
+
+    def track(self, future: Future, chars: int, label: str):
+        """advance() when `future` finishes successfully."""
+        def done(f: Future):
+            if not f.cancelled() and f.exception() is None:
+                self.advance(chars, label)
+        future.add_done_callback(done)
+
+
+class CombinedWriter:
+    """Appends chapters to one 16-bit WAV file as they come in, in chapter order."""
+
+    def __init__(self, path: Path, sample_rate: int, gap: torch.Tensor):
+        self.sample_rate = sample_rate
+        self.gap = gap
+        self.frames = 0
+        self._wav = wave.open(str(path), "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def append(self, wav: torch.Tensor) -> float:
+        """Write a chapter (after the gap) and return its start in seconds."""
+        if self.frames:
+            self._write(self.gap)
+        start = self.frames / self.sample_rate
+        self._write(wav)
+        return start
+
+    def _write(self, wav: torch.Tensor):
+        samples = (wav.detach().cpu().float().reshape(-1).clamp(-1.0, 1.0) * 32767).to(torch.int16)
+        self._wav.writeframes(samples.numpy().tobytes())
+        self.frames += samples.numel()
+
+    def close(self):
+        self._wav.close()
+
+
+def render_audiobook(
+    book_path: Union[str, Path],
+    output_dir: Union[str, Path],
+    voice_path: Optional[Path] = None,
+    sample_rate: int = 24000,
+    chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
+    silence_duration: float = 0.5,
+    chapter_silence: float = DEFAULT_CHAPTER_SILENCE,
+    chapter_format: str = "wav",
+    trim: bool = True
+) -> Dict:
+    """
+    Render a book: chapter files, a combined WAV, chapters.json and a .cue sheet.
+
+    Args:
+        book_path: .txt or .md file
+        output_dir: Folder for the output (created if needed)
+        voice_path: Voice sample (None = default voice)
+        sample_rate: Model sample rate
+        chunk_size: Maximum characters per model call
+        silence_duration: Seconds of silence between chunks
+        chapter_silence: Seconds of silence between chapters in the combined file
+        chapter_format: Extension of the chapter files (any format torchaudio writes)
+        trim: Trim near-silence off each chunk before stitching
+
+    Returns:
+        The manifest written to chapters.json
+    """
+    book_path = Path(book_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    chapters = load_book(book_path)
+    for chapter in chapters:
+        # The title is read out at the start of its chapter
+        spoken = f"{chapter.title}.\n\n{chapter.text}" if chapter.title else chapter.text
+        chapter.spoken = normalize_text(spoken)
+        chapter.chunks = split_text(chapter.spoken, max_chunk_size=chunk_size)
+    chapters = [c for c in chapters if c.chunks]
+    if not chapters:
+        raise ValueError(f"No text found in {book_path}")
+
+    total_chunks = sum(len(c.chunks) for c in chapters)
+    print(
+        f"📚 {book_path.name}: {len(chapters)} chapters, {total_chunks} chunks, "
+        f"{sum(c.chars for c in chapters)} characters", file=sys.stderr
+    )
+
+    # Everything is queued at once; the executor runs as many chunks in
+    # parallel as there are workers, in chapter order
+    futures: Dict[int, List[Future]] = {
+        chapter.index: [inference.submit(inference.generate, chunk, voice_path) for chunk in chapter.chunks]
+        for chapter in chapters
+    }
+    progress = Progress(total_chunks, sum(c.chars for c in chapters))
+    for chapter in chapters:
+        for chunk, future in zip(chapter.chunks, futures[chapter.index]):
+            progress.track(future, len(chunk), chapter.name)
+
+    digits = max(2, len(str(len(chapters))))
+    combined_path = output_dir / f"{book_path.stem}.wav"
+    combined = CombinedWriter(combined_path, sample_rate, create_silence(chapter_silence, sample_rate))
+    entries = []
+    try:
+        for chapter in chapters:
+            segments = [future.result() for future in futures.pop(chapter.index)]
+            pauses = boundary_pauses(chapter.spoken, chapter.chunks, silence_duration)
+            wav, _, _ = stitch_chunks(segments, sample_rate, pauses, silence_duration, trim)
+            del segments
+            filename = chapter_filename(chapter, digits, f".{chapter_format}")
+            torchaudio.save(str(output_dir / filename), wav, sample_rate)
+            duration = wav.shape[-1] / sample_rate
+            entries.append({
+                "index": chapter.index,
+                "title": chapter.name,
+                "file": filename,
+                "start_seconds": round(combined.append(wav), 3),
+                "duration_seconds": round(duration, 3),
+                "chars": chapter.chars
+            })
+    except BaseException:
+        for pending in futures.values():
+            for future in pending:
+                future.cancel()
+        raise
+    finally:
+        combined.close()
+
+    manifest = {
+        "title": book_path.stem,
+        "source": str(book_path),
+        "file": combined_path.name,
+        "sample_rate": sample_rate,
+        "duration_seconds": round(combined.frames / sample_rate, 3),
+        "chapters": entries
+    }
+    (output_dir / "chapters.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_cue(output_dir / f"{book_path.stem}.cue", combined_path.name, book_path.stem, entries)
+
+    elapsed = time.monotonic() - progress.started_at
+    print(
+        f"✅ Rendered {format_duration(manifest['duration_seconds'])} of audio in {format_duration(elapsed)} "
+        f"to {output_dir}", file=sys.stderr
+    )
+    return manifest
@@ -0,0 +1,186 @@
+"""
+SayAs Benchmarks
+
+Measures inference throughput so the deployment can be tuned per machine.
+
+Usage:
+    python benchmark.py pool [-replicas 1,2,4,8] [-requests 32] [-threads 0] [-pin]
+    python benchmark.py profiles [-profiles fp32,inference,int8,bf16] [-device cpu]
+
+pool: aggregate throughput of the CPU worker pool against replica count.
+profiles: real-time factor of each acceleration profile, validated
+against the fp32 output with an audio similarity score.
+"""
+
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# Short IVR-style prompts: many concurrent small requests
+BENCH_TEXTS = [
+    "Thank you for calling. Please hold.",
+    "Your call is important to us.",
+    "Press one for sales, two for support.",
+    "The next available agent will be with you shortly.",
+    "Please say your account number after the tone.",
+    "Goodbye, and have a wonderful day!",
+]
+
+
+def _parse_int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _parse_str_list(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def bench_pool(replica_counts: List[int], num_requests: int, threads: int, pin: bool, voice: str = None):
+    """
+    Benchmark aggregate throughput of the worker pool per replica count.
+
+    Each run starts a fresh pool, warms every replica once, then fires
+    `num_requests` requests at it with one client thread per replica.
+    """
+    from worker_pool import WorkerPool
+
+    texts = [BENCH_TEXTS[i % len(BENCH_TEXTS)] for i in range(num_requests)]
+    results = []
+
+    for replicas in replica_counts:
+        pool = WorkerPool(replicas, threads_per_worker=threads, pin_cores=pin)
+        pool.start()
+        try:
+            # Warm up: one request per replica
+            with ThreadPoolExecutor(max_workers=replicas) as ex:
+                list(ex.map(lambda t: pool.generate(t, voice), BENCH_TEXTS[:1] * replicas))
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=replicas) as ex:
+                wavs = list(ex.map(lambda t: pool.generate(t, voice), texts))
+            elapsed = time.perf_counter() - start
+        finally:
+            pool.stop()
+
+        audio_seconds = sum(w.shape[-1] for w in wavs) / pool.sr
+        results.append({
+            "replicas": replicas,
+            "threads": pool.threads_per_worker,
+            "requests_per_s": num_requests / elapsed,
+            "audio_s_per_s": audio_seconds / elapsed,
+            "rtf": elapsed / audio_seconds if audio_seconds else float("inf"),
+        })
+        print(f"  {replicas} replicas: {num_requests / elapsed:.2f} req/s", file=sys.stderr)
+
+    print()
+    print(f"{'replicas':>8} {'threads':>8} {'req/s':>8} {'audio s/s':>10} {'RTF':>6}")
+    for r in results:
+        print(
+            f"{r['replicas']:>8} {r['threads']:>8} {r['requests_per_s']:>8.2f} "
+            f"{r['audio_s_per_s']:>10.2f} {r['rtf']:>6.3f}"
+        )
+    return results
+
+
+def bench_profiles(profiles: List[str], device: str, voice: str = None, seed: int = 1234):
+    """
+    Benchmark real-time factor per acceleration profile.
+
+    Loads a fresh model per profile (quantization and compilation are
+    in-place), renders the benchmark texts with a fixed seed, and scores
+    each render against the fp32 render of the same text.
+    """
+    import torch
+    from chatterbox.tts import ChatterboxTTS
+    from acceleration import apply_profile, audio_similarity, SIMILARITY_THRESHOLD
+
+    if "fp32" not in profiles:
+        profiles = ["fp32"] + profiles
+
+    reference = None
+    results = []
+
+    for profile in profiles:
+        print(f"  Loading model for profile '{profile}'...", file=sys.stderr)
+        model = ChatterboxTTS.from_pretrained(device=device)
+        context = apply_profile(model, profile)
+        if voice:
+            with context():
+                model.prepare_conditionals(voice)
+
+        # Warm up (compiles kernels for the compile profile)
+        with context():
+            model.generate(BENCH_TEXTS[0])
+
+        wavs = []
+        start = time.perf_counter()
+        for text in BENCH_TEXTS:
+            torch.manual_seed(seed)
+            with context():
+                wavs.append(model.generate(text))
+        elapsed = time.perf_counter() - start
+
+        audio_seconds = sum(w.shape[-1] for w in wavs) / model.sr
+        if reference is None:
+            reference = wavs
+        similarity = min(audio_similarity(r, w, model.sr) for r, w in zip(reference, wavs))
+
+        results.append({
+            "profile": profile,
+            "rtf": elapsed / audio_seconds if audio_seconds else float("inf"),
+            "similarity": similarity,
+            "passed": similarity >= SIMILARITY_THRESHOLD,
+        })
+        del model
+
+    baseline_rtf = results[0]["rtf"]
+    print()
+    print(f"{'profile':<20} {'RTF':>7} {'speedup':>8} {'similarity':>11} {'valid':>6}")
+    for r in results:
+        print(
+            f"{r['profile']:<20} {r['rtf']:>7.3f} {baseline_rtf / r['rtf']:>7.2f}x "
+            f"{r['similarity']:>11.3f} {'yes' if r['passed'] else 'NO':>6}"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SayAs benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pool_parser = sub.add_parser("pool", help="Throughput vs. CPU worker replica count")
+    pool_parser.add_argument(
+        "-replicas",
+        dest="replicas",
+        type=_parse_int_list,
+        default=[1, 2, 4],
+        help="Comma-separated replica counts to try (default: 1,2,4)"
+    )
+    pool_parser.add_argument("-requests", dest="requests", type=int, default=32, help="Requests per run (default: 32)")
+    pool_parser.add_argument("-threads", dest="threads", type=int, default=0, help="Threads per replica (default: cores / replicas)")
+    pool_parser.add_argument("-pin", dest="pin", action="store_true", help="Pin replicas to cores")
+    pool_parser.add_argument("-voice", dest="voice", default=None, help="Path to a voice sample (default: built-in voice)")
+
+    profiles_parser = sub.add_parser("profiles", help="Real-time factor and fp32 similarity per acceleration profile")
+    profiles_parser.add_argument(
+        "-profiles",
+        dest="profiles",
+        type=_parse_str_list,
+        default=["fp32", "inference", "int8", "bf16"],
+        help="Comma-separated profiles to try (default: fp32,inference,int8,bf16)"
+    )
+    profiles_parser.add_argument("-device", dest="device", default="cpu", help="Device to benchmark on (default: cpu)")
+    profiles_parser.add_argument("-voice", dest="voice", default=None, help="Path to a voice sample (default: built-in voice)")
+
+    args = parser.parse_args()
+
+    if args.command == "pool":
+        bench_pool(args.replicas, args.requests, args.threads, args.pin, args.voice)
+    elif args.command == "profiles":
+        bench_profiles(args.profiles, args.device, args.voice)
+
+
+if __name__ == "__main__":
+    main()
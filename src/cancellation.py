@@ -0,0 +1,87 @@
+"""
+Cancellation for SayAs
+
+A CancelToken travels with a request. It is cancelled when the client
+goes away or the request's deadline passes; queued inference jobs of the
+request are dropped at that moment (see inference.submit), and chunked
+work checks the token between chunks and stages, so abandoned requests
+stop using the model right away instead of rendering audio nobody will
+receive.
+"""
+
+import time
+import threading
+from typing import Callable, List, Optional
+
+
+CLIENT_DISCONNECTED = "client disconnected"
+DEADLINE_EXCEEDED = "deadline exceeded"
+
+
+class Cancelled(Exception):
+    """The request was cancelled (client gone)."""
+
+
+class DeadlineExceeded(Cancelled):
+    """The request's deadline passed."""
+
+
+class CancelToken:
+    """
+    Cancellation state of one request, safe to share across threads.
+
+    Args:
+        deadline_ms: Milliseconds from now after which the request expires
+    """
+
+    def __init__(self, deadline_ms: Optional[float] = None):
+        self.deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+        self.reason: Optional[str] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(DEADLINE_EXCEEDED)
+        return self.reason is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None without one)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def cancel(self, reason: str = CLIENT_DISCONNECTED):
+        """Cancel (first reason wins) and run the registered callbacks."""
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback: Callable[[], None]):
+        """Run `callback` when cancelled (right away if already cancelled)."""
+        with self._lock:
+            if self.reason is None:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def error(self) -> Cancelled:
+        """The exception describing why the token was cancelled."""
+        if self.reason == DEADLINE_EXCEEDED:
+            return DeadlineExceeded(self.reason)
+        return Cancelled(self.reason or "cancelled")
+
+    def check(self):
+        """
+        Stop here if cancelled.
+
+        Raises:
+            Cancelled: (DeadlineExceeded for an expired deadline)
+        """
+        if self.cancelled:
+            raise self.error()
@@ -0,0 +1,318 @@
+"""
+Resumable Long-Text Jobs for SayAs
+
+Long text is rendered chunk by chunk, and every finished chunk is written
+to a job directory right away:
+
+    jobs/{job id}/
+        manifest.json   voice hash, params, one entry per chunk
+        text.txt        the (normalized) text, for resuming after a restart
+        00000.npy       chunk audio, float32 as generated
+        ...
+
+The job id is derived from the voice sample's content, the text and the
+generation params, so resubmitting the same request finds the same job
+and only renders the chunks that are missing. A chunk is reused only if
+its text hash still matches and its file is intact. Stitching happens at
+the end from the chunk files, so a process that dies at chunk 180 of 200
+loses at most the chunks that were running.
+
+Each chunk's manifest entry records its sample count and, once the job is
+complete, its sample offset in the stitched audio.
+"""
+
+import io
+import sys
+import json
+import time
+import shutil
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from output_store import write_atomic
+
+
+# Seconds an untouched job directory is kept (finished or not)
+DEFAULT_RETENTION_SECONDS = 24 * 3600
+
+MANIFEST_NAME = "manifest.json"
+TEXT_NAME = "text.txt"
+MANIFEST_VERSION = 1
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def voice_hash(voice_path: Optional[Union[str, Path]]) -> Optional[str]:
+    """Hash of the voice sample's content (None for the default voice)."""
+    if voice_path is None:
+        return None
+    digest = hashlib.sha256()
+    with open(voice_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def job_id(voice: Optional[str], text: str, params: dict) -> str:
+    payload = json.dumps([voice, text_hash(text), params], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+@dataclass
+class ChunkEntry:
+    """Manifest entry of one chunk."""
+    index: int
+    text_hash: str
+    chars: int
+    samples: Optional[int] = None  # Set once the chunk is rendered
+    offset: Optional[int] = None  # Start in the stitched audio, set when the job completes
+
+    @property
+    def done(self) -> bool:
+        return self.samples is not None
+
+    @property
+    def file(self) -> str:
+        return f"{self.index:05d}.npy"
+
+
+@dataclass
+class Job:
+    """A checkpointed long-text rendering (see JobStore.open)."""
+    id: str
+    root: Path
+    voice: Optional[str]  # Voice name, for resuming
+    voice_hash: Optional[str]
+    params: dict
+    chunks: List[ChunkEntry]
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    complete: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _users: int = field(default=0, repr=False)  # Requests rendering it right now
+
+    @property
+    def done_count(self) -> int:
+        return sum(1 for chunk in self.chunks if chunk.done)
+
+    def has(self, index: int) -> bool:
+        return self.chunks[index].done
+
+    def load(self, index: int) -> np.ndarray:
+        """
+        Audio of a finished chunk.
+
+        Raises:
+            OSError/ValueError: If the chunk file is missing or damaged
+        """
+        chunk = self.chunks[index]
+        samples = np.load(self.root / chunk.file, allow_pickle=False)
+        if samples.shape[-1] != chunk.samples:
+            raise ValueError(f"Chunk {index} of job {self.id} is truncated")
+        return samples
+
+    def save(self, index: int, wav):
+        """Write a finished chunk and record it in the manifest (blocking)."""
+        if hasattr(wav, "detach"):
+            wav = wav.detach().cpu().numpy()
+        samples = np.asarray(wav, dtype=np.float32)
+        buffer = io.BytesIO()
+        np.save(buffer, samples, allow_pickle=False)
+        chunk = self.chunks[index]
+        write_atomic(self.root / chunk.file, buffer.getvalue())
+        with self._lock:
+            chunk.samples = int(samples.shape[-1])
+            self._write_manifest()
+
+    def forget(self, index: int):
+        """Mark a chunk as not rendered (its file was unusable)."""
+        with self._lock:
+            self.chunks[index].samples = None
+            self._write_manifest()
+
+    def finish(self, offsets: List[int]):
+        """Record where each chunk starts in the stitched audio and mark the job complete."""
+        with self._lock:
+            for chunk, offset in zip(self.chunks, offsets):
+                chunk.offset = offset
+            self.complete = True
+            self._write_manifest()
+
+    def _write_manifest(self):
+        """Caller holds the lock."""
+        self.updated_at = time.time()
+        write_atomic(self.root / MANIFEST_NAME, json.dumps(self.to_manifest(), indent=1).encode("utf-8"))
+
+    def to_manifest(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "id": self.id,
+            "voice": self.voice,
+            "voice_hash": self.voice_hash,
+            "params": self.params,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "complete": self.complete,
+            "chunks": [
+                {
+                    "index": c.index,
+                    "text_hash": c.text_hash,
+                    "chars": c.chars,
+                    "samples": c.samples,
+                    "offset": c.offset
+                }
+                for c in self.chunks
+            ]
+        }
+
+    def text(self) -> str:
+        return (self.root / TEXT_NAME).read_text(encoding="utf-8")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "voice": self.voice,
+            "chunks": len(self.chunks),
+            "done": self.done_count,
+            "complete": self.complete,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class JobStore:
+    """Job directories under `root`, kept for `retention_seconds` after their last update."""
+
+    def __init__(self, root: Union[str, Path], retention_seconds: float = DEFAULT_RETENTION_SECONDS):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self._open: Dict[str, Job] = {}
+        self._complete: Dict[str, bool] = {}  # Job id -> complete, for every job on disk
+        self._lock = threading.Lock()
+        for job in self.jobs():
+            self._complete[job.id] = job.complete
+
+    def open(
+        self,
+        voice: Optional[str],
+        voice_path: Optional[Union[str, Path]],
+        text: str,
+        chunks: List[str],
+        params: dict
+    ) -> Job:
+        """
+        The job for this voice sample, text and params - resumed from disk
+        if it was started before, with chunks whose text changed (a new
+        splitter) marked as not rendered.
+        """
+        vhash = voice_hash(voice_path)
+        jid = job_id(vhash, text, params)
+        with self._lock:
+            job = self._open.get(jid)
+            if job is not None:
+                job._users += 1
+                return job
+            entries = [ChunkEntry(i, text_hash(chunk), len(chunk)) for i, chunk in enumerate(chunks)]
+            root = self.root / jid
+            previous = self._read(root)
+            if previous is not None:
+                done = {c.index: c for c in previous.chunks if c.done}
+                for entry in entries:
+                    old = done.get(entry.index)
+                    if old is not None and old.text_hash == entry.text_hash:
+                        entry.samples = old.samples
+                job = Job(jid, root, voice, vhash, params, entries, created_at=previous.created_at)
+                print(f"♻️  Resuming job {jid}: {job.done_count}/{len(entries)} chunks already rendered", file=sys.stderr)
+            else:
+                root.mkdir(parents=True, exist_ok=True)
+                write_atomic(root / TEXT_NAME, text.encode("utf-8"))
+                job = Job(jid, root, voice, vhash, params, entries)
+            with job._lock:
+                job._write_manifest()
+            job._users = 1
+            self._open[jid] = job
+            self._complete[jid] = job.complete
+        self.sweep()
+        return job
+
+    def close(self, job: Job):
+        """Done rendering an opened job (its directory stays until it expires)."""
+        with self._lock:
+            job._users -= 1
+            if job._users <= 0:
+                self._open.pop(job.id, None)
+                self._complete[job.id] = job.complete
+
+    @staticmethod
+    def _read(root: Path) -> Optional[Job]:
+        """Job from a manifest on disk, or None if there is none (or it is unreadable)."""
+        try:
+            data = json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))
+            if data.get("version") != MANIFEST_VERSION:
+                return None
+            chunks = [ChunkEntry(**c) for c in data["chunks"]]
+            return Job(
+                data["id"], root, data.get("voice"), data.get("voice_hash"), data["params"], chunks,
+                created_at=data["created_at"], updated_at=data["updated_at"], complete=data["complete"]
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def jobs(self) -> List[Job]:
+        """Every job on disk (open jobs as they are in memory)."""
+        found = []
+        with self._lock:
+            open_jobs = dict(self._open)
+        for root in sorted(self.root.iterdir()):
+            if not root.is_dir():
+                continue
+            job = open_jobs.get(root.name) or self._read(root)
+            if job is not None:
+                found.append(job)
+        return found
+
+    def incomplete(self) -> List[Job]:
+        """Jobs left unfinished (by a restart, a crash or a cancelled request)."""
+        with self._lock:
+            open_ids = set(self._open)
+        return [job for job in self.jobs() if not job.complete and job.id not in open_ids]
+
+    def sweep(self):
+        """Delete job directories not updated within the retention period."""
+        if not self.retention_seconds:
+            return
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            open_ids = set(self._open)
+        for root in self.root.iterdir():
+            if not root.is_dir() or root.name in open_ids:
+                continue
+            manifest = root / MANIFEST_NAME
+            try:
+                updated = manifest.stat().st_mtime if manifest.exists() else root.stat().st_mtime
+            except OSError:
+                continue
+            if updated < cutoff:
+                shutil.rmtree(root, ignore_errors=True)
+                with self._lock:
+                    self._complete.pop(root.name, None)
+
+    def stats(self) -> dict:
+        """Job counts kept in memory (no directory scan)."""
+        with self._lock:
+            complete = dict(self._complete)
+            # Open jobs may have finished since they were opened
+            complete.update((jid, job.complete) for jid, job in self._open.items())
+        return {
+            "jobs": len(complete),
+            "incomplete": sum(1 for done in complete.values() if not done),
+            "retention_seconds": self.retention_seconds
+        }
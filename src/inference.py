@@ -0,0 +1,420 @@
+"""
+Shared Inference Service for SayAs
+
+One Chatterbox model, one voice conditioning cache and one work queue,
+shared by every frontend living in the same process (API, WebUI, CLI).
+
+The API and the WebUI used to load their own ChatterboxTTS instance each,
+so running both meant two full model copies in VRAM/RAM. Everything that
+needs the model now goes through this module instead.
+"""
+
+import os
+import sys
+import inspect
+import asyncio
+import contextlib
+import contextvars
+import threading
+from concurrent.futures import Future
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+# Set CUDA PATH before importing torch
+os.environ['PATH'] = r'C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v11.8\bin;' + os.environ.get('PATH', '')
+
+import torch
+
+from chatterbox.tts import ChatterboxTTS, Conditionals
+
+from acceleration import apply_profile, DEFAULT_PROFILE
+from scheduler import FairScheduler, INTERACTIVE
+from cancellation import CancelToken
+from runaway_guard import RunawayGuard
+from voice_blend import blend_conditionals, load_blend
+from voice_registry import BLEND_EXTENSION
+
+
+# Global model instance (shared by every frontend in this process)
+model = None
+device = None
+
+# Conditionals the model ships with, restored for the default voice
+_default_conds = None
+
+# Acceleration profile (see acceleration.py) and the context generate runs in
+profile = os.environ.get("SAYAS_PROFILE", DEFAULT_PROFILE)
+_generation_context = contextlib.nullcontext
+
+# Voice conditioning cache: (voice path, mtime) -> Conditionals
+_conds_cache = {}
+
+# Blends: (blend path, mtime) -> (component paths, weights, component conditionals)
+_blend_sources = {}
+
+# Conditionals are also persisted next to the voices (voices/.conds/<name>.pt),
+# so they survive restarts and are shared with pool workers
+CONDS_DIRNAME = ".conds"
+
+# Serializes access to the model (generate mutates model.conds)
+_model_lock = threading.RLock()
+
+# Inference queue - weighted fair across clients and lanes (see scheduler.py),
+# one worker (one job at a time) unless a worker pool is started
+_executor = FairScheduler(workers=1)
+
+# Who submitted work and in which lane; set per request (contextvars follow
+# asyncio tasks, so every job a request queues is tagged with them)
+_client = contextvars.ContextVar("sayas_client", default="local")
+_lane = contextvars.ContextVar("sayas_lane", default=INTERACTIVE)
+_token = contextvars.ContextVar("sayas_cancel_token", default=None)
+
+# Optional CPU replica pool (see worker_pool.py); None = in-process model
+_pool = None
+
+# Bounds every generate call by the expected duration of its text
+# (see runaway_guard.py; SAYAS_RUNAWAY_GUARD=0 turns it off)
+GUARD_ENABLED = os.environ.get("SAYAS_RUNAWAY_GUARD", "1") != "0"
+runaway_guard = RunawayGuard(
+    factor=float(os.environ.get("SAYAS_RUNAWAY_FACTOR", "2.5")),
+    retries=int(os.environ.get("SAYAS_RUNAWAY_RETRIES", "1"))
+)
+
+# Speech-token cap of the generate call in progress (set under _model_lock)
+_max_new_tokens = None
+
+
+def get_device():
+    """Get GPU if available, otherwise CPU."""
+    if torch.cuda.is_available():
+        return "cuda"
+    return "cpu"
+
+
+def load_model(device_override: Optional[str] = None, profile_override: Optional[str] = None):
+    """
+    Load the Chatterbox TTS model into memory (once per process).
+
+    Calling this again returns the already loaded model, so the API and
+    the WebUI can both call it safely when mounted together.
+
+    Args:
+        device_override: Force a device ("cpu", "cuda") instead of auto-detecting
+        profile_override: Acceleration profile instead of SAYAS_PROFILE
+    """
+    global model, device, profile, _default_conds, _generation_context
+    with _model_lock:
+        if model is not None:
+            return model
+        device = device_override or get_device()
+        profile = profile_override or profile
+        print(f"🎤 Loading Chatterbox TTS model on {device}...", file=sys.stderr)
+        model = ChatterboxTTS.from_pretrained(device=device)
+        _generation_context = apply_profile(model, profile)
+        _install_token_cap(model)
+        _default_conds = model.conds
+        print(f"✅ Model loaded and ready!", file=sys.stderr)
+        return model
+
+
+def start_worker_pool(
+    replicas: int,
+    threads_per_worker: int = 0,
+    pin_cores: bool = False,
+    profile_override: Optional[str] = None
+):
+    """
+    Serve inference from a pool of CPU model replica processes.
+
+    Instead of loading the model here, `model` becomes the pool, which has
+    the same `sr`/`generate` surface. The executor is widened to one thread
+    per replica so queued jobs are dispatched to idle workers in parallel.
+
+    Args:
+        replicas: Number of model replica processes
+        threads_per_worker: torch threads per replica (0 = cores / replicas)
+        pin_cores: Pin each replica to its own set of cores
+        profile_override: Acceleration profile instead of SAYAS_PROFILE
+
+    Returns:
+        The started WorkerPool
+    """
+    global model, device, profile, _pool
+    from worker_pool import WorkerPool
+
+    with _model_lock:
+        if _pool is not None:
+            return _pool
+        profile = profile_override or profile
+        _pool = WorkerPool(replicas, threads_per_worker=threads_per_worker, pin_cores=pin_cores, profile=profile)
+        _pool.start()
+        model = _pool
+        device = "cpu"
+        _executor.resize(replicas)
+        return _pool
+
+
+def unload_model():
+    """Release the model (or worker pool) and cached conditionals."""
+    global model, _default_conds, _pool
+    with _model_lock:
+        if _pool is not None:
+            _pool.stop()
+            _pool = None
+        model = None
+        _default_conds = None
+        _conds_cache.clear()
+        _blend_sources.clear()  # Holds the blends' component conditionals
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def conditionals_path(voice_path: Union[str, Path]) -> Path:
+    """Where the persisted conditionals for a voice sample live."""
+    voice_path = Path(voice_path)
+    return voice_path.parent / CONDS_DIRNAME / f"{voice_path.stem}.pt"
+
+
+def _load_persisted_conditionals(voice_path: Path, mtime_ns: int):
+    """Load persisted conditionals if they are at least as new as the sample."""
+    conds_file = conditionals_path(voice_path)
+    try:
+        if conds_file.stat().st_mtime_ns < mtime_ns:
+            return None
+        return Conditionals.load(conds_file, map_location=device).to(device)
+    except Exception:
+        return None
+
+
+def _persist_conditionals(voice_path: Path, conds):
+    """Save conditionals next to the sample (atomic rename, best effort)."""
+    conds_file = conditionals_path(voice_path)
+    tmp_file = conds_file.with_name(f"{conds_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        conds_file.parent.mkdir(exist_ok=True)
+        conds.save(tmp_file)
+        os.replace(tmp_file, conds_file)
+    except Exception as e:
+        print(f"⚠️  Could not persist conditionals for {voice_path.name}: {e}", file=sys.stderr)
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+
+def get_conditionals(voice_path: Union[str, Path]):
+    """
+    Get speaker conditionals for a voice sample, computing them on first use.
+
+    Cached per file path and modification time, so replacing a voice file
+    invalidates its entry automatically. Computed conditionals are also
+    written to disk, so a restart (or another worker) picks them up
+    without running the speaker encoder again.
+    """
+    voice_path = Path(voice_path)
+    mtime_ns = voice_path.stat().st_mtime_ns
+    key = (str(voice_path), mtime_ns)
+
+    if voice_path.suffix == BLEND_EXTENSION:
+        return _get_blend_conditionals(voice_path, key)
+
+    with _model_lock:
+        conds = _conds_cache.get(key)
+        if conds is None:
+            conds = _load_persisted_conditionals(voice_path, mtime_ns)
+            if conds is None:
+                model.prepare_conditionals(str(voice_path))
+                conds = model.conds
+                _persist_conditionals(voice_path, conds)
+            _conds_cache[key] = conds
+        return conds
+
+
+def _get_blend_conditionals(blend_path: Path, key):
+    """
+    Conditionals for a .blend voice, mixed from its components' conditionals.
+
+    Rebuilt only when the blend file or one of its component voices
+    changes; otherwise this costs the same as a plain voice lookup.
+    """
+    with _model_lock:
+        sources = _blend_sources.get(key)
+        if sources is None:
+            parts = load_blend(blend_path)
+            paths, weights = [p for p, _ in parts], [w for _, w in parts]
+        else:
+            paths, weights, _ = sources
+
+        components = [get_conditionals(path) for path in paths]
+        conds = _conds_cache.get(key)
+        if conds is None or any(a is not b for a, b in zip(components, sources[2])):
+            conds = blend_conditionals(components, weights)
+            _conds_cache[key] = conds
+            _blend_sources[key] = (paths, weights, components)
+        return conds
+
+
+def precompute_conditionals(voice_path: Union[str, Path]):
+    """
+    Compute (and persist) conditionals for a freshly stored voice.
+
+    With a worker pool the parent holds no model, so this is skipped;
+    workers compute the conditionals on first use and persist them then.
+    """
+    if model is None or _pool is not None:
+        return None
+    return get_conditionals(voice_path)
+
+
+def conditionals_cached(voice_path: Union[str, Path], mtime_ns: int) -> bool:
+    """Whether conditionals for this version of a voice file are cached (no file access)."""
+    return (str(voice_path), mtime_ns) in _conds_cache
+
+
+def _install_token_cap(model):
+    """
+    Let generate calls cap the model's speech-token budget (_max_new_tokens),
+    so a runaway stops early. Skipped if this Chatterbox version's T3 has
+    no max_new_tokens.
+    """
+    t3_inference = model.t3.inference
+    if "max_new_tokens" not in inspect.signature(t3_inference).parameters:
+        print("⚠️  Model has no token budget, runaway generations are only cut afterwards", file=sys.stderr)
+        return
+
+    def capped_inference(*args, **kwargs):
+        if _max_new_tokens is not None:
+            kwargs["max_new_tokens"] = min(kwargs.get("max_new_tokens", _max_new_tokens), _max_new_tokens)
+        return t3_inference(*args, **kwargs)
+
+    model.t3.inference = capped_inference
+
+
+def generate(
+    text: str,
+    voice_path: Optional[Union[str, Path]] = None,
+    guard: bool = True,
+    **kwargs
+) -> torch.Tensor:
+    """
+    Generate speech with the shared model.
+
+    Args:
+        text: Text to convert
+        voice_path: Optional path to voice sample (None = default voice)
+        guard: Bound the audio by the text's expected duration (see runaway_guard.py)
+        **kwargs: Extra arguments passed to ChatterboxTTS.generate
+
+    Returns:
+        Audio tensor of shape (1, samples)
+    """
+    if model is None:
+        raise RuntimeError("Model not loaded")
+
+    # Paragraph breaks only matter to the chunk stitcher
+    text = " ".join(text.split())
+
+    if guard and GUARD_ENABLED:
+        return runaway_guard.run(
+            text,
+            lambda seed, max_new_tokens: _generate_once(text, voice_path, seed, max_new_tokens, **kwargs),
+            model.sr
+        )
+    return _generate_once(text, voice_path, **kwargs)
+
+
+def _generate_once(
+    text: str,
+    voice_path: Optional[Union[str, Path]] = None,
+    seed: Optional[int] = None,
+    max_new_tokens: Optional[int] = None,
+    **kwargs
+) -> torch.Tensor:
+    """One model call, optionally seeded and with a capped token budget."""
+    global _max_new_tokens
+
+    if _pool is not None:
+        # The replica runs it unguarded; the guard stays here, with the stats
+        return _pool.generate(text, voice_path, guard=False, seed=seed, max_new_tokens=max_new_tokens, **kwargs)
+
+    with _model_lock:
+        if voice_path:
+            model.conds = get_conditionals(voice_path)
+        else:
+            model.conds = _default_conds
+        if seed is not None:
+            torch.manual_seed(seed)
+        _max_new_tokens = max_new_tokens
+        try:
+            with _generation_context():
+                return model.generate(text, **kwargs)
+        finally:
+            _max_new_tokens = None
+
+
+def set_client(client: str):
+    """Attribute jobs queued from the current context (request) to `client`."""
+    _client.set(client)
+
+
+def set_lane(lane: str):
+    """Queue jobs from the current context in `lane` (INTERACTIVE or BULK)."""
+    _lane.set(lane)
+
+
+def set_token(token: Optional[CancelToken]):
+    """Cancel jobs queued from the current context when `token` is cancelled."""
+    _token.set(token)
+
+
+def _unless_cancelled(token: CancelToken, job: Callable):
+    token.check()  # Deadline may have passed while queued
+    return job()
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """
+    Queue a job on the inference executor (as the current client and lane) and return its future.
+
+    Raises:
+        Cancelled: If the current cancel token already is
+    """
+    job = partial(fn, *args, **kwargs)
+    token = _token.get()
+    if token is not None:
+        token.check()
+        job = partial(_unless_cancelled, token, job)
+    future = _executor.submit(job, client=_client.get(), lane=_lane.get())
+    if token is not None:
+        # Still queued when cancelled: dropped without running
+        token.on_cancel(future.cancel)
+    return future
+
+
+async def run(fn: Callable, *args, **kwargs):
+    """
+    Run a job on the inference executor without blocking the event loop.
+
+    Raises:
+        Cancelled: If the current cancel token fires before the job ran
+    """
+    loop = asyncio.get_running_loop()
+    future = submit(fn, *args, **kwargs)
+    try:
+        return await asyncio.wrap_future(future, loop=loop)
+    except asyncio.CancelledError:
+        # The job was dropped by the token (not this task being cancelled)
+        task = asyncio.current_task()
+        token = _token.get()
+        if token is not None and token.cancelled and not getattr(task, "cancelling", lambda: 0)():
+            raise token.error() from None
+        raise
+
+
+def guard_stats() -> dict:
+    """Runaway generation counters (see runaway_guard.py)."""
+    return {"enabled": GUARD_ENABLED, **runaway_guard.stats()}
+
+
+def scheduler_stats() -> dict:
+    """Queue depth per lane (see scheduler.py)."""
+    return _executor.stats()
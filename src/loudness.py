@@ -0,0 +1,272 @@
+"""
+Loudness Normalization for SayAs
+
+Peak normalization (scale so the loudest sample hits 0.95) leaves the
+perceived loudness up to the clip: one sharp consonant makes a whole
+request quiet, and streamed chunks could not be normalized at all. Audio
+is now normalized to a loudness target the way EBU R128 measures it
+(ITU-R BS.1770):
+
+- the signal is K-weighted (a high shelf and a high-pass biquad, run as
+  torchaudio IIR filters),
+- mean squares are taken per 100 ms step with one reshape, and 400 ms
+  blocks overlapping by 75% are formed from four consecutive steps,
+- blocks below -70 LUFS, then blocks 10 LU below the mean of the rest,
+  are gated out, and the mean of what is left is the integrated loudness.
+
+A LoudnessNormalizer keeps the step powers as running statistics, so in
+streaming mode each chunk is measured together with everything before it
+and the gain glides from the previous chunk's value instead of jumping.
+
+After the gain, a look-ahead limiter keeps the true peak (the level
+between samples, estimated with 4x polyphase interpolation) under a
+ceiling, so a raised quiet clip does not clip once encoded.
+"""
+
+import math
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import torch
+import torch.nn.functional as F
+import torchaudio.functional as AF
+
+
+# Loudness reached by default (speech/podcast level) and true-peak ceiling
+DEFAULT_TARGET_LUFS = -16.0
+DEFAULT_TRUE_PEAK_DB = -1.0
+
+# Quiet or silent clips are raised by at most this much
+MAX_GAIN_DB = 20.0
+
+# BS.1770 measurement: 100 ms steps, 400 ms blocks, absolute/relative gates
+STEP_SECONDS = 0.1
+STEPS_PER_BLOCK = 4
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+# Previous input run through the K-weighting filters again, so a chunk
+# starts with the filter state the last one ended with
+WARMUP_SECONDS = 0.05
+
+# True-peak estimation: 4x oversampling, 12 taps per interpolation phase
+OVERSAMPLE = 4
+INTERPOLATION_TAPS = 12
+
+# Limiter look-ahead and release (each side of a peak)
+LIMITER_WINDOW_SECONDS = 0.005
+
+
+Biquad = Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+
+
+@lru_cache(maxsize=8)
+def k_weighting(sample_rate: int) -> Tuple[Biquad, Biquad]:
+    """The two K-weighting biquads ((b, a) each, a0 = 1) for a sample rate."""
+    # Stage 1: high shelf, +4 dB above ~1.5 kHz (head acoustics)
+    gain_db, q, fc = 4.0, 1 / math.sqrt(2), 1500.0
+    A = 10 ** (gain_db / 40)
+    w0 = 2 * math.pi * fc / sample_rate
+    alpha = math.sin(w0) / (2 * q)
+    cos_w0 = math.cos(w0)
+    a0 = (A + 1) - (A - 1) * cos_w0 + 2 * math.sqrt(A) * alpha
+    shelf = (
+        (
+            A * ((A + 1) + (A - 1) * cos_w0 + 2 * math.sqrt(A) * alpha) / a0,
+            -2 * A * ((A - 1) + (A + 1) * cos_w0) / a0,
+            A * ((A + 1) + (A - 1) * cos_w0 - 2 * math.sqrt(A) * alpha) / a0
+        ),
+        (
+            1.0,
+            2 * ((A - 1) - (A + 1) * cos_w0) / a0,
+            ((A + 1) - (A - 1) * cos_w0 - 2 * math.sqrt(A) * alpha) / a0
+        )
+    )
+
+    # Stage 2: high-pass at ~38 Hz (RLB weighting)
+    q, fc = 0.5, 38.0
+    w0 = 2 * math.pi * fc / sample_rate
+    alpha = math.sin(w0) / (2 * q)
+    cos_w0 = math.cos(w0)
+    a0 = 1 + alpha
+    highpass = (
+        ((1 + cos_w0) / 2 / a0, -(1 + cos_w0) / a0, (1 + cos_w0) / 2 / a0),
+        (1.0, -2 * cos_w0 / a0, (1 - alpha) / a0)
+    )
+    return shelf, highpass
+
+
+def k_weighted(audio: torch.Tensor, sample_rate: int) -> torch.Tensor:
+    """K-weighted copy of (channels, samples) float64 audio."""
+    for b, a in k_weighting(sample_rate):
+        audio = AF.lfilter(
+            audio,
+            torch.tensor(a, dtype=audio.dtype),
+            torch.tensor(b, dtype=audio.dtype),
+            clamp=False
+        )
+    return audio
+
+
+def to_lufs(power: torch.Tensor) -> torch.Tensor:
+    return -0.691 + 10 * torch.log10(power.clamp(min=1e-20))
+
+
+def _as_channels(wav: torch.Tensor) -> torch.Tensor:
+    """(channels, samples) float64 on the CPU, whatever the input shape."""
+    return wav.detach().reshape(-1, wav.shape[-1]).to("cpu", torch.float64)
+
+
+class LoudnessMeter:
+    """Integrated loudness (BS.1770 gating) of audio fed in one or more pieces."""
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.step = max(1, int(sample_rate * STEP_SECONDS))
+        self.warmup = int(sample_rate * WARMUP_SECONDS)
+        self._history: Optional[torch.Tensor] = None  # Last raw input (filter warm-up)
+        self._pending: Optional[torch.Tensor] = None  # K-weighted samples short of a full step
+        self._step_powers = torch.zeros(0, dtype=torch.float64)
+
+    def add(self, wav: torch.Tensor):
+        """Measure the next piece of audio."""
+        audio = _as_channels(wav)
+        warm = 0
+        if self._history is not None:
+            warm = self._history.shape[-1]
+            audio = torch.cat([self._history, audio], dim=-1)
+        self._history = audio[..., -self.warmup:] if self.warmup else None
+
+        weighted = k_weighted(audio, self.sample_rate)[..., warm:]
+        if self._pending is not None:
+            weighted = torch.cat([self._pending, weighted], dim=-1)
+        steps = weighted.shape[-1] // self.step
+        if steps:
+            powers = weighted[..., :steps * self.step].reshape(-1, steps, self.step).pow(2).mean(dim=-1).sum(dim=0)
+            self._step_powers = torch.cat([self._step_powers, powers])
+        self._pending = weighted[..., steps * self.step:]
+
+    def loudness(self) -> Optional[float]:
+        """Integrated loudness so far in LUFS, or None if it is all silence."""
+        powers = self._step_powers
+        if powers.numel() >= STEPS_PER_BLOCK:
+            blocks = powers.unfold(0, STEPS_PER_BLOCK, 1).mean(dim=-1)
+        else:
+            # Shorter than one block: measure all of it as one
+            samples = powers.numel() * self.step
+            energy = powers.sum() * self.step
+            if self._pending is not None:
+                samples += self._pending.shape[-1]
+                energy = energy + self._pending.pow(2).sum()
+            if not samples:
+                return None
+            blocks = (energy / samples).reshape(1)
+
+        blocks = blocks[to_lufs(blocks) > ABSOLUTE_GATE_LUFS]
+        if not blocks.numel():
+            return None
+        relative_gate = to_lufs(blocks.mean()) + RELATIVE_GATE_LU
+        blocks = blocks[to_lufs(blocks) > relative_gate]
+        return to_lufs(blocks.mean()).item()
+
+
+@lru_cache(maxsize=1)
+def _interpolation_kernels() -> torch.Tensor:
+    """Windowed-sinc kernels for the in-between phases, shape (OVERSAMPLE - 1, 1, taps)."""
+    half = INTERPOLATION_TAPS // 2
+    n = torch.arange(-half + 1, half + 1, dtype=torch.float64)
+    kernels = []
+    for phase in range(1, OVERSAMPLE):
+        distance = phase / OVERSAMPLE - n
+        kernel = torch.sinc(distance) * torch.cos(math.pi * distance / (2 * half)) ** 2
+        kernels.append(kernel / kernel.sum())
+    return torch.stack(kernels).unsqueeze(1)
+
+
+def true_peak_envelope(wav: torch.Tensor) -> torch.Tensor:
+    """Per-sample true peak (max over channels and the interpolated points after each sample)."""
+    audio = _as_channels(wav)
+    half = INTERPOLATION_TAPS // 2
+    between = F.conv1d(F.pad(audio.unsqueeze(1), (half - 1, half)), _interpolation_kernels())
+    return torch.maximum(audio.abs(), between.abs().amax(dim=1)).amax(dim=0)
+
+
+def limit_true_peak(wav: torch.Tensor, sample_rate: int, ceiling_db: float = DEFAULT_TRUE_PEAK_DB) -> torch.Tensor:
+    """
+    Keep the true peak under `ceiling_db` dBTP.
+
+    The gain each sample needs is held over a short look-ahead window and
+    smoothed over one of the same size, so it is lowered before a peak and
+    recovers after it, never above what any sample in reach needs.
+    """
+    if wav.shape[-1] == 0:
+        return wav
+    ceiling = 10 ** (ceiling_db / 20)
+    peaks = true_peak_envelope(wav)
+    if peaks.max().item() <= ceiling:
+        return wav
+
+    needed = (ceiling / peaks.clamp(min=ceiling)).reshape(1, 1, -1)
+    radius = max(1, int(sample_rate * LIMITER_WINDOW_SECONDS))
+    held = -F.max_pool1d(-needed, 2 * radius + 1, stride=1, padding=radius)
+    gain = F.avg_pool1d(held, 2 * radius + 1, stride=1, padding=radius, count_include_pad=False)
+    return wav * gain.reshape(-1).to(wav.device, wav.dtype)
+
+
+class LoudnessNormalizer:
+    """
+    Normalizes audio to a loudness target, one chunk at a time.
+
+    Each chunk raises the running measurement and is scaled by the gain
+    that brings everything so far to the target, ramped from the previous
+    chunk's gain; then its true peak is limited. A whole clip is just one
+    chunk (see normalize_loudness).
+
+    Args:
+        sample_rate: Rate of the audio
+        target_lufs: Integrated loudness to reach
+        true_peak_db: True-peak ceiling (dBTP)
+        max_gain_db: Most a quiet clip is raised
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        target_lufs: float = DEFAULT_TARGET_LUFS,
+        true_peak_db: float = DEFAULT_TRUE_PEAK_DB,
+        max_gain_db: float = MAX_GAIN_DB
+    ):
+        self.sample_rate = sample_rate
+        self.target_lufs = target_lufs
+        self.true_peak_db = true_peak_db
+        self.max_gain_db = max_gain_db
+        self.meter = LoudnessMeter(sample_rate)
+        self._gain: Optional[float] = None  # Linear gain at the end of the last chunk
+
+    def __call__(self, wav: torch.Tensor) -> torch.Tensor:
+        if wav.shape[-1] == 0:
+            return wav
+        self.meter.add(wav)
+        loudness = self.meter.loudness()
+        if loudness is None:
+            gain = self._gain if self._gain is not None else 1.0
+        else:
+            gain = 10 ** (min(self.target_lufs - loudness, self.max_gain_db) / 20)
+
+        start = self._gain if self._gain is not None else gain
+        self._gain = gain
+        if start == gain:
+            wav = wav * gain
+        else:
+            wav = wav * torch.linspace(start, gain, wav.shape[-1], dtype=wav.dtype, device=wav.device)
+        return limit_true_peak(wav, self.sample_rate, self.true_peak_db)
+
+
+def normalize_loudness(
+    wav: torch.Tensor,
+    sample_rate: int,
+    target_lufs: float = DEFAULT_TARGET_LUFS,
+    true_peak_db: float = DEFAULT_TRUE_PEAK_DB
+) -> torch.Tensor:
+    """Normalize a whole clip to `target_lufs`, true peak under `true_peak_db`."""
+    return LoudnessNormalizer(sample_rate, target_lufs, true_peak_db)(wav)
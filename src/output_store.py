@@ -0,0 +1,268 @@
+"""
+Output Store for SayAs
+
+Saved audio (/sayas and /batch save mode) lives in the output directory
+under a content-addressed name, {id}.{format}: two requests can never
+overwrite each other, and saving the same clip twice writes nothing.
+Files are written to a temp file next to the target and renamed into
+place, on a small I/O thread pool, so readers never see a partial file
+and the event loop never waits on the disk.
+
+The directory is bounded: outputs unused for longer than the retention
+period are deleted, and once it exceeds its byte quota the least
+recently used outputs go too (every format of an output together).
+
+Other formats are made on demand: GET /output/{id}.ogg transcodes the
+stored master once and keeps the result next to it, where it counts
+toward the quota like any other file.
+"""
+
+import os
+import re
+import sys
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+
+# Total bytes of saved audio kept on disk
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Seconds an unused output is kept (0 = until the quota needs the space)
+DEFAULT_RETENTION_SECONDS = 7 * 24 * 3600
+
+# Threads doing disk writes and transcodes
+DEFAULT_IO_WORKERS = 2
+
+# {24 hex chars}.{format} - anything else in the directory is left alone
+OUTPUT_NAME = re.compile(r"^([0-9a-f]{24})\.([a-z0-9]+)$")
+
+TEMP_PREFIX = ".sayas-"
+TEMP_SUFFIX = ".tmp"
+
+
+def write_atomic(path: Union[str, Path], data: bytes):
+    """Write a file via a temp file in the same directory and an atomic rename."""
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+@dataclass
+class StoredOutput:
+    """One saved clip: its master file plus any transcoded copies."""
+    id: str
+    master: str  # Format it was saved in
+    files: Dict[str, int] = field(default_factory=dict)  # format -> bytes
+    last_used: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return sum(self.files.values())
+
+
+class OutputStore:
+    """
+    Content-addressed, quota-bounded store of saved audio files.
+
+    `transcode(data, source_format, output_format)` makes other formats on
+    demand; without it only saved formats can be fetched.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+        transcode: Optional[Callable[[bytes, str, str], bytes]] = None,
+        io_workers: int = DEFAULT_IO_WORKERS
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        self._transcode = transcode
+        self._items: "OrderedDict[str, StoredOutput]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._transcoding: Dict[Tuple[str, str], threading.Lock] = {}
+        self._executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="sayas-output-io")
+        self._scan()
+
+    def path(self, output_id: str, output_format: str) -> Path:
+        return self.root / f"{output_id}.{output_format}"
+
+    def _scan(self):
+        """Index the files already on disk (least recently modified first)."""
+        found: Dict[str, StoredOutput] = {}
+        for path in self.root.iterdir():
+            if path.name.startswith(TEMP_PREFIX) and path.name.endswith(TEMP_SUFFIX):
+                # Left behind by a crash mid-write
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                continue
+            match = OUTPUT_NAME.match(path.name)
+            if not match or not path.is_file():
+                continue
+            output_id, output_format = match.groups()
+            stat = path.stat()
+            item = found.get(output_id)
+            if item is None:
+                item = found[output_id] = StoredOutput(output_id, output_format, last_used=stat.st_mtime)
+            elif stat.st_mtime < item.last_used:
+                item.master = output_format  # The oldest file is the one that was saved
+            item.files[output_format] = stat.st_size
+            item.last_used = max(item.last_used, stat.st_mtime)
+
+        with self._lock:
+            for item in sorted(found.values(), key=lambda i: i.last_used):
+                self._items[item.id] = item
+                self._bytes += item.size
+            self._evict()
+        if found:
+            print(f"📁 Output store: {len(self._items)} outputs, {self._bytes / 1e6:.1f} MB", file=sys.stderr)
+
+    def put(self, data: bytes, output_format: str) -> str:
+        """
+        Save encoded audio and return its output id (blocking; see save()).
+
+        Saving a clip that is already stored only marks it as used.
+        """
+        output_id = hashlib.sha256(data).hexdigest()[:24]
+        with self._lock:
+            item = self._items.get(output_id)
+            if item is not None and output_format in item.files:
+                self._touch(item)
+                return output_id
+
+        write_atomic(self.path(output_id, output_format), data)
+        self._add(output_id, output_format, len(data))
+        return output_id
+
+    async def save(self, data: bytes, output_format: str) -> str:
+        """put() on the I/O thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.put, data, output_format)
+
+    def get(self, output_id: str, output_format: str) -> Optional[Path]:
+        """
+        Path of an output in the given format, or None if it is not stored.
+
+        A format that was not saved is transcoded from the master the first
+        time it is asked for (blocking; see fetch()). Concurrent requests
+        for the same copy wait for one transcode.
+        """
+        with self._lock:
+            item = self._items.get(output_id)
+            if item is None:
+                return None
+            if output_format in item.files:
+                self._touch(item)
+                return self.path(output_id, output_format)
+            if self._transcode is None:
+                return None
+            master = item.master
+            lock = self._transcoding.setdefault((output_id, output_format), threading.Lock())
+
+        with lock:
+            try:
+                with self._lock:
+                    item = self._items.get(output_id)
+                    if item is None:
+                        return None
+                    if output_format in item.files:
+                        self._touch(item)
+                        return self.path(output_id, output_format)
+
+                data = self._transcode(self.path(output_id, master).read_bytes(), master, output_format)
+                path = self.path(output_id, output_format)
+                write_atomic(path, data)
+                if not self._add(output_id, output_format, len(data), create=False):
+                    # Evicted while transcoding
+                    self._unlink(path)
+                    return None
+            finally:
+                # Whatever happened, the lock is not needed once this is done
+                with self._lock:
+                    self._transcoding.pop((output_id, output_format), None)
+        return path
+
+    async def fetch(self, output_id: str, output_format: str) -> Optional[Path]:
+        """get() on the I/O thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.get, output_id, output_format)
+
+    def _add(self, output_id: str, output_format: str, size: int, create: bool = True) -> bool:
+        """Account for a file just written. Returns False if the output is gone."""
+        with self._lock:
+            item = self._items.get(output_id)
+            if item is None:
+                if not create:
+                    return False
+                item = self._items[output_id] = StoredOutput(output_id, output_format)
+            self._bytes += size - item.files.get(output_format, 0)
+            item.files[output_format] = size
+            self._touch(item)
+            self._evict(keep=output_id)
+        return True
+
+    def _touch(self, item: StoredOutput):
+        """Mark an output as just used (caller holds the lock)."""
+        item.last_used = time.time()
+        self._items.move_to_end(item.id)
+
+    def _evict(self, keep: Optional[str] = None):
+        """Delete expired outputs, then LRU ones until under quota (caller holds the lock)."""
+        cutoff = time.time() - self.retention_seconds if self.retention_seconds else None
+        for output_id in list(self._items):
+            item = self._items[output_id]
+            expired = cutoff is not None and item.last_used < cutoff
+            if not expired and self._bytes <= self.max_bytes:
+                break
+            if output_id == keep:
+                continue
+            del self._items[output_id]
+            self._bytes -= item.size
+            for output_format in item.files:
+                self._unlink(self.path(output_id, output_format))
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Windows refuses to delete a file that is being served
+            print(f"⚠️  Could not delete {path.name}: {e}", file=sys.stderr)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "outputs": len(self._items),
+                "files": sum(len(item.files) for item in self._items.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "retention_seconds": self.retention_seconds
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
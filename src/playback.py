@@ -0,0 +1,309 @@
+"""
+Audio Playback for SayAs
+
+One output device per process, opened on first use and kept open. Clips
+are queued and played back to back by the device callback, so callers
+return as soon as their audio is queued instead of blocking until it has
+been heard.
+
+The callback converts float samples to int16 one block at a time into a
+preallocated buffer - no full-clip int16 copy, no per-clip device setup.
+
+Backends (SAYAS_AUDIO_BACKEND):
+    pyaudio  The sound card (default; falls back to null if unavailable)
+    null     Discards audio at real-time pace (headless servers, tests)
+"""
+
+import os
+import sys
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+import numpy as np
+
+
+# Frames per device callback (~43 ms at 24 kHz)
+DEFAULT_BLOCK_FRAMES = 1024
+
+
+@dataclass
+class Clip:
+    """A queued clip: mono float32 samples at the device rate."""
+    id: int
+    samples: np.ndarray
+    label: str = ""
+    position: int = 0
+
+    def to_dict(self, sample_rate: int) -> dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "duration_seconds": round(len(self.samples) / sample_rate, 3),
+            "position_seconds": round(self.position / sample_rate, 3)
+        }
+
+
+def to_mono(wav, sample_rate: int, device_rate: int) -> np.ndarray:
+    """Tensor/array audio -> contiguous mono float32 at the device rate."""
+    if hasattr(wav, "detach"):
+        wav = wav.detach().cpu().numpy()
+    samples = np.asarray(wav, dtype=np.float32)
+    if samples.ndim > 1:
+        samples = samples[0] if samples.shape[0] == 1 else samples.mean(axis=0)
+    if sample_rate != device_rate and len(samples):
+        length = int(round(len(samples) * device_rate / sample_rate))
+        samples = np.interp(
+            np.arange(length) * (sample_rate / device_rate),
+            np.arange(len(samples)),
+            samples
+        ).astype(np.float32)
+    return np.ascontiguousarray(samples)
+
+
+class PyAudioSink:
+    """Sound card output through a callback-driven PyAudio stream."""
+
+    name = "pyaudio"
+
+    def __init__(self, player: "Player"):
+        import pyaudio
+
+        self._pyaudio = pyaudio
+        self._player = player
+        self._pa = pyaudio.PyAudio()
+        try:
+            # Opened stopped, so the callback never runs before __init__ is done
+            self._stream = self._pa.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=player.sample_rate,
+                output=True,
+                frames_per_buffer=player.block_frames,
+                stream_callback=self._callback,
+                start=False
+            )
+        except Exception:
+            self._pa.terminate()
+            raise
+        self._stream.start_stream()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        return self._player.read(frame_count), self._pyaudio.paContinue
+
+    def close(self):
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+        finally:
+            self._pa.terminate()
+
+
+class NullSink:
+    """Pulls blocks from the player and discards them (real time by default)."""
+
+    name = "null"
+
+    def __init__(self, player: "Player", realtime: bool = True):
+        self._player = player
+        self._realtime = realtime
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sayas-null-sink", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        player = self._player
+        block_seconds = player.block_frames / player.sample_rate
+        while not self._closed.is_set():
+            if not player.wait_for_audio(timeout=0.5):
+                continue
+            player.read(player.block_frames)
+            if self._realtime:
+                self._closed.wait(block_seconds)
+
+    def close(self):
+        self._closed.set()
+        self._thread.join(timeout=2)
+
+
+BACKENDS = {"pyaudio": PyAudioSink, "null": NullSink}
+
+
+class Player:
+    """
+    Playback queue in front of one output device.
+
+    enqueue() returns immediately; the sink pulls audio with read() from
+    its own thread (the PyAudio callback or the null sink's loop).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        backend: Optional[str] = None,
+        block_frames: int = DEFAULT_BLOCK_FRAMES,
+        **sink_options
+    ):
+        self.sample_rate = sample_rate
+        self.block_frames = block_frames
+        self._queue: Deque[Clip] = deque()
+        self._current: Optional[Clip] = None
+        self._ids = itertools.count(1)
+        self._played = 0
+        self._skipped = 0
+        self._lock = threading.Condition()
+        self._block = np.zeros(block_frames, dtype=np.float32)
+        self._out = np.zeros(block_frames, dtype=np.int16)
+        self.sink = self._open_sink(backend or os.environ.get("SAYAS_AUDIO_BACKEND", "pyaudio"), sink_options)
+
+    def _open_sink(self, backend: str, options: dict):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown audio backend '{backend}' (expected: {', '.join(BACKENDS)})")
+        try:
+            return BACKENDS[backend](self, **options)
+        except Exception as e:
+            if backend == "null":
+                raise
+            print(f"⚠️  Audio device unavailable ({e}), playback is discarded", file=sys.stderr)
+            return NullSink(self)
+
+    @property
+    def backend(self) -> str:
+        return self.sink.name
+
+    def enqueue(self, wav, sample_rate: int, label: str = "") -> int:
+        """Queue a clip for playback and return its id (does not wait)."""
+        samples = to_mono(wav, sample_rate, self.sample_rate)
+        with self._lock:
+            clip = Clip(id=next(self._ids), samples=samples, label=label)
+            self._queue.append(clip)
+            self._lock.notify_all()
+        return clip.id
+
+    def read(self, frames: int) -> bytes:
+        """Next `frames` frames as int16 bytes; silence once the queue is empty."""
+        if frames > len(self._out):
+            self._block = np.zeros(frames, dtype=np.float32)
+            self._out = np.zeros(frames, dtype=np.int16)
+        block, out = self._block[:frames], self._out[:frames]
+        filled = 0
+        with self._lock:
+            while filled < frames:
+                clip = self._current
+                if clip is None:
+                    if not self._queue:
+                        break
+                    clip = self._current = self._queue.popleft()
+                n = min(frames - filled, len(clip.samples) - clip.position)
+                block[filled:filled + n] = clip.samples[clip.position:clip.position + n]
+                clip.position += n
+                filled += n
+                if clip.position >= len(clip.samples):
+                    self._current = None
+                    self._played += 1
+                    self._lock.notify_all()
+        block[filled:] = 0.0
+        np.clip(block, -1.0, 1.0, out=block)
+        np.multiply(block, 32767, out=block)
+        out[:] = block
+        return out.tobytes()
+
+    @property
+    def idle(self) -> bool:
+        """Nothing playing and nothing queued (the device is outputting silence)."""
+        with self._lock:
+            return self._current is None and not self._queue
+
+    def wait_for_audio(self, timeout: Optional[float] = None) -> bool:
+        """Block until something is queued or playing (sink side)."""
+        with self._lock:
+            return self._lock.wait_for(lambda: self._current is not None or bool(self._queue), timeout)
+
+    def wait(self, clip_id: Optional[int] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a clip (default: everything queued so far) is done.
+
+        Returns False on timeout.
+        """
+        def done():
+            pending = ([self._current] if self._current else []) + list(self._queue)
+            if clip_id is None:
+                return not pending
+            return all(clip.id != clip_id for clip in pending)
+
+        with self._lock:
+            return self._lock.wait_for(done, timeout)
+
+    def skip(self) -> Optional[int]:
+        """Stop the current clip and move on. Returns the skipped id, if any."""
+        with self._lock:
+            clip = self._current
+            if clip is None and self._queue:
+                clip = self._queue.popleft()
+            self._current = None
+            if clip is not None:
+                self._skipped += 1
+            self._lock.notify_all()
+        return clip.id if clip else None
+
+    def stop(self) -> int:
+        """Stop playback and clear the queue. Returns how many clips were dropped."""
+        with self._lock:
+            dropped = len(self._queue) + (1 if self._current else 0)
+            self._queue.clear()
+            self._current = None
+            self._skipped += dropped
+            self._lock.notify_all()
+        return dropped
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "sample_rate": self.sample_rate,
+                "playing": self._current.to_dict(self.sample_rate) if self._current else None,
+                "queued": [clip.to_dict(self.sample_rate) for clip in self._queue],
+                "queued_seconds": round(
+                    sum(len(c.samples) - c.position for c in self._queue) / self.sample_rate, 3
+                ),
+                "played": self._played,
+                "skipped": self._skipped
+            }
+
+    def close(self):
+        """Drop queued audio and release the device."""
+        self.stop()
+        self.sink.close()
+
+
+_player: Optional[Player] = None
+_player_lock = threading.Lock()
+
+
+def get_player(sample_rate: int) -> Player:
+    """
+    Get the process-wide player (the device is opened on first use).
+
+    Later clips at another rate are resampled to the device rate.
+    """
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = Player(sample_rate)
+        return _player
+
+
+def current_player() -> Optional[Player]:
+    """The process-wide player if it has been opened, else None."""
+    return _player
+
+
+def close_player():
+    """Release the device (queued audio is dropped)."""
+    global _player
+    with _player_lock:
+        if _player is not None:
+            _player.close()
+            _player = None
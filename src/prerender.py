@@ -0,0 +1,173 @@
+"""
+Prompt Pre-rendering for SayAs
+
+IVR-style deployments speak a known set of prompts. A manifest lists them
+once; the API renders them in the background (at startup or on demand)
+and pins the results in the audio cache, so a live request for a known
+prompt is answered straight from memory.
+
+Manifest (prompts.json in the project root, or $SAYAS_MANIFEST):
+
+    {"prompts": [
+        {"voice": "Kate", "text": "Press 1 for sales."},
+        {"preset": "Radio Voice", "text": "Please hold.", "output_format": "mp3"}
+    ]}
+
+Prompts are rendered one at a time, so live requests keep getting their
+turn on the shared inference queue while a manifest is warming up.
+"""
+
+import sys
+import json
+import time
+import asyncio
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Union
+
+from artifacts import MEDIA_TYPES
+
+
+# Failed prompts kept in the progress report
+MAX_REPORTED_ERRORS = 50
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """One manifest entry (same meaning as the /sayas fields)."""
+    text: str
+    voice: Optional[str] = None
+    preset: Optional[str] = None
+    output_format: str = "wav"
+
+
+def parse_prompts(entries: list) -> List[Prompt]:
+    """
+    Validate manifest entries and drop duplicates (first one wins).
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    prompts = []
+    for i, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not isinstance(entry.get("text"), str) or not entry["text"].strip():
+            raise ValueError(f"Prompt {i}: needs a non-empty 'text'")
+        if not entry.get("voice") and not entry.get("preset"):
+            raise ValueError(f"Prompt {i}: needs a 'voice' or a 'preset'")
+        unknown = set(entry) - {"text", "voice", "preset", "output_format"}
+        if unknown:
+            raise ValueError(f"Prompt {i}: unknown field(s) {', '.join(sorted(unknown))}")
+        prompt = Prompt(**entry)
+        if prompt.output_format not in MEDIA_TYPES:
+            raise ValueError(f"Prompt {i}: unsupported output_format '{prompt.output_format}'")
+        prompts.append(prompt)
+    return list(dict.fromkeys(prompts))
+
+
+def load_manifest(path: Union[str, Path]) -> List[Prompt]:
+    """
+    Load a prompt manifest: {"prompts": [...]} or a bare list.
+
+    Raises:
+        FileNotFoundError: If the manifest does not exist
+        ValueError: If it is not valid JSON or an entry is malformed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid manifest {path}: {e}") from None
+    entries = data.get("prompts") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError(f"Invalid manifest {path}: expected a 'prompts' list")
+    return parse_prompts(entries)
+
+
+@dataclass
+class PrerenderProgress:
+    """Progress of the current (or last) pre-render run."""
+    state: str = "idle"  # idle, running, done, cancelled
+    source: Optional[str] = None
+    total: int = 0
+    rendered: int = 0  # Newly generated
+    cached: int = 0  # Already in the cache, just pinned
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        completed = self.rendered + self.cached + self.failed
+        end = self.finished_at or time.time()
+        data["completed"] = completed
+        data["percent"] = round(100 * completed / self.total, 1) if self.total else 100.0
+        data["elapsed_seconds"] = round(end - self.started_at, 2) if self.started_at else 0.0
+        return data
+
+
+class Prerenderer:
+    """
+    Runs manifests through a render callback in the background.
+
+    `render(prompt)` renders and pins one prompt; it returns True if the
+    prompt was generated and False if it was already cached.
+    """
+
+    def __init__(self, render: Callable[[Prompt], Awaitable[bool]]):
+        self._render = render
+        self._task: Optional[asyncio.Task] = None
+        self.progress = PrerenderProgress()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, prompts: List[Prompt], source: str) -> PrerenderProgress:
+        """
+        Start rendering `prompts` in the background (call from the event loop).
+
+        Raises:
+            RuntimeError: If a run is already in progress
+        """
+        if self.running:
+            raise RuntimeError("A pre-render run is already in progress")
+        self.progress = PrerenderProgress(state="running", source=source, total=len(prompts), started_at=time.time())
+        self._task = asyncio.create_task(self._run(prompts, self.progress))
+        return self.progress
+
+    async def _run(self, prompts: List[Prompt], progress: PrerenderProgress):
+        print(f"🔥 Pre-rendering {len(prompts)} prompts from {progress.source}...", file=sys.stderr)
+        try:
+            for prompt in prompts:
+                try:
+                    if await self._render(prompt):
+                        progress.rendered += 1
+                    else:
+                        progress.cached += 1
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    progress.failed += 1
+                    if len(progress.errors) < MAX_REPORTED_ERRORS:
+                        progress.errors.append({
+                            "text": prompt.text,
+                            "voice": prompt.voice,
+                            "preset": prompt.preset,
+                            "error": str(getattr(e, "detail", e))
+                        })
+            progress.state = "done"
+            print(
+                f"✅ Pre-rendered {progress.rendered} prompts ({progress.cached} already cached, {progress.failed} failed)",
+                file=sys.stderr
+            )
+        except asyncio.CancelledError:
+            progress.state = "cancelled"
+            raise
+        finally:
+            progress.finished_at = time.time()
+
+    def cancel(self):
+        """Stop the current run (prompts already pinned stay pinned)."""
+        if self.running:
+            self._task.cancel()
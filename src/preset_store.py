@@ -0,0 +1,102 @@
+"""
+Preset Store for SayAs
+
+Keeps voice presets in memory instead of reading and parsing
+presets/<name>.json on every use. Each preset is re-read only when its
+file's mtime changes, the name list only when the directory's mtime
+changes, and each preset's DSP chain is compiled once (see dsp_chain.py).
+"""
+
+import os
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from dsp_chain import DSPChain, compile_chain
+
+
+@dataclass
+class PresetEntry:
+    """One loaded preset: the raw VoicePreset fields plus its compiled chain."""
+    name: str
+    data: dict
+    mtime_ns: int
+    _chains: Dict[int, DSPChain] = field(default_factory=dict, repr=False)
+
+    @property
+    def voice(self) -> Optional[str]:
+        return self.data.get("voice")
+
+    def chain(self, sample_rate: int) -> DSPChain:
+        """The preset's morphing + effects chain, compiled on first use."""
+        chain = self._chains.get(sample_rate)
+        if chain is None:
+            chain = compile_chain(sample_rate, self.data.get("morphing"), self.data.get("effects"))
+            self._chains[sample_rate] = chain
+        return chain
+
+
+class PresetStore:
+    """In-memory, mtime-invalidated view of the presets directory."""
+
+    def __init__(self, presets_dir: Union[str, Path]):
+        self.presets_dir = Path(presets_dir)
+        self._entries: Dict[str, PresetEntry] = {}
+        self._names: Tuple[str, ...] = ()
+        self._dir_mtime_ns = None
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.presets_dir / f"{name}.json"
+
+    def get(self, name: str) -> Optional[PresetEntry]:
+        """
+        Get a preset by name (one stat call; parsed only when the file changed).
+
+        Returns:
+            The entry, or None if there is no such preset
+        """
+        path = self._path(name)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            self._entries.pop(name, None)
+            return None
+
+        entry = self._entries.get(name)
+        if entry is not None and entry.mtime_ns == mtime_ns:
+            return entry
+
+        with open(path, 'r') as f:
+            data = json.load(f)
+        entry = PresetEntry(name=name, data=data, mtime_ns=mtime_ns)
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def names(self) -> List[str]:
+        """Sorted preset names (the directory is listed only when it changed)."""
+        try:
+            dir_mtime = os.stat(self.presets_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        if dir_mtime != self._dir_mtime_ns:
+            with self._lock:
+                self._names = tuple(sorted(p.stem for p in self.presets_dir.glob("*.json")))
+                self._dir_mtime_ns = dir_mtime
+        return list(self._names)
+
+    def save(self, name: str, data: dict) -> Path:
+        """Write a preset file and load it into the store."""
+        path = self._path(name)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        self.get(name)
+        return path
+
+    def __len__(self) -> int:
+        return len(self.names())
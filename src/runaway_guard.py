@@ -0,0 +1,161 @@
+"""
+Runaway Generation Guard for SayAs
+
+Now and then the model keeps going after the text is spoken - babbling,
+or long trailing noise - until it hits its token limit. That costs far
+more compute than the text warrants and ruins the stitched output.
+
+Every generate call is bounded by the longest duration its text can
+plausibly take (text_splitter.max_expected_duration):
+
+- the model's speech-token budget is capped just above that duration,
+  so a runaway stops early instead of running to the model's own limit;
+- audio that still exceeds it is a runaway: the chunk is generated again
+  with a different (deterministic) seed, up to `retries` times;
+- if every attempt runs away, the shortest is truncated to the limit
+  with a short fade-out.
+
+So one chunk costs at most (1 + retries) capped generations. Incidents
+are counted (see stats(), reported by GET /health).
+"""
+
+import sys
+import zlib
+import math
+import threading
+from typing import Callable, Optional
+
+import torch
+
+from text_splitter import estimate_duration, max_expected_duration
+
+
+# Speech tokens the model generates per second of audio
+SPEECH_TOKENS_PER_SECOND = 25
+
+# Tokens allowed past the limit, so a capped runaway is longer than the limit
+CAP_MARGIN_TOKENS = 10
+
+DEFAULT_FACTOR = 2.5
+DEFAULT_SLACK_SECONDS = 3.0
+DEFAULT_RETRIES = 1
+
+# Fade-out applied where a runaway is cut
+FADE_SECONDS = 0.02
+
+
+class RunawayGuard:
+    """
+    Bounds generate calls by the expected duration of their text.
+
+    Args:
+        factor: Multiple of the estimated duration allowed
+        slack_seconds: Added to every limit (room for short texts)
+        retries: New seeds tried after a runaway before truncating
+    """
+
+    def __init__(
+        self,
+        factor: float = DEFAULT_FACTOR,
+        slack_seconds: float = DEFAULT_SLACK_SECONDS,
+        retries: int = DEFAULT_RETRIES
+    ):
+        self.factor = factor
+        self.slack_seconds = slack_seconds
+        self.retries = max(0, retries)
+        self._generations = 0
+        self._runaways = 0
+        self._retries = 0
+        self._recovered = 0
+        self._truncated = 0
+        self._worst_ratio = 0.0
+        self._lock = threading.Lock()
+
+    def limit(self, text: str) -> float:
+        """Longest audio (seconds) accepted for `text`."""
+        return max_expected_duration(text, self.factor, self.slack_seconds)
+
+    @staticmethod
+    def max_new_tokens(limit: float) -> int:
+        """Speech-token budget for a limit (a little past it, so a runaway shows)."""
+        return math.ceil(limit * SPEECH_TOKENS_PER_SECOND) + CAP_MARGIN_TOKENS
+
+    @staticmethod
+    def retry_seed(text: str, attempt: int) -> int:
+        """Seed of a retry - different per attempt, the same on every run."""
+        return zlib.crc32(text.encode("utf-8")) + attempt
+
+    def run(
+        self,
+        text: str,
+        generate: Callable[[Optional[int], int], torch.Tensor],
+        sample_rate: int
+    ) -> torch.Tensor:
+        """
+        Generate `text` under the guard.
+
+        Args:
+            text: Text being spoken (for the expected duration)
+            generate: generate(seed or None, max_new_tokens) -> audio (1, samples);
+                the first attempt gets seed None (the caller's RNG state)
+            sample_rate: Sample rate of the audio
+
+        Returns:
+            Audio no longer than the limit
+        """
+        limit = self.limit(text)
+        expected = estimate_duration(text)
+        max_samples = int(limit * sample_rate)
+        max_new_tokens = self.max_new_tokens(limit)
+        shortest = None
+        for attempt in range(self.retries + 1):
+            wav = generate(None if attempt == 0 else self.retry_seed(text, attempt), max_new_tokens)
+            runaway = wav.shape[-1] > max_samples
+            self._record(wav.shape[-1] / sample_rate / expected if expected else 0.0, attempt, runaway)
+            if not runaway:
+                if attempt:
+                    with self._lock:
+                        self._recovered += 1
+                return wav
+            print(
+                f"⚠️  Runaway generation: {wav.shape[-1] / sample_rate:.1f}s for {len(text)} chars "
+                f"(limit {limit:.1f}s){', retrying' if attempt < self.retries else ', truncating'}",
+                file=sys.stderr
+            )
+            if shortest is None or wav.shape[-1] < shortest.shape[-1]:
+                shortest = wav
+
+        with self._lock:
+            self._truncated += 1
+        return fade_out(shortest[..., :max_samples], int(FADE_SECONDS * sample_rate))
+
+    def _record(self, ratio: float, attempt: int, runaway: bool):
+        """Count one generation (`ratio`: its duration / the expected duration)."""
+        with self._lock:
+            self._generations += 1
+            self._retries += 1 if attempt else 0
+            self._runaways += 1 if runaway else 0
+            self._worst_ratio = max(self._worst_ratio, ratio)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "generations": self._generations,
+                "runaways": self._runaways,
+                "retries": self._retries,
+                "recovered": self._recovered,
+                "truncated": self._truncated,
+                "worst_duration_ratio": round(self._worst_ratio, 2),
+                "factor": self.factor,
+                "slack_seconds": self.slack_seconds,
+                "max_retries": self.retries
+            }
+
+
+def fade_out(wav: torch.Tensor, samples: int) -> torch.Tensor:
+    """Linear fade over the last `samples` samples (so a cut does not click)."""
+    samples = min(samples, wav.shape[-1])
+    if samples <= 0:
+        return wav
+    ramp = torch.linspace(1.0, 0.0, samples, dtype=wav.dtype, device=wav.device)
+    return torch.cat([wav[..., :-samples], wav[..., -samples:] * ramp], dim=-1)
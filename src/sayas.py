@@ -1,8 +1,12 @@
 """
 SayAs - Custom Voice TTS CLI using Chatterbox
-Usage: SayAs <speaker> "<text>" [-output <filepath>]
+Usage: SayAs <speaker> "<text>" [-output <filepath>] [-play]
+       SayAs <speaker> -book <file.txt|file.md> [-output <folder>] [-workers N]
+       SayAs [speaker] -input-file <lines.txt|-> [-output <folder|file.wav>]
 
-Supports long text automatic splitting for voice cloning.
+Supports long text automatic splitting for voice cloning, whole books
+rendered chapter by chapter (see audiobook.py), and files of one utterance
+per line rendered in one process.
 """
 
 import os
@@ -10,17 +14,21 @@ import sys
 import argparse
 import tempfile
 from pathlib import Path
+from typing import Callable, List, Optional, Tuple
 
 # Set CUDA PATH before importing torch
 os.environ['PATH'] = r'C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v11.8\bin;' + os.environ.get('PATH', '')
 
 import torch
 import torchaudio
-import pyaudio
-import numpy as np
-from chatterbox.tts import ChatterboxTTS
 
-from text_splitter import split_text, stitch_audio_segments, DEFAULT_MAX_CHUNK_SIZE
+import inference
+from acceleration import DEFAULT_PROFILE
+from voice_registry import get_registry
+from playback import get_player
+from audiobook import render_audiobook, DEFAULT_CHAPTER_SILENCE
+from text_splitter import split_text, stitch_audio_segments, create_silence, boundary_pauses, normalize_text, DEFAULT_MAX_CHUNK_SIZE
+from silence_trim import stitch_chunks, trim_silence
 
 # Project paths
 PROJECT_DIR = Path(__file__).parent
@@ -29,6 +37,9 @@ VOICES_DIR = PROJECT_DIR / "voices"
 # Long text handling threshold (characters)
 LONG_TEXT_THRESHOLD = 900  # Start splitting before hitting the limit
 
+# Audio file extensions that make -output a single file in -input-file mode
+AUDIO_SUFFIXES = {".wav", ".flac", ".mp3", ".ogg"}
+
 
 def get_device():
     """Get GPU if available, otherwise CPU."""
@@ -38,10 +49,10 @@ def get_device():
     return "cpu"
 
 
-def load_model(device: str):
-    """Load Chatterbox TTS model."""
+def load_model(device: str, profile: str = None):
+    """Load Chatterbox TTS model (with an optional acceleration profile)."""
     print("Loading Chatterbox TTS model...", file=sys.stderr)
-    model = ChatterboxTTS.from_pretrained(device=device)
+    model = inference.load_model(device_override=device, profile_override=profile)
     return model
 
 
@@ -49,11 +60,10 @@ def find_voice(speaker: str) -> Path:
     """Find voice sample for speaker."""
     VOICES_DIR.mkdir(exist_ok=True)
 
-    # Check for voice file with various extensions
-    for ext in ['.wav', '.mp3']:
-        voice_path = VOICES_DIR / f"{speaker}{ext}"
-        if voice_path.exists():
-            return voice_path
+    # Check the voice index (one directory scan per process)
+    voice_path = get_registry(VOICES_DIR, watch=False).path(speaker)
+    if voice_path:
+        return voice_path
 
     # Check if speaker name is a path
     speaker_path = Path(speaker)
@@ -67,10 +77,9 @@ def generate_speech(model, text: str, voice_path: Path = None, device: str = "cu
     """Generate speech using Chatterbox."""
     if voice_path:
         print(f"Using voice sample: {voice_path}", file=sys.stderr)
-        wav = model.generate(text, audio_prompt_path=str(voice_path))
     else:
         print(f"Using default voice for: {text[:50]}...", file=sys.stderr)
-        wav = model.generate(text)
+    wav = inference.generate(text, voice_path)
 
     return wav
 
@@ -81,10 +90,15 @@ def generate_speech_long_text(
     voice_path: Path = None,
     device: str = "cuda",
     chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
-    silence_duration: float = 0.5
+    silence_duration: float = 0.5,
+    on_segment: Optional[Callable[[int, torch.Tensor, float], None]] = None,
+    trim: bool = True
 ):
     """
     Generate speech for long text by splitting into chunks and stitching.
+
+    Chunks are trimmed to their speech and joined with pauses that follow
+    the punctuation between them (see silence_trim.py).
     
     Args:
         model: ChatterboxTTS model
@@ -92,7 +106,9 @@ def generate_speech_long_text(
         voice_path: Optional path to voice sample
         device: CUDA or CPU
         chunk_size: Maximum characters per chunk
-        silence_duration: Seconds of silence between chunks
+        silence_duration: Base pause between chunks (scaled by the punctuation there)
+        on_segment: Called with (chunk index, trimmed audio, pause before it) as each chunk is ready
+        trim: Trim leading/trailing near-silence off each chunk
         
     Returns:
         Combined audio tensor
@@ -102,22 +118,24 @@ def generate_speech_long_text(
     # Split text
     chunks = split_text(text, max_chunk_size=chunk_size)
     print(f"✂️  Split into {len(chunks)} chunks", file=sys.stderr)
+    pauses = boundary_pauses(text, chunks, silence_duration)
     
     # Generate audio for each chunk
     segments = []
     for i, chunk in enumerate(chunks, 1):
         print(f"🎤 Processing chunk {i}/{len(chunks)} ({len(chunk)} chars)...", file=sys.stderr)
         
-        if voice_path:
-            wav = model.generate(chunk, audio_prompt_path=str(voice_path))
-        else:
-            wav = model.generate(chunk)
+        wav = inference.generate(chunk, voice_path)
         
         segments.append(wav)
+        if on_segment is not None:
+            on_segment(i, trim_silence(wav, model.sr) if trim else wav, pauses[i - 2] if i > 1 else 0.0)
     
     # Stitch together with silence
-    print(f"🔗 Stitching {len(segments)} segments with {silence_duration}s silence...", file=sys.stderr)
-    combined = stitch_audio_segments(segments, model.sr, silence_duration)
+    print(f"🔗 Stitching {len(segments)} segments...", file=sys.stderr)
+    combined, _, stats = stitch_chunks(segments, model.sr, pauses, silence_duration, trim)
+    if trim:
+        print(f"✂️  Trimmed {stats.trim_rate:.0%} silence, {stats.saved_samples / model.sr:.1f}s shorter", file=sys.stderr)
     
     total_chars = sum(len(c) for c in chunks)
     duration = len(combined[0]) / model.sr
@@ -127,29 +145,42 @@ def generate_speech_long_text(
 
 
 def play_audio(wav: torch.Tensor, sample_rate: int):
-    """Play audio using pyaudio."""
-    # Convert to numpy and normalize to 16-bit
-    audio_data = wav.cpu().numpy().flatten()
-    audio_data = (audio_data * 32767).astype(np.int16)
+    """Play audio on the shared output device and wait until it has been heard."""
+    player = get_player(sample_rate)
+    player.wait(player.enqueue(wav, sample_rate, label="sayas"))
 
-    # Initialize pyaudio
-    p = pyaudio.PyAudio()
 
-    try:
-        # Open stream
-        stream = p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=sample_rate,
-            output=True
-        )
+class ChunkPlayer:
+    """
+    Plays long-text chunks while later ones are still generating.
 
-        # Play audio
-        stream.write(audio_data.tobytes())
-        stream.stop_stream()
-        stream.close()
-    finally:
-        p.terminate()
+    Each chunk is queued on the output device as soon as it is ready (the
+    pause before it goes in front of it, as in the stitched file). If
+    playback catches up with generation, the device plays silence until
+    the next chunk arrives - the saved file is stitched separately and has
+    no such gaps.
+    """
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.player = get_player(sample_rate)
+        self.underruns = 0
+        self._last_id = None
+
+    def __call__(self, index: int, wav: torch.Tensor, pause: float = 0.0):
+        if index > 1:
+            if self.player.idle:
+                self.underruns += 1
+                print(f"⏳ Playback caught up with generation (chunk {index})", file=sys.stderr)
+            wav = torch.cat([create_silence(pause, self.sample_rate), wav], dim=1)
+        else:
+            print("🔊 Playing while generating...", file=sys.stderr)
+        self._last_id = self.player.enqueue(wav, self.sample_rate, label=f"chunk {index}")
+
+    def wait(self):
+        """Block until every queued chunk has been heard."""
+        if self._last_id is not None:
+            self.player.wait(self._last_id)
 
 
 def save_audio(wav: torch.Tensor, sample_rate: int, output_path: str):
@@ -158,14 +189,173 @@ def save_audio(wav: torch.Tensor, sample_rate: int, output_path: str):
     print(f"Saved audio to: {output_path}", file=sys.stderr)
 
 
+def render_book(args):
+    """-book: render a whole book in this process (see audiobook.py)."""
+    book = Path(args.book)
+    if not book.is_file():
+        print(f"Book not found: {book}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.workers > 0:
+        # Chunks are spread over the replicas, so throughput scales with -workers
+        print(f"Starting {args.workers} CPU model replicas...", file=sys.stderr)
+        model = inference.start_worker_pool(args.workers, profile_override=args.profile)
+    else:
+        model = load_model(get_device(), args.profile)
+
+    try:
+        render_audiobook(
+            book,
+            args.output or book.with_name(f"{book.stem}_audiobook"),
+            voice_path=find_voice(args.speaker),
+            sample_rate=model.sr,
+            chunk_size=args.chunk_size,
+            silence_duration=args.silence,
+            chapter_silence=args.chapter_silence,
+            chapter_format=args.chapter_format,
+            trim=not args.no_trim
+        )
+    finally:
+        inference.unload_model()
+
+
+def read_lines(source: str, default_speaker: Optional[str]) -> List[Tuple[Optional[str], str]]:
+    """
+    Utterances of an -input-file ("-" = stdin): one per line, `text` or
+    `voice<TAB>text`. Blank lines are skipped.
+    """
+    if source == "-":
+        content = sys.stdin.read()
+    else:
+        content = Path(source).read_text(encoding="utf-8")
+    lines = []
+    for line in content.splitlines():
+        voice, tab, text = line.partition("\t")
+        if not tab:
+            voice, text = "", line
+        if text.strip():
+            lines.append((voice.strip() or default_speaker, text.strip()))
+    return lines
+
+
+def render_lines(args, model, device: str):
+    """
+    -input-file: render every line with the model loaded once.
+
+    Each line is generated with the seed `-seed` + its line number, so a
+    line's audio is the same from run to run (on the same device and
+    profile) whatever comes before it. Voices are looked up once; their
+    conditionals are cached by the inference module across lines.
+    """
+    try:
+        lines = read_lines(args.input_file, args.speaker)
+    except OSError as e:
+        print(f"Cannot read {args.input_file}: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not lines:
+        print("No lines to speak", file=sys.stderr)
+        sys.exit(1)
+
+    output = Path(args.output) if args.output else None
+    combined = output is not None and output.suffix.lower() in AUDIO_SUFFIXES
+    if output is not None and not combined:
+        output.mkdir(parents=True, exist_ok=True)
+    player = get_player(model.sr) if args.play or output is None else None
+    digits = max(4, len(str(len(lines))))
+    voices = {}
+    segments = []
+    last_clip = None
+    failed = 0
+
+    print(f"📄 {len(lines)} lines", file=sys.stderr)
+    for number, (speaker, line) in enumerate(lines, 1):
+        if speaker not in voices:
+            voices[speaker] = find_voice(speaker) if speaker else None
+            if speaker and voices[speaker] is None:
+                print(f"⚠️  Voice '{speaker}' not found, using the default voice", file=sys.stderr)
+        voice_path = voices[speaker]
+        text = normalize_text(line)
+        print(f"🎤 [{number}/{len(lines)}] {speaker or 'default'}: {line[:60]}", file=sys.stderr)
+
+        torch.manual_seed(args.seed + number)
+        try:
+            if len(text) > LONG_TEXT_THRESHOLD and voice_path is not None and not args.no_split:
+                wav = generate_speech_long_text(
+                    model, text, voice_path, device,
+                    chunk_size=args.chunk_size, silence_duration=args.silence, trim=not args.no_trim
+                )
+            else:
+                wav = inference.generate(text, voice_path)
+        except Exception as e:
+            failed += 1
+            print(f"❌ Line {number} failed: {e}", file=sys.stderr)
+            continue
+
+        if combined:
+            segments.append(wav)
+        elif output is not None:
+            save_audio(wav, model.sr, str(output / f"{number:0{digits}d}.wav"))
+        if player is not None:
+            last_clip = player.enqueue(wav, model.sr, label=f"line {number}")
+
+    if combined and segments:
+        save_audio(stitch_audio_segments(segments, model.sr, args.silence), model.sr, str(output))
+    if last_clip is not None:
+        player.wait(last_clip)
+    print(f"Done! {len(lines) - failed}/{len(lines)} lines", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="SayAs - Text-to-Speech with custom voices and long text support",
-        usage='SayAs <speaker> "<text>" [-output <filepath>]'
+        usage='SayAs <speaker> "<text>" [-output <filepath>] [-play]\n'
+              '       SayAs <speaker> -book <file> [-output <folder>] [-workers N]\n'
+              '       SayAs [speaker] -input-file <file|-> [-output <folder|file.wav>]'
+    )
+    parser.add_argument("speaker", nargs="?", help="Speaker name or path to voice sample")
+    parser.add_argument("text", nargs="?", help="Text to speak")
+    parser.add_argument("-output", "-o", dest="output", help="Output file path (optional; a folder with -book)")
+    parser.add_argument(
+        "-book",
+        dest="book",
+        help="Render a .txt or .md book: one file per chapter, a combined file and a chapter list"
+    )
+    parser.add_argument(
+        "-input-file",
+        "-i",
+        dest="input_file",
+        help="Speak each line of a file ('-' = stdin), 'text' or 'voice<TAB>text', in one process"
+    )
+    parser.add_argument(
+        "-seed",
+        dest="seed",
+        type=int,
+        default=0,
+        help="Base random seed for -input-file lines (line N uses seed + N; default: 0)"
+    )
+    parser.add_argument(
+        "-workers",
+        dest="workers",
+        type=int,
+        default=int(os.environ.get("SAYAS_WORKERS", "0")),
+        help="CPU model replicas rendering -book chunks in parallel (default: 0 = one in-process model)"
+    )
+    parser.add_argument(
+        "-chapter-silence",
+        dest="chapter_silence",
+        type=float,
+        default=DEFAULT_CHAPTER_SILENCE,
+        help=f"Seconds of silence between chapters in the combined -book file (default: {DEFAULT_CHAPTER_SILENCE})"
+    )
+    parser.add_argument(
+        "-chapter-format",
+        dest="chapter_format",
+        default="wav",
+        choices=["wav", "flac", "mp3", "ogg"],
+        help="Format of the -book chapter files (default: wav)"
     )
-    parser.add_argument("speaker", help="Speaker name or path to voice sample")
-    parser.add_argument("text", help="Text to speak")
-    parser.add_argument("-output", "-o", dest="output", help="Output file path (optional)")
     parser.add_argument(
         "-chunk-size",
         dest="chunk_size",
@@ -178,7 +368,13 @@ def main():
         dest="silence",
         type=float,
         default=0.5,
-        help="Seconds of silence between chunks (default: 0.5)"
+        help="Base pause between chunks, longer after paragraphs and shorter after commas (default: 0.5)"
+    )
+    parser.add_argument(
+        "-no-trim",
+        dest="no_trim",
+        action="store_true",
+        help="Keep the near-silence at the start and end of each long-text chunk"
     )
     parser.add_argument(
         "-no-split",
@@ -186,42 +382,80 @@ def main():
         action="store_true",
         help="Disable automatic long text splitting (may cause errors)"
     )
+    parser.add_argument(
+        "-play",
+        dest="play",
+        action="store_true",
+        help="Also play the audio when writing -output (long text plays while it generates)"
+    )
+    parser.add_argument(
+        "-profile",
+        dest="profile",
+        default=os.environ.get("SAYAS_PROFILE", DEFAULT_PROFILE),
+        help="Acceleration profile: fp32, inference, int8, bf16, compile or a '+' mix (default: fp32)"
+    )
 
     args = parser.parse_args()
+    if args.input_file is None and args.text is None and not args.book and args.speaker and not sys.stdin.isatty():
+        args.input_file = "-"  # Lines piped in: SayAs Kate < lines.txt
+    if args.input_file is None and (args.speaker is None or (args.text is None and not args.book)):
+        parser.error("speaker and text are required (or -book <file>, or -input-file <file>)")
+
+    if args.book:
+        render_book(args)
+        return
 
     # Get device
     device = get_device()
 
     # Load model
-    model = load_model(device)
+    model = load_model(device, args.profile)
+
+    if args.input_file is not None:
+        render_lines(args, model, device)
+        return
 
     # Find voice
     voice_path = find_voice(args.speaker)
 
+    # Spoken form of the text (numbers, dates, lexicon)
+    text = normalize_text(args.text)
+
     # Check if we need to split long text
     needs_split = (
-        len(args.text) > LONG_TEXT_THRESHOLD and
+        len(text) > LONG_TEXT_THRESHOLD and
         voice_path is not None and  # Only split when using custom voice
         not args.no_split
     )
 
-    # Generate speech
+    play = args.play or not args.output
+
+    # Generate speech (long text starts playing with its first chunk)
     if needs_split:
+        chunk_player = ChunkPlayer(model.sr) if play else None
         wav = generate_speech_long_text(
             model,
-            args.text,
+            text,
             voice_path,
             device,
             chunk_size=args.chunk_size,
-            silence_duration=args.silence
+            silence_duration=args.silence,
+            on_segment=chunk_player,
+            trim=not args.no_trim
         )
     else:
-        wav = generate_speech(model, args.text, voice_path, device)
+        chunk_player = None
+        wav = generate_speech(model, text, voice_path, device)
 
     # Output
     if args.output:
         save_audio(wav, model.sr, args.output)
-    else:
+    if chunk_player is not None:
+        chunk_player.wait()
+        if chunk_player.underruns:
+            print(f"Playback waited for generation {chunk_player.underruns} time(s)", file=sys.stderr)
+        print("Done!", file=sys.stderr)
+    elif play:
         print("Playing audio...", file=sys.stderr)
         play_audio(wav, model.sr)
         print("Done!", file=sys.stderr)
@@ -0,0 +1,192 @@
+"""
+Fair Inference Scheduler for SayAs
+
+Drop-in replacement for the inference ThreadPoolExecutor that decides
+which queued job runs next instead of running them first-come,
+first-served. A 500-item batch no longer sits in front of every
+interactive request that arrives after it.
+
+Jobs are grouped into flows, one per (lane, client). Each job gets a
+virtual finish tag when it is queued:
+
+    tag = max(virtual time, flow's previous tag) + cost / lane weight
+
+and the job with the smallest tag runs next (self-clocked weighted fair
+queueing; virtual time is the tag of the job last started). So:
+
+- clients in the same lane share the workers equally, however much each
+  one has queued;
+- the interactive lane is weighted far above the bulk lane, so a new
+  interactive job overtakes queued bulk work and waits for at most the
+  unit already running;
+- bulk work still runs whenever nothing interactive is waiting.
+
+Callers keep jobs small (one chunk of text per job) so the unit a new
+job may have to wait for is short.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Share of the workers each lane gets when both have work queued
+DEFAULT_LANE_WEIGHTS = {INTERACTIVE: 16.0, BULK: 1.0}
+
+
+@dataclass
+class _Job:
+    fn: Callable
+    future: Future
+    tag: float
+
+
+@dataclass
+class _Flow:
+    """Queued jobs of one client in one lane."""
+    lane: str
+    client: str
+    weight: float
+    jobs: Deque[_Job] = field(default_factory=deque)
+    last_tag: float = 0.0
+
+
+class FairScheduler:
+    """Weighted fair queue in front of `workers` inference threads."""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        lane_weights: Optional[Dict[str, float]] = None,
+        thread_name_prefix: str = "sayas-inference"
+    ):
+        self.lane_weights = dict(lane_weights or DEFAULT_LANE_WEIGHTS)
+        self.thread_name_prefix = thread_name_prefix
+        self._flows: Dict[Tuple[str, str], _Flow] = {}
+        self._vtime = 0.0
+        self._queued = 0
+        self._running = 0
+        self._workers = 0
+        self._target_workers = 0
+        self._shutdown = False
+        self._cond = threading.Condition()
+        self.resize(workers)
+
+    def submit(
+        self,
+        fn: Callable,
+        client: str = "local",
+        lane: str = INTERACTIVE,
+        cost: float = 1.0
+    ) -> Future:
+        """
+        Queue `fn()` for `client` in `lane` and return its future.
+
+        Raises:
+            ValueError: For an unknown lane
+            RuntimeError: After shutdown()
+        """
+        if lane not in self.lane_weights:
+            raise ValueError(f"Unknown lane '{lane}' (expected: {', '.join(self.lane_weights)})")
+        future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler is shut down")
+            flow = self._flows.get((lane, client))
+            if flow is None:
+                flow = self._flows[(lane, client)] = _Flow(lane, client, self.lane_weights[lane])
+            tag = max(self._vtime, flow.last_tag) + cost / flow.weight
+            flow.last_tag = tag
+            flow.jobs.append(_Job(fn, future, tag))
+            self._queued += 1
+            self._cond.notify()
+        return future
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pop the job with the smallest tag (caller holds the lock)."""
+        best = None
+        for flow in self._flows.values():
+            if flow.jobs and (best is None or flow.jobs[0].tag < best.jobs[0].tag):
+                best = flow
+        if best is None:
+            return None
+        job = best.jobs.popleft()
+        self._queued -= 1
+        self._vtime = max(self._vtime, job.tag)
+        if not best.jobs and best.last_tag <= self._vtime:
+            # Idle and caught up: forget it (it would start from vtime anyway)
+            del self._flows[(best.lane, best.client)]
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._workers > self._target_workers or (self._shutdown and not self._queued):
+                        self._workers -= 1
+                        self._cond.notify_all()
+                        return
+                    picked = self._next_job()
+                    if picked is not None:
+                        break
+                    self._cond.wait()
+                job = picked
+                self._running += 1
+
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn())
+                except BaseException as e:
+                    job.future.set_exception(e)
+
+            with self._cond:
+                self._running -= 1
+
+    def resize(self, workers: int):
+        """Run `workers` jobs at once (one per model replica)."""
+        workers = max(1, workers)
+        with self._cond:
+            self._target_workers = workers
+            while self._workers < workers:
+                self._workers += 1
+                threading.Thread(
+                    target=self._worker,
+                    name=f"{self.thread_name_prefix}-{self._workers}",
+                    daemon=True
+                ).start()
+            # Extra threads exit after their current job
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            lanes = {lane: {"queued": 0, "clients": 0} for lane in self.lane_weights}
+            for flow in self._flows.values():
+                if flow.jobs:
+                    lanes[flow.lane]["queued"] += len(flow.jobs)
+                    lanes[flow.lane]["clients"] += 1
+            return {
+                "workers": self._target_workers,
+                "running": self._running,
+                "queued": self._queued,
+                "lanes": lanes
+            }
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """Stop accepting jobs; workers exit once the queue is empty."""
+        with self._cond:
+            self._shutdown = True
+            if cancel_futures:
+                for flow in self._flows.values():
+                    for job in flow.jobs:
+                        job.future.cancel()
+                    self._queued -= len(flow.jobs)
+                    flow.jobs.clear()
+            self._cond.notify_all()
+            if wait:
+                while self._workers:
+                    self._cond.wait()
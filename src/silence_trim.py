@@ -0,0 +1,147 @@
+"""
+Silence Trimming for SayAs
+
+Chatterbox pads its output with near-silence at both ends. Stitched long
+text used to keep that padding and add a fixed gap on top, so every chunk
+boundary was much longer than a natural pause.
+
+Each chunk is now trimmed to its speech before stitching: frame energies
+are computed for the whole chunk at once (one reshape and one mean, no
+Python loop over samples), and everything before the first and after the
+last frame within THRESHOLD_DB of the chunk's loudest frame is cut,
+leaving a short pad so breaths and decays are kept. The gap put back
+between chunks comes from the text (see text_splitter.boundary_pauses):
+longer after a paragraph, shorter after a comma.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import torch
+
+from text_splitter import create_silence
+
+
+# Energy frame length
+FRAME_SECONDS = 0.01
+
+# Frames quieter than the chunk's loudest frame by more than this are silence
+THRESHOLD_DB = -40.0
+
+# ... and so are frames below this absolute level, however quiet the chunk
+FLOOR_DB = -60.0
+
+# Kept before the first and after the last speech frame
+LEAD_PAD_SECONDS = 0.02
+TRAIL_PAD_SECONDS = 0.06
+
+
+def speech_bounds(wav: torch.Tensor, sample_rate: int) -> Tuple[int, int]:
+    """
+    First and one-past-last sample of speech in a clip.
+
+    A clip with no frame above the threshold is kept whole.
+    """
+    samples = wav.reshape(-1) if wav.dim() == 1 or wav.shape[0] == 1 else wav.mean(dim=0)
+    length = samples.numel()
+    frame = max(1, int(sample_rate * FRAME_SECONDS))
+    frames = length // frame
+    if frames == 0:
+        return 0, length
+
+    energy = samples[:frames * frame].float().reshape(frames, frame).pow(2).mean(dim=1)
+    level = 10.0 * torch.log10(energy + 1e-12)
+    threshold = max(level.max().item() + THRESHOLD_DB, FLOOR_DB)
+    voiced = torch.nonzero(level > threshold).flatten()
+    if voiced.numel() == 0:
+        return 0, length
+
+    start = voiced[0].item() * frame - int(sample_rate * LEAD_PAD_SECONDS)
+    end = (voiced[-1].item() + 1) * frame + int(sample_rate * TRAIL_PAD_SECONDS)
+    return max(0, start), min(length, end)
+
+
+def trim_silence(wav: torch.Tensor, sample_rate: int) -> torch.Tensor:
+    """The clip without its leading and trailing near-silence (a view, no copy)."""
+    start, end = speech_bounds(wav, sample_rate)
+    return wav[..., start:end]
+
+
+@dataclass
+class TrimStats:
+    """What trimming and punctuation-based gaps did to a stitched clip."""
+    raw_samples: int = 0  # Chunk audio as generated
+    kept_samples: int = 0  # Chunk audio after trimming
+    fixed_gap_samples: int = 0  # Gaps the fixed silence duration would have added
+    gap_samples: int = 0  # Gaps actually added
+
+    @property
+    def trim_rate(self) -> float:
+        """Share of the generated audio cut as silence."""
+        return 1.0 - self.kept_samples / self.raw_samples if self.raw_samples else 0.0
+
+    @property
+    def saved_samples(self) -> int:
+        """How much shorter the result is than untrimmed, fixed-gap stitching."""
+        return self.raw_samples + self.fixed_gap_samples - self.kept_samples - self.gap_samples
+
+    def to_dict(self, sample_rate: int, bytes_per_sample: Optional[float] = None) -> dict:
+        """
+        Report for response metadata; with the encoded size per sample of
+        the result, includes the bytes saved.
+        """
+        report = {
+            "trim_rate": round(self.trim_rate, 4),
+            "trimmed_seconds": round((self.raw_samples - self.kept_samples) / sample_rate, 3),
+            "saved_seconds": round(self.saved_samples / sample_rate, 3)
+        }
+        if bytes_per_sample is not None:
+            report["bytes_saved"] = int(self.saved_samples * bytes_per_sample)
+        return report
+
+
+def stitch_chunks(
+    segments: List[torch.Tensor],
+    sample_rate: int,
+    pauses: List[float],
+    silence_duration: float = 0.5,
+    trim: bool = True
+) -> Tuple[torch.Tensor, List[int], TrimStats]:
+    """
+    Trim each chunk and join them with the given pauses.
+
+    Args:
+        segments: Chunk audio in order
+        sample_rate: Audio sample rate
+        pauses: Seconds of silence after each chunk but the last
+        silence_duration: The fixed gap the pauses replace (for the stats)
+        trim: Trim the chunks (off = only the pauses change)
+
+    Returns:
+        (combined audio, start sample of each chunk, TrimStats)
+    """
+    stats = TrimStats()
+    parts = []
+    offsets = []
+    position = 0
+    silences = {}
+    fixed_gap = create_silence(silence_duration, sample_rate).shape[-1]
+    for i, segment in enumerate(segments):
+        stats.raw_samples += segment.shape[-1]
+        if trim:
+            segment = trim_silence(segment, sample_rate)
+        stats.kept_samples += segment.shape[-1]
+        offsets.append(position)
+        parts.append(segment)
+        position += segment.shape[-1]
+        if i < len(segments) - 1:
+            pause = pauses[i]
+            if pause not in silences:
+                silences[pause] = create_silence(pause, sample_rate)
+            parts.append(silences[pause])
+            position += silences[pause].shape[-1]
+            stats.gap_samples += silences[pause].shape[-1]
+            stats.fixed_gap_samples += fixed_gap
+
+    combined = torch.cat(parts, dim=-1) if parts else torch.zeros(1, 0)
+    return combined, offsets, stats
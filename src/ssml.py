@@ -0,0 +1,352 @@
+"""
+SSML Compiler for SayAs
+
+Parses a practical SSML subset and compiles it into a synthesis plan:
+
+    <speak>      root element (optional - plain text is wrapped)
+    <voice>      name="Kate" (any registry voice or blend), emotion="happy"
+    <prosody>    pitch="+10%|-2st|high|1.2", rate="slow|80%|1.25",
+                 volume="loud|-6dB|0.8" (nested prosody multiplies)
+    <break>      time="500ms|1.5s" (at most 10 s) or strength="none..x-strong"
+    <say-as>     interpret-as="characters|spell-out|digits|telephone"
+
+Unknown elements (<p>, <s>, <emphasis>, ...) are read for their text.
+Prosody values outside PROSODY_RANGES are rejected, and a document whose
+silence adds up to more than MAX_TOTAL_SILENCE_SECONDS is refused.
+
+The plan is built so the model does as little as possible:
+- breaks become silence in the output buffer, never a model call
+- text is normalized (numbers, dates, lexicon) before jobs are keyed
+- adjacent text with the same voice and prosody is merged into one job
+- identical jobs are rendered once
+- jobs are ordered voice by voice so conditioning is reused, and are
+  independent, so they can run in parallel
+- assembly writes every piece into one preallocated buffer
+"""
+
+import re
+import math
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple, Union
+
+import torch
+
+from text_splitter import split_text, normalize_text, DEFAULT_MAX_CHUNK_SIZE
+
+
+# Break lengths (seconds) for <break strength="...">; bare <break/> is medium
+BREAK_STRENGTHS = {
+    "none": 0.0,
+    "x-weak": 0.1,
+    "weak": 0.25,
+    "medium": 0.5,
+    "strong": 0.75,
+    "x-strong": 1.2,
+}
+
+# Longest single break (longer ones are shortened) and most silence in a document
+MAX_BREAK_SECONDS = 10.0
+MAX_TOTAL_SILENCE_SECONDS = 60.0
+
+# Accepted multiplier of one prosody attribute (inclusive)
+PROSODY_RANGES = {
+    "pitch": (0.25, 4.0),
+    "rate": (0.25, 4.0),
+    "volume": (0.0, 4.0),
+}
+
+# Prosody keywords -> multipliers
+PITCH_KEYWORDS = {"x-low": 0.75, "low": 0.87, "medium": 1.0, "default": 1.0, "high": 1.15, "x-high": 1.3}
+RATE_KEYWORDS = {"x-slow": 0.6, "slow": 0.8, "medium": 1.0, "default": 1.0, "fast": 1.25, "x-fast": 1.5}
+VOLUME_KEYWORDS = {"silent": 0.0, "x-soft": 0.3, "soft": 0.6, "medium": 1.0, "default": 1.0, "loud": 1.4, "x-loud": 1.8}
+
+# Emotions -> extra ChatterboxTTS.generate arguments
+EMOTION_SETTINGS = {
+    "neutral": {},
+    "calm": {"exaggeration": 0.3, "cfg_weight": 0.5},
+    "sad": {"exaggeration": 0.4, "cfg_weight": 0.6},
+    "happy": {"exaggeration": 0.65, "cfg_weight": 0.4},
+    "excited": {"exaggeration": 0.8, "cfg_weight": 0.3},
+}
+
+# Silence between the pieces of a text too long for one generation
+CHUNK_SILENCE_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class Prosody:
+    """Voice-independent rendering settings of a piece of text."""
+    pitch: float = 1.0
+    speed: float = 1.0
+    volume: float = 1.0
+    emotion: Optional[str] = None
+
+    def __post_init__(self):
+        if not (self.pitch > 0 and self.speed > 0 and self.volume >= 0):
+            raise ValueError(f"pitch and rate must be positive and volume not negative, got {self}")
+
+    def morphing(self) -> dict:
+        """As VoiceMorphing fields (for dsp_chain.compile_chain)."""
+        return {"pitch": self.pitch, "speed": self.speed, "volume": self.volume}
+
+    def generate_kwargs(self) -> dict:
+        return dict(EMOTION_SETTINGS.get(self.emotion or "neutral", {}))
+
+
+@dataclass
+class Speech:
+    """Text to speak with one voice and prosody."""
+    text: str
+    voice: Optional[str] = None
+    prosody: Prosody = Prosody()
+
+
+@dataclass
+class Break:
+    """A pause."""
+    seconds: float
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    """One model call in a plan."""
+    text: str
+    voice: Optional[str]
+    prosody: Prosody
+
+
+@dataclass
+class SynthesisPlan:
+    """
+    Compiled SSML.
+
+    `jobs` are the unique model calls, ordered voice by voice.
+    `timeline` is the output in order: a job index (int) or a silence
+    length in seconds (float).
+    """
+    jobs: List[RenderJob]
+    timeline: List[Union[int, float]]
+
+
+# ---------- attribute parsing ----------
+
+def _parse_seconds(value: str) -> float:
+    """Break length in seconds, at most MAX_BREAK_SECONDS."""
+    value = value.strip().lower()
+    if value.endswith("ms"):
+        seconds = float(value[:-2]) / 1000
+    elif value.endswith("s"):
+        seconds = float(value[:-1])
+    else:
+        seconds = float(value) / 1000  # Bare numbers are milliseconds
+    if not math.isfinite(seconds):
+        raise ValueError(f"break time '{value}'")
+    return min(seconds, MAX_BREAK_SECONDS)
+
+
+def _parse_relative(value: str, keywords: Dict[str, float], attribute: str, allow_semitones: bool = False) -> float:
+    """Parse a prosody value into a multiplier (within PROSODY_RANGES[attribute])."""
+    value = value.strip().lower()
+    if value in keywords:
+        return keywords[value]
+    if value.endswith("%"):
+        number = float(value[:-1])
+        # "+10%" / "-10%" is a change, "80%" is an absolute rate
+        multiplier = 1 + number / 100 if value[0] in "+-" else number / 100
+    elif value.endswith("db"):
+        multiplier = 10 ** (float(value[:-2]) / 20)
+    elif allow_semitones and value.endswith("st"):
+        multiplier = 2 ** (float(value[:-2]) / 12)
+    else:
+        multiplier = float(value)
+    low, high = PROSODY_RANGES[attribute]
+    if not low <= multiplier <= high:
+        raise ValueError(f"{attribute}='{value}' is outside {low:g}x-{high:g}x")
+    return multiplier
+
+
+def _say_as(text: str, interpret_as: str) -> str:
+    """Expand <say-as> content into speakable text."""
+    interpret_as = interpret_as.lower()
+    if interpret_as in ("characters", "spell-out"):
+        return " ".join(c for c in text if not c.isspace())
+    if interpret_as == "digits":
+        return " ".join(c for c in text if c.isdigit())
+    if interpret_as == "telephone":
+        groups = re.findall(r"\d+", text)
+        return ", ".join(" ".join(group) for group in groups)
+    return text
+
+
+# ---------- parsing ----------
+
+def _local(tag: str) -> str:
+    """Tag name without an XML namespace."""
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _walk(elem: ET.Element, voice: Optional[str], prosody: Prosody, out: list):
+    tag = _local(elem.tag)
+
+    if tag == "break":
+        if "time" in elem.attrib:
+            out.append(Break(_parse_seconds(elem.get("time"))))
+        else:
+            out.append(Break(BREAK_STRENGTHS.get(elem.get("strength", "medium"), BREAK_STRENGTHS["medium"])))
+        return
+
+    if tag == "say-as":
+        out.append(Speech(_say_as("".join(elem.itertext()), elem.get("interpret-as", "")), voice, prosody))
+        return
+
+    if tag == "voice":
+        voice = elem.get("name", voice)
+        if elem.get("emotion"):
+            prosody = replace(prosody, emotion=elem.get("emotion").lower())
+    elif tag == "prosody":
+        prosody = replace(
+            prosody,
+            pitch=prosody.pitch * _parse_relative(elem.get("pitch", "1"), PITCH_KEYWORDS, "pitch", allow_semitones=True),
+            speed=prosody.speed * _parse_relative(elem.get("rate", "1"), RATE_KEYWORDS, "rate"),
+            volume=prosody.volume * _parse_relative(elem.get("volume", "1"), VOLUME_KEYWORDS, "volume"),
+            emotion=elem.get("emotion", prosody.emotion)
+        )
+
+    if elem.text:
+        out.append(Speech(elem.text, voice, prosody))
+    for child in elem:
+        _walk(child, voice, prosody, out)
+        if child.tail:
+            out.append(Speech(child.tail, voice, prosody))
+
+
+def parse_ssml(markup: str, default_voice: Optional[str] = None) -> List[Union[Speech, Break]]:
+    """
+    Parse SSML into a flat list of Speech and Break items.
+
+    Args:
+        markup: SSML document (or plain text)
+        default_voice: Voice for text outside any <voice> element
+
+    Raises:
+        ValueError: If the markup is not well-formed or has a bad attribute
+            (including prosody outside PROSODY_RANGES)
+    """
+    # An XML declaration may only open the document, so drop it before wrapping
+    markup = re.sub(r"^<\?xml[^>]*\?>", "", markup.strip()).strip()
+    if not markup.startswith("<speak"):
+        markup = f"<speak>{markup}</speak>"
+    try:
+        root = ET.fromstring(markup)
+        items: list = []
+        _walk(root, default_voice, Prosody(), items)
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid SSML: {e}") from None
+    except ValueError as e:
+        raise ValueError(f"Invalid SSML attribute: {e}") from None
+    return items
+
+
+# ---------- compilation ----------
+
+def compile_plan(
+    items: List[Union[Speech, Break]],
+    max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE
+) -> SynthesisPlan:
+    """
+    Compile parsed items into a synthesis plan.
+
+    Args:
+        items: Output of parse_ssml (or Speech items built directly)
+        max_chunk_size: Longest text for a single model call
+
+    Returns:
+        SynthesisPlan with merged, deduplicated, voice-grouped jobs
+
+    Raises:
+        ValueError: If the silence adds up to more than MAX_TOTAL_SILENCE_SECONDS
+    """
+    # Merge runs of same voice + prosody; merge consecutive breaks
+    merged: List[Union[Speech, Break]] = []
+    for item in items:
+        if isinstance(item, Speech):
+            text = " ".join(normalize_text(item.text).split())
+            if not text:
+                continue
+            last = merged[-1] if merged else None
+            if isinstance(last, Speech) and last.voice == item.voice and last.prosody == item.prosody:
+                separator = "" if text[0] in ".,;:!?)" else " "
+                last.text = f"{last.text}{separator}{text}"
+            else:
+                merged.append(Speech(text, item.voice, item.prosody))
+        elif item.seconds > 0:
+            if merged and isinstance(merged[-1], Break):
+                merged[-1] = Break(merged[-1].seconds + item.seconds)
+            else:
+                merged.append(Break(item.seconds))
+
+    # Timeline of job keys / silences (long text split into several jobs)
+    timeline: List[Union[RenderJob, float]] = []
+    for item in merged:
+        if isinstance(item, Break):
+            timeline.append(float(item.seconds))
+            continue
+        chunks = split_text(item.text, max_chunk_size=max_chunk_size) if len(item.text) > max_chunk_size else [item.text]
+        for i, chunk in enumerate(chunks):
+            if i:
+                timeline.append(CHUNK_SILENCE_SECONDS)
+            timeline.append(RenderJob(chunk, item.voice, item.prosody))
+
+    silence = sum(entry for entry in timeline if isinstance(entry, float))
+    if silence > MAX_TOTAL_SILENCE_SECONDS:
+        raise ValueError(f"Breaks add up to {silence:.1f}s, more than {MAX_TOTAL_SILENCE_SECONDS:g}s")
+
+    # Unique jobs, grouped by voice (stable: document order within a voice)
+    unique = list(dict.fromkeys(entry for entry in timeline if isinstance(entry, RenderJob)))
+    jobs = sorted(unique, key=lambda job: job.voice or "")
+    index = {job: i for i, job in enumerate(jobs)}
+    return SynthesisPlan(
+        jobs=jobs,
+        timeline=[index[entry] if isinstance(entry, RenderJob) else entry for entry in timeline]
+    )
+
+
+def assemble(plan: SynthesisPlan, rendered: List[torch.Tensor], sample_rate: int) -> torch.Tensor:
+    """
+    Lay out rendered jobs and silences in one preallocated buffer.
+
+    Args:
+        plan: The compiled plan
+        rendered: Audio for each of plan.jobs, shape (1, samples)
+        sample_rate: Output sample rate
+
+    Returns:
+        Tensor (1, total samples)
+    """
+    lengths = [
+        rendered[entry].shape[-1] if isinstance(entry, int) else int(round(entry * sample_rate))
+        for entry in plan.timeline
+    ]
+    dtype = rendered[0].dtype if rendered else torch.float32
+    out = torch.zeros(1, sum(lengths), dtype=dtype)
+    offset = 0
+    for entry, length in zip(plan.timeline, lengths):
+        if isinstance(entry, int):
+            out[0, offset:offset + length] = rendered[entry].reshape(-1).to(dtype)
+        offset += length
+    return out
+
+
+def compile_ssml(markup: str, default_voice: Optional[str] = None, max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE) -> SynthesisPlan:
+    """Parse and compile an SSML document in one step."""
+    return compile_plan(parse_ssml(markup, default_voice), max_chunk_size)
+
+
+def plan_stats(plan: SynthesisPlan) -> Tuple[int, int, float]:
+    """(model calls, timeline pieces, total break seconds) of a plan."""
+    return (
+        len(plan.jobs),
+        len(plan.timeline),
+        sum(entry for entry in plan.timeline if isinstance(entry, float))
+    )
@@ -0,0 +1,202 @@
+"""
+Incremental Streaming Audio Encoders for SayAs
+
+Keeps encoder state open and accepts PCM blocks as synthesis produces
+them, emitting container pages / frames as soon as they are ready, so
+compressed audio can go out over HTTP or WebSocket while later chunks
+are still generating.
+
+Formats:
+    wav     16-bit PCM with a streaming header (no extra dependencies)
+    opus    Opus in Ogg at speech bitrate - the low-bandwidth option
+    ogg     Same as opus (Ogg/Opus)
+    flac    Lossless FLAC
+    mp3     MP3 (LAME)
+
+Compressed formats need PyAV (pip install av), which bundles FFmpeg.
+"""
+
+import struct
+from typing import Optional
+
+import numpy as np
+
+
+# Speech-oriented bitrates (bits per second)
+OPUS_SPEECH_BITRATE = 24000
+MP3_SPEECH_BITRATE = 64000
+
+STREAMING_FORMATS = ("wav", "opus", "ogg", "flac", "mp3")
+
+STREAMING_MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "opus": "audio/ogg",
+    "ogg": "audio/ogg",
+    "flac": "audio/flac",
+    "mp3": "audio/mpeg",
+}
+
+# Ogg page length: short pages so Opus leaves the muxer every ~100 ms
+# instead of once per second
+OGG_PAGE_DURATION_US = 100000
+
+# container format, codec, bitrate, codec options
+_AV_FORMATS = {
+    "opus": ("ogg", "libopus", OPUS_SPEECH_BITRATE, {"application": "voip"}),
+    "ogg": ("ogg", "libopus", OPUS_SPEECH_BITRATE, {"application": "voip"}),
+    "flac": ("flac", "flac", None, {}),
+    "mp3": ("mp3", "libmp3lame", MP3_SPEECH_BITRATE, {}),
+}
+
+# Opus only runs at these rates; anything else is resampled by the encoder
+_OPUS_RATES = (48000, 24000, 16000, 12000, 8000)
+
+
+def _to_float32(pcm) -> np.ndarray:
+    """Flatten a mono torch tensor / numpy array to contiguous float32."""
+    if hasattr(pcm, "detach"):
+        pcm = pcm.detach().cpu().numpy()
+    return np.ascontiguousarray(np.asarray(pcm, dtype=np.float32).reshape(-1))
+
+
+class StreamingEncoder:
+    """Base class: write() PCM blocks, get back whatever bytes are ready."""
+
+    media_type = "application/octet-stream"
+
+    def write(self, pcm) -> bytes:
+        raise NotImplementedError
+
+    def close(self) -> bytes:
+        raise NotImplementedError
+
+
+class WavStreamEncoder(StreamingEncoder):
+    """
+    16-bit PCM WAV for streaming.
+
+    The header goes out before the total length is known, so its size
+    fields are set to the maximum; players treat that as "read to EOF".
+    """
+
+    media_type = "audio/wav"
+
+    def __init__(self, sample_rate: int, channels: int = 1):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._header_sent = False
+
+    def _header(self) -> bytes:
+        byte_rate = self.sample_rate * self.channels * 2
+        return (
+            b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, self.channels, self.sample_rate, byte_rate, self.channels * 2, 16)
+            + b"data" + struct.pack("<I", 0xFFFFFFFF)
+        )
+
+    def write(self, pcm) -> bytes:
+        samples = _to_float32(pcm)
+        out = b""
+        if not self._header_sent:
+            out = self._header()
+            self._header_sent = True
+        return out + (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+    def close(self) -> bytes:
+        return b"" if self._header_sent else self._header()
+
+
+class _ByteSink:
+    """Write-only (non-seekable) file object that PyAV muxes into."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class AVStreamEncoder(StreamingEncoder):
+    """Opus/Ogg, FLAC and MP3 via PyAV, with the muxer kept open across blocks."""
+
+    def __init__(self, output_format: str, sample_rate: int, bitrate: Optional[int] = None):
+        try:
+            import av
+        except ImportError:
+            raise RuntimeError(
+                f"Streaming {output_format} needs PyAV: pip install av"
+            ) from None
+
+        container_format, codec, default_bitrate, options = _AV_FORMATS[output_format]
+        self.media_type = STREAMING_MEDIA_TYPES[output_format]
+        self.sample_rate = sample_rate
+        self._av = av
+        self._sink = _ByteSink()
+        container_options = {"flush_packets": "1"}
+        if container_format == "ogg":
+            container_options["page_duration"] = str(OGG_PAGE_DURATION_US)
+        self._container = av.open(self._sink, mode="w", format=container_format, options=container_options)
+
+        rate = sample_rate
+        if codec == "libopus" and rate not in _OPUS_RATES:
+            rate = 48000
+        self._stream = self._container.add_stream(codec, rate=rate, options=dict(options))
+        self._stream.layout = "mono"
+        if bitrate or default_bitrate:
+            self._stream.bit_rate = bitrate or default_bitrate
+        self._pts = 0
+        self._closed = False
+
+    def write(self, pcm) -> bytes:
+        samples = _to_float32(pcm)
+        if samples.size == 0:
+            return b""
+        frame = self._av.AudioFrame.from_ndarray(samples.reshape(1, -1), format="flt", layout="mono")
+        frame.sample_rate = self.sample_rate
+        frame.pts = self._pts
+        self._pts += samples.size
+        for packet in self._stream.encode(frame):
+            self._container.mux(packet)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        if self._closed:
+            return b""
+        self._closed = True
+        for packet in self._stream.encode(None):
+            self._container.mux(packet)
+        self._container.close()
+        return self._sink.drain()
+
+
+def create_encoder(output_format: str, sample_rate: int, bitrate: Optional[int] = None) -> StreamingEncoder:
+    """
+    Create an incremental encoder for a streaming output format.
+
+    Raises:
+        ValueError: If the format cannot be streamed
+    """
+    output_format = output_format.lower()
+    if output_format == "wav":
+        return WavStreamEncoder(sample_rate)
+    if output_format in _AV_FORMATS:
+        return AVStreamEncoder(output_format, sample_rate, bitrate)
+    raise ValueError(f"Cannot stream format '{output_format}'. Use one of: {', '.join(STREAMING_FORMATS)}")
+
+
+def encode_all(pcm, sample_rate: int, output_format: str, block_size: int = 24000) -> bytes:
+    """Encode a whole clip block by block (bounded peak memory)."""
+    encoder = create_encoder(output_format, sample_rate)
+    samples = _to_float32(pcm)
+    parts = [encoder.write(samples[i:i + block_size]) for i in range(0, samples.size, block_size)]
+    parts.append(encoder.close())
+    return b"".join(parts)
@@ -1,12 +1,22 @@
 """
 Text Splitter Utility for SayAs
 
-Splits long text into manageable chunks for TTS processing.
-Handles sentence boundaries intelligently.
+Normalizes text for speech and splits long text into manageable chunks
+for TTS processing. Handles sentence boundaries intelligently.
+
+Normalization (run before splitting):
+- user lexicon (term -> spoken form), compiled once into a trie-shaped
+  regex so tens of thousands of entries match in a single C-level scan
+- dates, times, currency, percentages, units, ordinals and numbers are
+  spelled out in one pass of a combined regex
 """
 
+import os
 import re
-from typing import List
+import sys
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
 
 
 # Default maximum characters per chunk (safe limit for Chatterbox with voice cloning)
@@ -15,6 +25,24 @@ DEFAULT_MAX_CHUNK_SIZE = 800
 # Sentence-ending punctuation
 SENTENCE_ENDINGS = re.compile(r'([.!?。！？])\s*')
 
+# Blank line between paragraphs (kept by normalize_text)
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# Clause punctuation (a chunk ending here pauses less than at a full stop)
+CLAUSE_ENDINGS = ',;:—–-'
+
+# Closing quotes/brackets skipped when looking at a chunk's last punctuation
+CLOSING_MARKS = '"\'”’»)]}'
+
+# Pause after a chunk, as a multiple of the silence duration, by how the
+# text breaks there
+BOUNDARY_PAUSES = {
+    "paragraph": 1.5,
+    "sentence": 0.8,
+    "clause": 0.4,
+    "word": 0.1,  # Long sentence split mid-way
+}
+
 # Abbreviations that don't end sentences (lowercase)
 ABBREVIATIONS = frozenset([
     'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'vs', 'etc', 'inc', 'ltd',
@@ -25,6 +53,294 @@ ABBREVIATIONS = frozenset([
 ])
 
 
+# ============== NORMALIZATION ==============
+
+_ONES = [
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine",
+    "ten", "eleven", "twelve", "thirteen", "fourteen", "fifteen", "sixteen",
+    "seventeen", "eighteen", "nineteen"
+]
+_TENS = ["", "", "twenty", "thirty", "forty", "fifty", "sixty", "seventy", "eighty", "ninety"]
+_SCALES = [(10 ** 12, "trillion"), (10 ** 9, "billion"), (10 ** 6, "million"), (1000, "thousand")]
+_ORDINAL_IRREGULAR = {
+    "one": "first", "two": "second", "three": "third", "five": "fifth", "eight": "eighth",
+    "nine": "ninth", "twelve": "twelfth"
+}
+_MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+
+# Currency symbol -> (unit, plural, subunit, subunit plural)
+CURRENCIES = {
+    "$": ("dollar", "dollars", "cent", "cents"),
+    "€": ("euro", "euros", "cent", "cents"),
+    "£": ("pound", "pounds", "penny", "pence"),
+    "¥": ("yen", "yen", "sen", "sen"),
+}
+
+# Unit abbreviations spoken after a number -> (singular, plural). Matched
+# case-sensitively ("5 M" is not meters, "5 Mb" is not megabytes), so each
+# accepted spelling is listed
+UNITS = {
+    "km": ("kilometer", "kilometers"), "m": ("meter", "meters"), "cm": ("centimeter", "centimeters"),
+    "mm": ("millimeter", "millimeters"), "mi": ("mile", "miles"), "ft": ("foot", "feet"),
+    "kg": ("kilogram", "kilograms"), "g": ("gram", "grams"), "mg": ("milligram", "milligrams"),
+    "lb": ("pound", "pounds"), "lbs": ("pound", "pounds"), "oz": ("ounce", "ounces"),
+    "l": ("liter", "liters"), "L": ("liter", "liters"), "ml": ("milliliter", "milliliters"),
+    "mL": ("milliliter", "milliliters"),
+    "mph": ("mile per hour", "miles per hour"), "kmh": ("kilometer per hour", "kilometers per hour"),
+    "km/h": ("kilometer per hour", "kilometers per hour"),
+    "ms": ("millisecond", "milliseconds"), "s": ("second", "seconds"), "min": ("minute", "minutes"),
+    "h": ("hour", "hours"), "hr": ("hour", "hours"), "hrs": ("hour", "hours"),
+    "KB": ("kilobyte", "kilobytes"), "kB": ("kilobyte", "kilobytes"), "MB": ("megabyte", "megabytes"),
+    "GB": ("gigabyte", "gigabytes"), "TB": ("terabyte", "terabytes"),
+    "Hz": ("hertz", "hertz"), "kHz": ("kilohertz", "kilohertz"),
+    "MHz": ("megahertz", "megahertz"), "GHz": ("gigahertz", "gigahertz"),
+    "°C": ("degree Celsius", "degrees Celsius"), "°F": ("degree Fahrenheit", "degrees Fahrenheit"),
+}
+
+# Magnitude suffixes of amounts of money ("$5M", "£2.5bn"), any case
+MAGNITUDE_SUFFIXES = {"k": "thousand", "m": "million", "b": "billion", "bn": "billion", "t": "trillion", "tn": "trillion"}
+
+# Bare four-digit numbers in this range are read as years ("in 1999")
+YEAR_RANGE = (1100, 2099)
+
+# Lexicon file used when none is given (term<TAB>spoken form per line, or JSON)
+DEFAULT_LEXICON_PATH = Path(__file__).parent.parent / "lexicon.tsv"
+
+_NUM = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+# The leading lookahead lets the regex engine skip straight to candidate
+# characters; without it every alternative is tried at every position
+_NORMALIZE_PATTERN = re.compile(
+    r"(?=[0-9$€£¥-])(?:"
+    r"(?P<iso>\b(?P<iy>\d{4})-(?P<im>\d{1,2})-(?P<id>\d{1,2})\b)"
+    r"|(?P<us>\b(?P<um>\d{1,2})/(?P<ud>\d{1,2})/(?P<uy>\d{4})\b)"
+    r"|(?P<time>(?<![\d:])\b(?P<hh>\d{1,2}):(?P<mm>\d{2})(?:\s?(?P<ampm>[apAP])\.?[mM]\b\.?)?(?![\w:]))"
+    r"|(?P<cur>(?P<sym>[$€£¥])\s?(?P<amount>\d{1,3}(?:,\d{3})+|\d+)(?:\.(?P<cents>\d{1,2}))?(?!\d)"
+    r"(?:\s(?P<mag>(?i:thousand|million|billion|trillion))\b|(?P<msuf>(?i:bn|tn|[kmbt]))\b)?)"
+    r"|(?P<pct>(?P<pnum>" + _NUM + r")\s?%)"
+    r"|(?P<decade>\b(?P<dnum>\d{1,3}0)s\b)"
+    r"|(?P<ord>\b(?P<onum>\d+)(?i:st|nd|rd|th)\b)"
+    r"|(?P<unit>(?P<unum>" + _NUM + r")\s?(?P<uname>" + "|".join(
+        re.escape(u) for u in sorted(UNITS, key=len, reverse=True)
+    ) + r")(?![\w/]))"
+    r"|(?P<num>(?<![\w.])(?P<neg>-)?(?P<nval>" + _NUM + r")(?![\d])))"
+)
+
+
+def number_to_words(n: int) -> str:
+    """Spell out a non-negative integer in English ("one hundred twenty-three")."""
+    if n < 20:
+        return _ONES[n]
+    if n < 100:
+        return _TENS[n // 10] + ("-" + _ONES[n % 10] if n % 10 else "")
+    if n < 1000:
+        rest = n % 100
+        return _ONES[n // 100] + " hundred" + (" " + number_to_words(rest) if rest else "")
+    for value, name in _SCALES:
+        if n >= value:
+            rest = n % value
+            return number_to_words(n // value) + " " + name + (" " + number_to_words(rest) if rest else "")
+    return str(n)
+
+
+def ordinal_words(n: int) -> str:
+    """Spell out an ordinal ("twenty-first")."""
+    words = number_to_words(n)
+    head, sep, last = words.rpartition("-") if "-" in words.split(" ")[-1] else words.rpartition(" ")
+    if last in _ORDINAL_IRREGULAR:
+        last = _ORDINAL_IRREGULAR[last]
+    elif last.endswith("y"):
+        last = last[:-1] + "ieth"
+    else:
+        last += "th"
+    return head + sep + last
+
+
+def year_words(year: int) -> str:
+    """Read a year the usual way ("nineteen oh five", "twenty twenty-four")."""
+    if year < 1000 or year >= 10000 or 2000 <= year < 2010:
+        return number_to_words(year)
+    high, low = divmod(year, 100)
+    if low == 0:
+        return number_to_words(high) + " hundred"
+    return number_to_words(high) + (" oh " if low < 10 else " ") + number_to_words(low)
+
+
+def _decimal_words(value: str) -> str:
+    whole, _, frac = value.replace(",", "").partition(".")
+    words = number_to_words(int(whole))
+    if frac:
+        words += " point " + " ".join(_ONES[int(d)] for d in frac)
+    return words
+
+
+def _date_words(year: str, month: str, day: str) -> Optional[str]:
+    m, d = int(month), int(day)
+    if not (1 <= m <= 12 and 1 <= d <= 31):
+        return None
+    return f"{_MONTHS[m - 1]} {ordinal_words(d)}, {year_words(int(year))}"
+
+
+def _plural(value: str, singular: str, plural: str) -> str:
+    return singular if value.replace(",", "") in ("1", "1.0") else plural
+
+
+def _expand(match: "re.Match") -> str:
+    kind = match.lastgroup
+    g = match.group
+    if kind == "iso":
+        return _date_words(g("iy"), g("im"), g("id")) or " ".join(number_to_words(int(x)) for x in (g("iy"), g("im"), g("id")))
+    if kind == "us":
+        return _date_words(g("uy"), g("um"), g("ud")) or " ".join(number_to_words(int(x)) for x in (g("um"), g("ud"), g("uy")))
+    if kind == "time":
+        hours, minutes = int(g("hh")), int(g("mm"))
+        if hours > 24 or minutes > 59:
+            return f"{number_to_words(hours)} {number_to_words(minutes)}"
+        suffix = f" {g('ampm').upper()}M" if g("ampm") else ""
+        if minutes == 0:
+            return number_to_words(hours) + (suffix or " o'clock")
+        return f"{number_to_words(hours)} {'oh ' if minutes < 10 else ''}{number_to_words(minutes)}{suffix}"
+    if kind == "cur":
+        unit, units, sub, subs = CURRENCIES[g("sym")]
+        amount = g("amount").replace(",", "")
+        cents = int((g("cents") or "0").ljust(2, "0"))
+        magnitude = g("mag") or (MAGNITUDE_SUFFIXES[g("msuf").lower()] if g("msuf") else None)
+        if magnitude:
+            return _decimal_words(amount + (f".{g('cents')}" if g("cents") else "")) + f" {magnitude.lower()} {units}"
+        parts = []
+        if int(amount) or not cents:
+            parts.append(f"{number_to_words(int(amount))} {unit if int(amount) == 1 else units}")
+        if cents:
+            parts.append(f"{number_to_words(cents)} {sub if cents == 1 else subs}")
+        return " and ".join(parts)
+    if kind == "pct":
+        return _decimal_words(g("pnum")) + " percent"
+    if kind == "decade":
+        # "the 1990s" -> "nineteen nineties", "the 80s" -> "eighties"
+        words = year_words(int(g("dnum")))
+        return words[:-1] + "ies" if words.endswith("y") else words + "s"
+    if kind == "ord":
+        return ordinal_words(int(g("onum")))
+    if kind == "unit":
+        singular, plural = UNITS[g("uname")]
+        return f"{_decimal_words(g('unum'))} {_plural(g('unum'), singular, plural)}"
+    value = g("nval")
+    if not g("neg") and len(value) == 4 and value.isdigit() and YEAR_RANGE[0] <= int(value) <= YEAR_RANGE[1]:
+        return year_words(int(value))
+    words = _decimal_words(value)
+    return ("minus " + words) if g("neg") else words
+
+
+def _trie_pattern(terms: List[str]) -> str:
+    """
+    Build a regex alternation shaped like a trie of the terms.
+
+    Shared prefixes are matched once, so the regex engine walks the
+    lexicon like a trie instead of trying every term at every position.
+    """
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        ends = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            body = body + "?" if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class Lexicon:
+    """
+    Pronunciation lexicon (term -> spoken form), compiled once.
+
+    Terms match whole words only, case-sensitively (so "US" and "us" can
+    differ), longest term first.
+    """
+
+    def __init__(self, entries: Dict[str, str]):
+        self.entries = {term: spoken for term, spoken in entries.items() if term}
+        self._pattern = None
+        if self.entries:
+            # Lookarounds instead of \b so terms like "C++" or ".NET" work
+            self._pattern = re.compile(r"(?<!\w)(?:" + _trie_pattern(list(self.entries)) + r")(?!\w)")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def apply(self, text: str) -> str:
+        if self._pattern is None:
+            return text
+        entries = self.entries
+        return self._pattern.sub(lambda m: entries[m.group(0)], text)
+
+
+def load_lexicon(path: Union[str, Path]) -> Lexicon:
+    """
+    Load a lexicon file: JSON object, or one "term<TAB>spoken form" per line
+    ('#' starts a comment line).
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix.lower() == ".json":
+            entries = json.load(f)
+        else:
+            entries = {}
+            for line in f:
+                line = line.rstrip("\n")
+                if not line.strip() or line.lstrip().startswith("#") or "\t" not in line:
+                    continue
+                term, spoken = line.split("\t", 1)
+                entries[term.strip()] = spoken.strip()
+    lexicon = Lexicon(entries)
+    print(f"📖 Lexicon loaded: {len(lexicon)} entries from {path.name}", file=sys.stderr)
+    return lexicon
+
+
+_lexicon: Optional[Lexicon] = None
+
+
+def get_lexicon() -> Lexicon:
+    """The process-wide lexicon: $SAYAS_LEXICON or lexicon.tsv, loaded on first use."""
+    global _lexicon
+    if _lexicon is None:
+        path = Path(os.environ.get("SAYAS_LEXICON", DEFAULT_LEXICON_PATH))
+        _lexicon = load_lexicon(path) if path.exists() else Lexicon({})
+    return _lexicon
+
+
+def normalize_text(text: str, lexicon: Optional[Lexicon] = None) -> str:
+    """
+    Rewrite text into its spoken form before splitting and synthesis.
+
+    The lexicon runs first (so it can override number handling, e.g.
+    "COVID-19"), then dates, times, currency, percentages, units,
+    ordinals and numbers are spelled out. Equivalent inputs ("$5" and
+    "5 dollars") come out identical, so the result is what cache keys use.
+
+    Args:
+        text: Raw input text
+        lexicon: Lexicon to apply (default: the process-wide one)
+
+    Returns:
+        Normalized text (single spaces; paragraphs separated by a blank line)
+    """
+    text = (lexicon or get_lexicon()).apply(text)
+    text = _NORMALIZE_PATTERN.sub(_expand, text)
+    paragraphs = (" ".join(paragraph.split()) for paragraph in PARAGRAPH_BREAK.split(text))
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+
 def is_abbreviation(word: str) -> bool:
     """Check if a word is a known abbreviation."""
     return word.lower().rstrip('.') in ABBREVIATIONS
@@ -33,6 +349,8 @@ def is_abbreviation(word: str) -> bool:
 def split_into_sentences(text: str) -> List[str]:
     """
     Split text into sentences, respecting abbreviations.
+
+    A paragraph break always ends a sentence (headings, list items).
     
     Args:
         text: Input text to split
@@ -41,6 +359,14 @@ def split_into_sentences(text: str) -> List[str]:
         List of sentences
     """
     sentences = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        sentences.extend(_paragraph_sentences(paragraph))
+    return sentences
+
+
+def _paragraph_sentences(text: str) -> List[str]:
+    """Sentences of one paragraph."""
+    sentences = []
     current_pos = 0
     
     # Find all potential sentence endings
@@ -143,6 +469,37 @@ def split_text(text: str, max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE) -> List[
     return chunks
 
 
+def chunk_boundaries(text: str, chunks: List[str]) -> List[str]:
+    """
+    How the text breaks after each chunk but the last: "paragraph",
+    "sentence", "clause" or "word" (see BOUNDARY_PAUSES).
+
+    `chunks` must come from split_text(text): they hold the same words in
+    the same order, which is how the whitespace after each chunk is found.
+    """
+    words = [match.span() for match in re.finditer(r'\S+', text)]
+    kinds = []
+    count = 0
+    for chunk in chunks[:-1]:
+        count += len(chunk.split())
+        if 0 < count < len(words) and PARAGRAPH_BREAK.search(text[words[count - 1][1]:words[count][0]]):
+            kinds.append("paragraph")
+            continue
+        last = chunk.rstrip().rstrip(CLOSING_MARKS)[-1:]
+        if last and SENTENCE_ENDINGS.match(last):
+            kinds.append("sentence")
+        elif last and last in CLAUSE_ENDINGS:
+            kinds.append("clause")
+        else:
+            kinds.append("word")
+    return kinds
+
+
+def boundary_pauses(text: str, chunks: List[str], silence_duration: float = 0.5) -> List[float]:
+    """Seconds of silence after each chunk but the last, from how the text breaks there."""
+    return [silence_duration * BOUNDARY_PAUSES[kind] for kind in chunk_boundaries(text, chunks)]
+
+
 def create_silence(duration: float = 0.5, sample_rate: int = 22050) -> 'torch.Tensor':
     """
     Create a silence tensor of specified duration.
@@ -162,7 +519,8 @@ def create_silence(duration: float = 0.5, sample_rate: int = 22050) -> 'torch.Te
 def stitch_audio_segments(
     segments: List['torch.Tensor'],
     sample_rate: int = 22050,
-    silence_duration: float = 0.5
+    silence_duration: float = 0.5,
+    pauses: Optional[List[float]] = None
 ) -> 'torch.Tensor':
     """
     Stitch multiple audio segments together with silence gaps.
@@ -171,6 +529,8 @@ def stitch_audio_segments(
         segments: List of audio tensors to concatenate
         sample_rate: Audio sample rate
         silence_duration: Duration of silence between segments (seconds)
+        pauses: Seconds of silence after each segment but the last
+            (e.g. from boundary_pauses); overrides silence_duration
         
     Returns:
         Combined audio tensor
@@ -183,16 +543,17 @@ def stitch_audio_segments(
     if len(segments) == 1:
         return segments[0]
     
-    # Create silence tensor
-    silence = create_silence(silence_duration, sample_rate)
+    # Silence after each segment except the last
+    if pauses is None:
+        pauses = [silence_duration] * (len(segments) - 1)
+    silences = {pause: create_silence(pause, sample_rate) for pause in set(pauses)}
     
     # Combine segments with silence between them
     result_parts = []
     for i, segment in enumerate(segments):
         result_parts.append(segment)
-        # Add silence after each segment except the last
         if i < len(segments) - 1:
-            result_parts.append(silence)
+            result_parts.append(silences[pauses[i]])
     
     return torch.cat(result_parts, dim=-1)
 
@@ -211,6 +572,30 @@ def estimate_duration(text: str, chars_per_second: float = 15.0) -> float:
     return len(text) / chars_per_second
 
 
+def max_expected_duration(
+    text: str,
+    factor: float = 2.5,
+    slack_seconds: float = 3.0,
+    chars_per_second: float = 15.0
+) -> float:
+    """
+    Longest plausible duration of speech for given text.
+
+    Generous on purpose: slow voices, pauses and exaggeration stay well
+    inside it; audio longer than this is babbling or trailing noise.
+    
+    Args:
+        text: Input text
+        factor: Multiple of the estimated duration allowed
+        slack_seconds: Added on top, so short texts get room too
+        chars_per_second: Average characters per second (default: 15.0)
+        
+    Returns:
+        Maximum duration in seconds
+    """
+    return estimate_duration(text, chars_per_second) * factor + slack_seconds
+
+
 if __name__ == "__main__":
     # Test the splitter
     test_text = """
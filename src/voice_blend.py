@@ -0,0 +1,167 @@
+"""
+Voice Blending for SayAs
+
+Mixes the speaker conditioning of several voices with user-supplied
+weights, so a blended voice costs one normal `generate` - no extra
+inference passes and no mixing of rendered waveforms.
+
+A blend is stored as a small JSON file, voices/<name>.blend:
+
+    {"voices": {"Kate": 0.7, "John": 0.3}}
+
+and is indexed by the voice registry like any other voice, so it can be
+used by name everywhere a voice name is accepted. Its conditionals are
+built from the (cached) conditionals of its component voices.
+
+What gets blended:
+- the speaker embeddings (T3 voice encoder and S3Gen x-vector), as a
+  weighted average rescaled to the inputs' norm - plain averaging would
+  pull the embedding toward the origin
+- everything tied to the reference audio itself (prompt speech tokens and
+  mel features) is taken from the highest-weighted voice, since token
+  sequences cannot be averaged
+
+Usage:
+    python voice_blend.py <blend name> Kate=0.7 John=0.3
+"""
+
+import json
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
+
+import torch
+
+from voice_registry import AUDIO_EXTENSIONS, BLEND_EXTENSION
+
+
+def blend_embeddings(embeddings: Sequence[torch.Tensor], weights: Sequence[float]) -> torch.Tensor:
+    """
+    Weighted average of speaker embeddings, keeping their typical norm.
+
+    Args:
+        embeddings: Same-shaped tensors, one per voice
+        weights: Weights summing to 1
+
+    Returns:
+        Blended embedding (dtype and device of the first input)
+    """
+    stacked = torch.stack([e.float() for e in embeddings])
+    w = torch.tensor(weights, dtype=stacked.dtype, device=stacked.device).view(-1, *([1] * (stacked.dim() - 1)))
+    mixed = (stacked * w).sum(dim=0)
+    target_norm = (stacked.norm(dim=-1, keepdim=True) * w).sum(dim=0)
+    mixed = mixed / mixed.norm(dim=-1, keepdim=True).clamp_min(1e-8) * target_norm
+    return mixed.to(embeddings[0].dtype)
+
+
+def blend_conditionals(conds_list: Sequence, weights: Sequence[float]):
+    """
+    Blend Chatterbox Conditionals of several voices into one.
+
+    Args:
+        conds_list: Conditionals, one per voice
+        weights: Weights summing to 1
+
+    Returns:
+        New Conditionals (the inputs are left untouched)
+    """
+    if len(conds_list) == 1:
+        return conds_list[0]
+    dominant = conds_list[max(range(len(weights)), key=lambda i: weights[i])]
+
+    t3 = replace(
+        dominant.t3,
+        speaker_emb=blend_embeddings([c.t3.speaker_emb for c in conds_list], weights)
+    )
+    gen = dict(dominant.gen)
+    gen["embedding"] = blend_embeddings([c.gen["embedding"] for c in conds_list], weights)
+    return replace(dominant, t3=t3, gen=gen)
+
+
+def normalize_weights(weights: Dict[str, float]) -> Dict[str, float]:
+    """
+    Validate blend weights and scale them to sum to 1.
+
+    Raises:
+        ValueError: If there are no voices or a weight is not positive
+    """
+    if not weights:
+        raise ValueError("A blend needs at least one voice")
+    for name, weight in weights.items():
+        if weight <= 0:
+            raise ValueError(f"Weight for '{name}' must be positive")
+    total = sum(weights.values())
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def find_component(voices_dir: Union[str, Path], name: str) -> Path:
+    """
+    Path of a component voice sample (blends cannot contain blends).
+
+    Raises:
+        FileNotFoundError: If there is no audio sample with that name
+    """
+    for ext in AUDIO_EXTENSIONS:
+        path = Path(voices_dir) / f"{name}{ext}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"Blend component voice '{name}' not found")
+
+
+def load_blend(blend_path: Union[str, Path]) -> List[Tuple[Path, float]]:
+    """
+    Read a .blend file.
+
+    Returns:
+        (component sample path, normalized weight) pairs
+    """
+    blend_path = Path(blend_path)
+    with open(blend_path, 'r', encoding='utf-8') as f:
+        weights = normalize_weights(json.load(f)["voices"])
+    return [(find_component(blend_path.parent, name), weight) for name, weight in weights.items()]
+
+
+def save_blend(voices_dir: Union[str, Path], name: str, weights: Dict[str, float]) -> Path:
+    """
+    Store a named blend of existing voices.
+
+    Args:
+        voices_dir: Voices directory
+        name: Name of the new blended voice
+        weights: Component voice name -> weight (any positive scale)
+
+    Returns:
+        Path of the .blend file
+
+    Raises:
+        ValueError: If the weights are invalid or the name belongs to a sample
+        FileNotFoundError: If a component voice does not exist
+    """
+    voices_dir = Path(voices_dir)
+    weights = normalize_weights(weights)
+    for component in weights:
+        find_component(voices_dir, component)
+    if any((voices_dir / f"{name}{ext}").exists() for ext in AUDIO_EXTENSIONS):
+        raise ValueError(f"'{name}' is already a recorded voice")
+
+    blend_path = voices_dir / f"{name}{BLEND_EXTENSION}"
+    with open(blend_path, 'w', encoding='utf-8') as f:
+        json.dump({"voices": weights}, f, indent=2)
+    print(
+        f"🎨 Blend saved: {name} = " + " + ".join(f"{w:.2f} {v}" for v, w in weights.items()),
+        file=sys.stderr
+    )
+    return blend_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python voice_blend.py <blend name> <voice>=<weight> [<voice>=<weight> ...]", file=sys.stderr)
+        sys.exit(1)
+    try:
+        parts = dict(arg.rsplit("=", 1) for arg in sys.argv[2:])
+        save_blend(Path(__file__).parent.parent / "voices", sys.argv[1], {v: float(w) for v, w in parts.items()})
+    except (ValueError, FileNotFoundError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
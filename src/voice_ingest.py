@@ -0,0 +1,180 @@
+"""
+Voice Ingestion for SayAs
+
+Normalizes an uploaded voice sample once, at upload time, instead of on
+every synthesis:
+
+- downmix to mono
+- resample to the model's reference rate (24 kHz)
+- trim leading/trailing silence
+- keep only the best N seconds (most speech energy)
+- store as 16-bit WAV (atomically)
+
+Usage:
+    python voice_ingest.py <audio file> <voice name>
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Tuple, Union
+
+import torch
+import torchaudio
+import torchaudio.transforms as T
+
+
+# Chatterbox loads reference audio at S3Gen's rate (24 kHz)
+REFERENCE_SAMPLE_RATE = 24000
+
+# Chatterbox only conditions on the first 10 s of a reference (DEC_COND_LEN)
+MAX_REFERENCE_SECONDS = 10.0
+
+# Frames quieter than this (relative to the loudest frame) count as silence
+SILENCE_THRESHOLD_DB = -40.0
+
+# Analysis frame length and padding kept around trimmed speech
+FRAME_MS = 20
+PAD_MS = 100
+
+
+def frame_energy_db(wav: torch.Tensor, sample_rate: int, frame_ms: int = FRAME_MS) -> Tuple[torch.Tensor, int]:
+    """
+    Per-frame RMS energy in dB relative to the loudest frame.
+
+    Returns:
+        (energies in dB, frame length in samples)
+    """
+    frame = max(1, int(sample_rate * frame_ms / 1000))
+    samples = wav.reshape(-1)
+    n_frames = samples.numel() // frame
+    if n_frames == 0:
+        return torch.zeros(0), frame
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    rms = frames.pow(2).mean(dim=1).sqrt()
+    db = 20 * torch.log10(rms.clamp_min(1e-8))
+    return db - db.max(), frame
+
+
+def trim_silence(
+    wav: torch.Tensor,
+    sample_rate: int,
+    threshold_db: float = SILENCE_THRESHOLD_DB,
+    pad_ms: int = PAD_MS
+) -> torch.Tensor:
+    """Trim leading and trailing silence (vectorized frame energy gate)."""
+    db, frame = frame_energy_db(wav, sample_rate)
+    active = torch.nonzero(db > threshold_db).flatten()
+    if active.numel() == 0:
+        return wav
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, int(active[0]) * frame - pad)
+    end = min(wav.shape[-1], (int(active[-1]) + 1) * frame + pad)
+    return wav[..., start:end]
+
+
+def best_window(wav: torch.Tensor, sample_rate: int, seconds: float = MAX_REFERENCE_SECONDS) -> torch.Tensor:
+    """
+    Keep the `seconds`-long window with the most speech energy.
+
+    Scores every frame-aligned window at once with a cumulative sum over
+    the energy of non-silent frames, so pauses and noise-only stretches
+    do not win.
+    """
+    window = int(sample_rate * seconds)
+    if wav.shape[-1] <= window:
+        return wav
+
+    db, frame = frame_energy_db(wav, sample_rate)
+    samples = wav.reshape(-1)
+    energy = samples[:db.numel() * frame].reshape(-1, frame).pow(2).mean(dim=1)
+    energy = torch.where(db > SILENCE_THRESHOLD_DB, energy, torch.zeros_like(energy))
+
+    frames_per_window = max(1, window // frame)
+    csum = torch.cat([torch.zeros(1), energy.cumsum(0)])
+    scores = csum[frames_per_window:] - csum[:-frames_per_window]
+    start = int(torch.argmax(scores)) * frame
+    return wav[..., start:start + window]
+
+
+def normalize_reference(
+    wav: torch.Tensor,
+    sample_rate: int,
+    max_seconds: float = MAX_REFERENCE_SECONDS
+) -> torch.Tensor:
+    """
+    Turn any loaded clip into a clean model reference.
+
+    Args:
+        wav: Audio tensor (channels, samples)
+        sample_rate: Rate of `wav`
+        max_seconds: Longest reference to keep
+
+    Returns:
+        Mono tensor (1, samples) at REFERENCE_SAMPLE_RATE
+    """
+    if wav.dim() == 1:
+        wav = wav.unsqueeze(0)
+    wav = wav.float().mean(dim=0, keepdim=True)
+    if sample_rate != REFERENCE_SAMPLE_RATE:
+        wav = T.Resample(orig_freq=sample_rate, new_freq=REFERENCE_SAMPLE_RATE)(wav)
+    wav = trim_silence(wav, REFERENCE_SAMPLE_RATE)
+    wav = best_window(wav, REFERENCE_SAMPLE_RATE, max_seconds)
+
+    peak = wav.abs().max()
+    if peak > 0.99:
+        wav = wav / peak * 0.99
+    return wav
+
+
+def ingest_voice(
+    source: Union[str, Path],
+    name: str,
+    voices_dir: Union[str, Path],
+    max_seconds: float = MAX_REFERENCE_SECONDS
+) -> Path:
+    """
+    Normalize an audio file and store it as voice `name`.
+
+    The WAV is written to a temp file and renamed into place, so readers
+    never see a half-written voice. An older .mp3 with the same name is
+    removed so it cannot shadow or confuse the new sample.
+
+    Returns:
+        Path of the stored WAV
+    """
+    voices_dir = Path(voices_dir)
+    voices_dir.mkdir(exist_ok=True)
+
+    wav, sample_rate = torchaudio.load(str(source))
+    wav = normalize_reference(wav, sample_rate, max_seconds)
+
+    dest = voices_dir / f"{name}.wav"
+    # Not .wav, so the voice registry never indexes the half-written file
+    fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=str(voices_dir))
+    os.close(fd)
+    try:
+        torchaudio.save(tmp_path, wav, REFERENCE_SAMPLE_RATE, format="wav", encoding="PCM_S", bits_per_sample=16)
+        os.replace(tmp_path, dest)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    stale = voices_dir / f"{name}.mp3"
+    if stale.exists():
+        stale.unlink()
+
+    print(
+        f"💾 Voice ingested: {dest.name} ({wav.shape[-1] / REFERENCE_SAMPLE_RATE:.1f}s mono @ {REFERENCE_SAMPLE_RATE} Hz)",
+        file=sys.stderr
+    )
+    return dest
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python voice_ingest.py <audio file> <voice name>", file=sys.stderr)
+        sys.exit(1)
+    ingest_voice(sys.argv[1], sys.argv[2], Path(__file__).parent.parent / "voices")
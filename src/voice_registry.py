@@ -0,0 +1,302 @@
+"""
+Voice Registry for SayAs
+
+One in-memory index of the voices directory, shared by the API, the
+WebUI and the CLI. Lookups are a dict access - no filesystem calls on the
+request path, even with thousands of voices.
+
+The index is kept current incrementally: by a watchdog file watcher when
+the package is installed, otherwise by polling the directory mtime (plus
+a periodic full rescan to catch files overwritten in place). Duration,
+sample rate and content hash are filled in by the background thread, so
+a large directory is usable right after the initial scan.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, replace, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+# Supported voice sample extensions, in lookup priority order
+AUDIO_EXTENSIONS = ('.wav', '.mp3')
+
+# Named blends of other voices (see voice_blend.py), lowest priority
+BLEND_EXTENSION = '.blend'
+
+VOICE_EXTENSIONS = AUDIO_EXTENSIONS + (BLEND_EXTENSION,)
+
+# Seconds between directory mtime checks when no watcher is available
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Seconds between full rescans (catches files overwritten in place)
+FULL_RESCAN_INTERVAL = 30.0
+
+
+@dataclass(frozen=True)
+class VoiceEntry:
+    """One indexed voice sample."""
+    name: str
+    path: Path
+    format: str
+    size: int
+    mtime_ns: int
+    duration: Optional[float] = None
+    sample_rate: Optional[int] = None
+    content_hash: Optional[str] = None
+
+    def to_dict(self, conditioning_cached: bool = False) -> dict:
+        data = asdict(self)
+        data["path"] = str(self.path)
+        data["conditioning_cached"] = conditioning_cached
+        return data
+
+
+def probe_audio(path: Path) -> Tuple[Optional[float], Optional[int]]:
+    """Read (duration seconds, sample rate) from a file header."""
+    try:
+        import soundfile as sf
+        info = sf.info(str(path))
+        return info.frames / info.samplerate, info.samplerate
+    except Exception:
+        pass
+    try:
+        import torchaudio
+        info = torchaudio.info(str(path))
+        return info.num_frames / info.sample_rate, info.sample_rate
+    except Exception:
+        return None, None
+
+
+def hash_file(path: Path, block_size: int = 1024 * 1024) -> str:
+    """Content hash of a file (sha256, first 16 hex chars)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class VoiceRegistry:
+    """In-memory, incrementally updated index of a voices directory."""
+
+    def __init__(self, voices_dir: Union[str, Path], poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.voices_dir = Path(voices_dir)
+        self.poll_interval = poll_interval
+        # Replaced wholesale on change, so readers never need a lock
+        self._index: Dict[str, VoiceEntry] = {}
+        self._names: Tuple[str, ...] = ()
+        self._dir_mtime_ns = None
+        self._last_full_scan = 0.0
+        self.scanned = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._observer = None
+        self._listeners: List[Callable[[VoiceEntry, bool], None]] = []
+
+    # ---------- lookups (no filesystem access) ----------
+
+    def get(self, name: str) -> Optional[VoiceEntry]:
+        """Look up a voice by name."""
+        return self._index.get(name)
+
+    def path(self, name: str) -> Optional[Path]:
+        """Path of a voice sample by name, or None if unknown."""
+        entry = self._index.get(name)
+        return entry.path if entry else None
+
+    def names(self) -> Tuple[str, ...]:
+        """Sorted voice names."""
+        return self._names
+
+    def entries(self) -> List[VoiceEntry]:
+        """All voice entries, sorted by name."""
+        index = self._index
+        return [index[name] for name in self._names if name in index]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    # ---------- updates ----------
+
+    def add_listener(self, callback: Callable[[VoiceEntry, bool], None]):
+        """Call `callback(entry, removed)` whenever a voice changes or disappears."""
+        self._listeners.append(callback)
+
+    def refresh(self, full: bool = True) -> bool:
+        """
+        Bring the index up to date with the directory.
+
+        Only changed files get new entries; unchanged ones are kept as-is
+        (with their metadata). With full=False, the scan is skipped when
+        the directory mtime has not changed.
+
+        Returns:
+            True if any voice was added, changed or removed
+        """
+        with self._lock:
+            try:
+                dir_mtime = os.stat(self.voices_dir).st_mtime_ns
+            except FileNotFoundError:
+                dir_mtime = None
+            if not full and dir_mtime == self._dir_mtime_ns:
+                return False
+            self._dir_mtime_ns = dir_mtime
+            self._last_full_scan = time.monotonic()
+
+            found: Dict[str, os.DirEntry] = {}
+            if dir_mtime is not None:
+                with os.scandir(self.voices_dir) as it:
+                    for item in it:
+                        stem, ext = os.path.splitext(item.name)
+                        ext = ext.lower()
+                        if ext not in VOICE_EXTENSIONS or not item.is_file():
+                            continue
+                        current = found.get(stem)
+                        if current is None or VOICE_EXTENSIONS.index(ext) < VOICE_EXTENSIONS.index(os.path.splitext(current.name)[1].lower()):
+                            found[stem] = item
+
+            old = self._index
+            new: Dict[str, VoiceEntry] = {}
+            changed = []
+            for name, item in found.items():
+                st = item.stat()
+                entry = old.get(name)
+                if entry is None or entry.path.name != item.name or entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+                    entry = VoiceEntry(
+                        name=name,
+                        path=Path(item.path),
+                        format=os.path.splitext(item.name)[1][1:].lower(),
+                        size=st.st_size,
+                        mtime_ns=st.st_mtime_ns
+                    )
+                    changed.append((entry, False))
+                new[name] = entry
+            removed = [(entry, True) for name, entry in old.items() if name not in new]
+
+            self._index = new
+            self._names = tuple(sorted(new))
+            self.scanned = True
+
+        for entry, is_removed in changed + removed:
+            for callback in self._listeners:
+                callback(entry, is_removed)
+        if changed:
+            self._wake.set()
+        return bool(changed or removed)
+
+    def _fill_metadata(self):
+        """Probe duration/sample rate and hash any entries still missing them."""
+        for entry in list(self._index.values()):
+            if self._stop.is_set():
+                return
+            if entry.content_hash is not None:
+                continue
+            try:
+                duration, sample_rate = probe_audio(entry.path)
+                content_hash = hash_file(entry.path)
+            except OSError:
+                continue
+            with self._lock:
+                current = self._index.get(entry.name)
+                if current is entry:
+                    index = dict(self._index)
+                    index[entry.name] = replace(entry, duration=duration, sample_rate=sample_rate, content_hash=content_hash)
+                    self._index = index
+
+    def _run(self):
+        while not self._stop.is_set():
+            woken = self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                full = woken or time.monotonic() - self._last_full_scan >= FULL_RESCAN_INTERVAL
+                self.refresh(full=full)
+                self._fill_metadata()
+            except Exception as e:
+                print(f"⚠️  Voice registry refresh failed: {e}", file=sys.stderr)
+
+    def _start_watcher(self) -> bool:
+        """Use watchdog for change notifications if it is installed."""
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            return False
+        if not self.voices_dir.exists():
+            return False
+
+        registry = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                registry._wake.set()
+
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), str(self.voices_dir), recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+        return True
+
+    def start(self, watch: bool = True) -> "VoiceRegistry":
+        """
+        Scan the directory and (with watch=True) keep the index current.
+
+        Safe to call more than once; only the first call starts the thread.
+        """
+        if not self.scanned:
+            self.refresh()
+        if watch and self._thread is None:
+            watching = self._start_watcher()
+            self._thread = threading.Thread(target=self._run, name="sayas-voice-registry", daemon=True)
+            self._thread.start()
+            self._wake.set()
+            print(
+                f"🗂️  Voice registry: {len(self)} voices "
+                f"({'watching' if watching else f'polling every {self.poll_interval}s'})",
+                file=sys.stderr
+            )
+        return self
+
+    def stop(self):
+        """Stop the background thread and watcher."""
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_registries: Dict[Path, VoiceRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(voices_dir: Union[str, Path], watch: bool = True) -> VoiceRegistry:
+    """
+    Get the shared registry for a voices directory (created on first use).
+
+    Every frontend in the process asking for the same directory gets the
+    same index.
+    """
+    key = Path(voices_dir).resolve()
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = VoiceRegistry(key)
+            _registries[key] = registry
+    if not registry.scanned or (watch and registry._thread is None):
+        registry.start(watch=watch)
+    return registry
@@ -8,12 +8,14 @@ Features:
 - Voice upload and management
 - API connection details
 - Pink notebook theme
+
+Runs standalone (python webui.py) or mounted inside the API server
+(python api.py --webui), where it shares the API's model and queue.
 """
 
 import os
 import sys
 import io
-import shutil
 from pathlib import Path
 
 # Set CUDA PATH before importing torch
@@ -21,11 +23,13 @@ os.environ['PATH'] = r'C:\Program Files\NVIDIA GPU Computing Toolkit\CUDA\v11.8\
 
 import torch
 import torchaudio
-import numpy as np
-import pyaudio
 import gradio as gr
 
-from chatterbox.tts import ChatterboxTTS
+import inference
+from voice_registry import get_registry, VOICE_EXTENSIONS
+from voice_ingest import ingest_voice
+from playback import get_player
+from text_splitter import normalize_text
 
 # Project paths
 PROJECT_DIR = Path(__file__).parent.parent
@@ -34,71 +38,45 @@ VOICES_DIR = PROJECT_DIR / "voices"
 # Ensure voices directory exists
 VOICES_DIR.mkdir(exist_ok=True)
 
-# Global model
-model = None
-device = None
-
-
-def get_device():
-    if torch.cuda.is_available():
-        return "cuda"
-    return "cpu"
+# Shared voice index (same instance as the API's when mounted)
+voice_registry = get_registry(VOICES_DIR)
 
 
 def load_model():
-    global model, device
-    device = get_device()
-    print(f"💖 Loading Chatterbox TTS model on {device}...")
-    model = ChatterboxTTS.from_pretrained(device=device)
-    print(f"✅ Model loaded!")
+    """Load the shared model (no-op if the API already loaded it)."""
+    print(f"💖 Loading Chatterbox TTS model...")
+    model = inference.load_model()
+    print(f"✅ Model loaded on {inference.device}!")
     return model
 
 
 def get_available_voices():
     """Get list of available voices for dropdown."""
     voices = ["🌸 Default Voice"]
-    if VOICES_DIR.exists():
-        for ext in ['.wav', '.mp3']:
-            for voice_file in VOICES_DIR.glob(f"*{ext}"):
-                voices.append(f"💕 {voice_file.stem}")
+    voices.extend(f"💕 {name}" for name in voice_registry.names())
     return voices
 
 
 def get_voices_list():
     """Get simple list of voice names for display."""
-    voices = []
-    if VOICES_DIR.exists():
-        for ext in ['.wav', '.mp3']:
-            for voice_file in VOICES_DIR.glob(f"*{ext}"):
-                voices.append(f"💕 {voice_file.stem} ({voice_file.suffix})")
+    voices = [f"💕 {entry.name} (.{entry.format})" for entry in voice_registry.entries()]
     if not voices:
         voices = ["📭 No custom voices yet - upload one!"]
     return voices
 
 
-def play_audio(wav: torch.Tensor, sample_rate: int):
-    """Play audio using pyaudio."""
-    audio_data = wav.cpu().numpy().flatten()
-    audio_data = (audio_data * 32767).astype(np.int16)
+def play_audio(wav: torch.Tensor, sample_rate: int) -> int:
+    """Queue audio on the shared output device (returns without waiting)."""
+    return get_player(sample_rate).enqueue(wav, sample_rate, label="webui")
 
-    p = pyaudio.PyAudio()
-    try:
-        stream = p.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=sample_rate,
-            output=True
-        )
-        stream.write(audio_data.tobytes())
-        stream.stop_stream()
-        stream.close()
-    finally:
-        p.terminate()
-
-
-def generate_speech(voice_name, text, play_on_server):
+
+def generate_speech(voice_name, text, play_on_server, request: gr.Request = None):
     """Generate speech from text."""
-    global model
+    model = inference.model
+
+    # Fair scheduling against API traffic: one flow per browser client
+    if request is not None and request.client is not None:
+        inference.set_client(f"webui:{request.client.host}")
 
     if model is None:
         return "❌ Model not loaded yet. Please wait...", None, ""
@@ -117,20 +95,15 @@ def generate_speech(voice_name, text, play_on_server):
     # Find voice file
     voice_path = None
     if voice != "Default Voice":
-        for ext in ['.wav', '.mp3']:
-            vp = VOICES_DIR / f"{voice}{ext}"
-            if vp.exists():
-                voice_path = vp
-                break
+        voice_path = voice_registry.path(voice)
 
     try:
-        # Generate speech
+        # Generate speech (queued on the shared inference executor)
         if voice_path:
             print(f"🎵 Using custom voice: {voice}")
-            wav = model.generate(text, audio_prompt_path=str(voice_path))
         else:
             print(f"🎵 Using default voice")
-            wav = model.generate(text)
+        wav = inference.submit(inference.generate, normalize_text(text), voice_path).result()
 
         # Play on server
         if play_on_server:
@@ -176,19 +149,12 @@ def upload_voice(voice_name, audio_file):
         return "⚠️ Invalid voice name!", get_voices_list(), ""
     
     try:
-        # Determine file extension from uploaded file
-        file_ext = Path(audio_file).suffix.lower()
-        if file_ext not in ['.wav', '.mp3']:
-            # Convert to wav if not supported
-            file_ext = '.wav'
-        
-        # Create destination path
-        dest_path = VOICES_DIR / f"{voice_name}{file_ext}"
-        
-        # Copy the file
-        shutil.copy2(audio_file, dest_path)
+        # Mono 24 kHz WAV, silence trimmed, best 10 seconds kept
+        dest_path = ingest_voice(audio_file, voice_name, VOICES_DIR)
+        voice_registry.refresh()
         
-        print(f"💾 Voice saved: {voice_name}{file_ext}")
+        # Compute the speaker conditionals now, not on first synthesis
+        inference.submit(inference.precompute_conditionals, dest_path).result()
         
         return f"✅ Voice '{voice_name}' saved successfully!", get_voices_list(), ""
     
@@ -206,12 +172,16 @@ def delete_voice(voice_name):
     
     try:
         deleted = False
-        for ext in ['.wav', '.mp3']:
+        for ext in VOICE_EXTENSIONS:
             voice_path = VOICES_DIR / f"{voice}{ext}"
             if voice_path.exists():
                 voice_path.unlink()
                 deleted = True
                 break
+        conds_path = inference.conditionals_path(VOICES_DIR / f"{voice}.wav")
+        if conds_path.exists():
+            conds_path.unlink()
+        voice_registry.refresh()
         
         if deleted:
             print(f"🗑️ Voice deleted: {voice}")
@@ -550,6 +520,7 @@ with gr.Blocks(css=custom_css, title="💕 SayAs - Beautiful TTS") as demo:
                 
                 response = requests.post(
                     'http://localhost:8765/sayas',
+                    headers={'Accept': 'audio/wav'},  # raw audio bytes
                     json={
                         'voice': 'Kate',
                         'text': 'Hello!',
@@ -557,7 +528,7 @@ with gr.Blocks(css=custom_css, title="💕 SayAs - Beautiful TTS") as demo:
                     }
                 )
                 
-                audio_data = response.json()['audio_base64']
+                audio_data = response.content
                 ```
                 
                 ---
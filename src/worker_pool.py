@@ -0,0 +1,296 @@
+"""
+CPU Inference Worker Pool for SayAs
+
+Runs N Chatterbox model replicas in separate processes, each with its own
+torch thread budget and (optionally) its own CPU cores. On many-core CPU
+boxes this serves many concurrent short requests far better than a single
+model using torch's default threading.
+
+Audio comes back through a per-worker shared memory buffer instead of a
+pickled tensor; only the sample count crosses the pipe.
+"""
+
+import os
+import sys
+import queue
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import torch
+
+from acceleration import DEFAULT_PROFILE
+
+
+# Shared audio buffer per worker, in seconds of float32 audio at the model
+# rate. One chunk (800 chars) is well under a minute; anything longer falls
+# back to being sent over the pipe.
+DEFAULT_BUFFER_SECONDS = 120
+
+# Chatterbox output rate, used to size buffers before workers report in
+DEFAULT_SAMPLE_RATE = 24000
+
+
+def plan_cores(replicas: int, threads_per_worker: int) -> List[List[int]]:
+    """
+    Split the available CPU cores into one contiguous set per replica.
+
+    Args:
+        replicas: Number of worker processes
+        threads_per_worker: Cores per worker
+
+    Returns:
+        List of core id lists, one per replica
+    """
+    if hasattr(os, "sched_getaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+    else:
+        available = list(range(os.cpu_count() or 1))
+
+    plan = []
+    for i in range(replicas):
+        start = (i * threads_per_worker) % len(available)
+        plan.append([available[(start + j) % len(available)] for j in range(threads_per_worker)])
+    return plan
+
+
+def _pin_to_cores(cores: List[int]):
+    """Pin the current process to the given cores (best effort)."""
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+        return
+    try:
+        import psutil
+        psutil.Process().cpu_affinity(cores)
+    except ImportError:
+        print("⚠️  psutil not installed, core pinning skipped", file=sys.stderr)
+
+
+def _worker_main(
+    index: int,
+    conn,
+    shm_name: str,
+    capacity: int,
+    num_threads: int,
+    cores: Optional[List[int]],
+    profile: str
+):
+    """Worker process entry point: load a replica and serve generate jobs."""
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    if cores:
+        _pin_to_cores(cores)
+
+    import inference
+    model = inference.load_model(device_override="cpu", profile_override=profile)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = np.ndarray((capacity,), dtype=np.float32, buffer=shm.buf)
+    conn.send(("ready", model.sr))
+
+    try:
+        while True:
+            job = conn.recv()
+            if job is None:
+                break
+            text, voice_path, kwargs = job
+            try:
+                wav = inference.generate(text, voice_path, **kwargs)
+                audio = wav.detach().cpu().numpy().reshape(-1).astype(np.float32, copy=False)
+                if audio.size <= capacity:
+                    buffer[:audio.size] = audio
+                    conn.send(("shm", audio.size))
+                else:
+                    conn.send(("inline", audio))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del buffer
+        shm.close()
+
+
+class _Worker:
+    """Parent-side handle for one replica process."""
+
+    def __init__(self, index: int, capacity: int, num_threads: int, cores: Optional[List[int]], profile: str):
+        self.index = index
+        self.profile = profile
+        self.capacity = capacity
+        self.num_threads = num_threads
+        self.cores = cores
+        self.shm = shared_memory.SharedMemory(create=True, size=capacity * 4)
+        self.buffer = np.ndarray((capacity,), dtype=np.float32, buffer=self.shm.buf)
+        self.conn = None
+        self.process = None
+        self.jobs_done = 0
+        self.retired = False  # Would not restart; no longer routed to
+
+    def start(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.index, child_conn, self.shm.name, self.capacity, self.num_threads, self.cores, self.profile),
+            name=f"sayas-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self) -> int:
+        status, sample_rate = self.conn.recv()
+        if status != "ready":
+            raise RuntimeError(f"Worker {self.index} failed to start")
+        return sample_rate
+
+    def run(self, text: str, voice_path, kwargs: dict) -> torch.Tensor:
+        self.conn.send((text, voice_path, kwargs))
+        status, payload = self.conn.recv()
+        self.jobs_done += 1
+        if status == "shm":
+            return torch.from_numpy(self.buffer[:payload].copy()).unsqueeze(0)
+        if status == "inline":
+            return torch.from_numpy(payload).unsqueeze(0)
+        raise RuntimeError(payload)
+
+    def stop(self):
+        if self.process is not None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+        if self.conn is not None:
+            self.conn.close()
+        del self.buffer
+        self.shm.close()
+        self.shm.unlink()
+
+
+class WorkerPool:
+    """
+    Pool of CPU model replicas with an idle-worker router.
+
+    Exposes `sr` and `generate` like the in-process model, so the rest of
+    the code does not care which one it is talking to. `generate` is
+    blocking and thread-safe: each caller checks out an idle worker, so up
+    to `replicas` jobs run at the same time.
+    """
+
+    def __init__(
+        self,
+        replicas: int,
+        threads_per_worker: int = 0,
+        pin_cores: bool = False,
+        buffer_seconds: int = DEFAULT_BUFFER_SECONDS,
+        profile: str = DEFAULT_PROFILE
+    ):
+        if replicas < 1:
+            raise ValueError("replicas must be at least 1")
+        self.replicas = replicas
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // replicas)
+        self.pin_cores = pin_cores
+        self.profile = profile
+        self.buffer_seconds = buffer_seconds
+        self.sr = DEFAULT_SAMPLE_RATE
+        self._ctx = mp.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._retired = 0
+
+    def start(self):
+        """Spawn all replicas and wait until every one has loaded its model."""
+        cores = plan_cores(self.replicas, self.threads_per_worker) if self.pin_cores else [None] * self.replicas
+        capacity = self.buffer_seconds * DEFAULT_SAMPLE_RATE
+
+        print(
+            f"🧵 Starting {self.replicas} CPU workers x {self.threads_per_worker} threads"
+            f"{' (pinned)' if self.pin_cores else ''}...",
+            file=sys.stderr
+        )
+        for i in range(self.replicas):
+            worker = _Worker(i, capacity, self.threads_per_worker, cores[i], self.profile)
+            worker.start(self._ctx)
+            self._workers.append(worker)
+
+        for worker in self._workers:
+            self.sr = worker.wait_ready()
+            self._idle.put(worker)
+        print(f"✅ {self.replicas} CPU workers ready!", file=sys.stderr)
+
+    def _restart(self, worker: _Worker) -> bool:
+        """
+        Replace a crashed worker process, reusing its shared buffer.
+
+        Returns False if the new process did not come up; the worker is
+        then retired (its buffer is freed by stop()).
+        """
+        print(f"⚠️  Worker {worker.index} died, restarting...", file=sys.stderr)
+        if worker.conn is not None:
+            worker.conn.close()
+        try:
+            worker.start(self._ctx)
+            worker.wait_ready()
+            return True
+        except Exception as e:
+            print(f"❌ Worker {worker.index} failed to restart, retiring it: {e}", file=sys.stderr)
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+            worker.retired = True
+            with self._lock:
+                self._retired += 1
+                if self._retired == self.replicas:
+                    self._idle.put(None)  # Wake callers waiting for a worker
+            return False
+
+    def generate(self, text: str, voice_path: Optional[Union[str, Path]] = None, **kwargs) -> torch.Tensor:
+        """Run one generate job on the next idle worker."""
+        worker = self._idle.get()
+        if worker is None:
+            self._idle.put(None)
+            raise RuntimeError("Every CPU worker failed to restart")
+        healthy = True
+        try:
+            return worker.run(text, str(voice_path) if voice_path else None, kwargs)
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            healthy = self._restart(worker)
+            raise RuntimeError(f"Worker {worker.index} crashed during generation")
+        finally:
+            if healthy:
+                self._idle.put(worker)
+
+    def stats(self) -> dict:
+        """Per-worker status for health reporting."""
+        return {
+            "replicas": self.replicas,
+            "threads_per_worker": self.threads_per_worker,
+            "pinned": self.pin_cores,
+            "profile": self.profile,
+            "idle": self._idle.qsize() if self._retired < self.replicas else 0,
+            "retired": self._retired,
+            "workers": [
+                {
+                    "index": w.index,
+                    "pid": w.process.pid if w.process else None,
+                    "alive": bool(w.process and w.process.is_alive()),
+                    "cores": w.cores,
+                    "jobs_done": w.jobs_done,
+                    "retired": w.retired
+                }
+                for w in self._workers
+            ]
+        }
+
+    def stop(self):
+        """Shut down every replica and free the shared buffers."""
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
@@ -17,6 +17,6 @@ echo 🌸 WebUI: http://localhost:7860
 echo.
 echo Press Ctrl+C to stop
 echo.
-python "%~dp0src\api.py"
+python "%~dp0src\api.py" %*
 
 endlocal